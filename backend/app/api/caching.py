@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request
+
+from app.catalog import catalog_version
+from app.core.cache import MemoryCacheBackend, ResponseCache, SQLiteCacheBackend
+from app.core.config import Settings, settings
+from app.models import User
+
+
+def build_response_cache(config: Settings) -> Optional[ResponseCache]:
+    """The configured response cache, or ``None`` when ``response_cache_backend`` is "none"."""
+    ttl, maxsize = config.response_cache_ttl_seconds, config.response_cache_max_entries
+    if config.response_cache_backend == "none":
+        return None
+    if config.response_cache_backend == "sqlite":
+        return ResponseCache(SQLiteCacheBackend(config.response_cache_path, maxsize, ttl))
+    return ResponseCache(MemoryCacheBackend(maxsize, ttl))
+
+
+# serialized anonymous list pages
+list_response_cache = build_response_cache(settings)
+if isinstance(getattr(list_response_cache, "backend", None), SQLiteCacheBackend):
+    # keys and ETags embed the version, so workers sharing entries must share it too;
+    # entries under older versions are never read again and age out of the store
+    catalog_version.share(list_response_cache.backend)
+elif list_response_cache is not None:
+    catalog_version.subscribe(list_response_cache.clear)
+
+
+def list_cache_key(request: Request, version: str) -> str:
+    params = sorted(request.query_params.multi_items())
+    return f"emojis:{version}:{params!r}"
+
+
+def list_etag(request: Request, current_user: Optional[User], version: str) -> str:
+    """Weak ETag for a list page: catalog ``version``, viewer and query parameters."""
+    viewer = "anon" if current_user is None else f"user:{current_user.id}"
+    params = sorted(request.query_params.multi_items())
+    digest = hashlib.sha1(repr((version, viewer, params)).encode("utf-8"))
+    return f'W/"{digest.hexdigest()[:24]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def list_cache_headers(etag: str, current_user: Optional[User]) -> dict[str, str]:
+    if current_user is None:
+        cache_control = f"public, max-age={settings.emoji_list_max_age_seconds}, must-revalidate"
+    else:
+        # can_delete depends on the viewer, so shared caches must not store the page
+        cache_control = "private, no-cache"
+    return {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+
+
+__all__ = [
+    "build_response_cache",
+    "etag_matches",
+    "list_cache_headers",
+    "list_cache_key",
+    "list_etag",
+    "list_response_cache",
+]
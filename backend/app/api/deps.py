@@ -1,23 +1,130 @@
 from __future__ import annotations
 
-from typing import Optional
+import time
+from collections.abc import AsyncIterator
+from typing import Any, Callable, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
-from sqlmodel import Session, select
+from sqlalchemy import event
+from sqlalchemy.orm import Session as ORMSession
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import decode_token
-from app.db import get_session
+from app.db import read_session, set_request_user
 from app.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
+# token -> (user id, exp timestamp); saves the HMAC verification on repeat requests
+_claims_cache = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
+# user id -> column values of the user row, minus the password hash
+_user_cache = TTLCache(settings.auth_cache_max_entries, settings.auth_cache_ttl_seconds)
 
-def get_current_user(
+_SNAPSHOT_FIELDS = tuple(name for name in User.model_fields if name != "hashed_password")
+_CHANGED_USERS_KEY = "changed_user_ids"
+_user_change_listeners: list[Callable[[set[int]], None]] = []
+
+
+def resolve_user_id(token: str) -> int:
+    """Return the user id a bearer token was issued for.
+
+    Raises ``JWTError`` for invalid or expired tokens and ``ValueError`` for tokens without
+    a numeric subject.
+    """
+    cached = _claims_cache.get(token)
+    if cached is not None:
+        user_id, expires_at = cached
+        if expires_at is None or expires_at > time.time():
+            return user_id
+        _claims_cache.pop(token)
+        raise JWTError("Signature has expired.")
+
+    payload = decode_token(token)
+    subject = payload.get("sub")
+    if subject is None:
+        raise ValueError("Token has no subject")
+    user_id = int(subject)
+    _claims_cache.set(token, (user_id, payload.get("exp")))
+    return user_id
+
+
+async def _load_user(session: AsyncSession, user_id: int) -> Optional[User]:
+    snapshot = _user_cache.get(user_id)
+    if snapshot is not None:
+        return User(**snapshot)
+
+    user = (await session.exec(select(User).where(User.id == user_id))).first()
+    if user is not None:
+        _user_cache.set(user_id, {name: getattr(user, name) for name in _SNAPSHOT_FIELDS})
+    return user
+
+
+def invalidate_user(user_id: int) -> None:
+    _user_cache.pop(user_id)
+
+
+def clear_auth_cache() -> None:
+    _claims_cache.clear()
+    _user_cache.clear()
+
+
+def subscribe_user_changes(listener: Callable[[set[int]], None]) -> None:
+    """Call ``listener`` with the ids of users changed or deleted by each commit."""
+    _user_change_listeners.append(listener)
+
+
+@event.listens_for(ORMSession, "after_flush")
+def _collect_changed_users(session: ORMSession, flush_context: Any) -> None:
+    changed = {
+        instance.id
+        for instance in (*session.dirty, *session.deleted)
+        if isinstance(instance, User) and instance.id is not None
+    }
+    if changed:
+        session.info.setdefault(_CHANGED_USERS_KEY, set()).update(changed)
+        for user_id in changed:
+            invalidate_user(user_id)
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _invalidate_changed_users(session: ORMSession) -> None:
+    # Evict again after commit so a read that raced the flush cannot keep stale data.
+    changed = session.info.pop(_CHANGED_USERS_KEY, set())
+    for user_id in changed:
+        invalidate_user(user_id)
+    if changed:
+        for listener in _user_change_listeners:
+            listener(changed)
+
+
+@event.listens_for(ORMSession, "after_soft_rollback")
+def _discard_changed_users(session: ORMSession, previous_transaction: Any) -> None:
+    session.info.pop(_CHANGED_USERS_KEY, None)
+
+
+async def get_read_session(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+) -> AsyncIterator[AsyncSession]:
+    """Session for read-only endpoints; see ``app.db.read_session``."""
+    user_id = None
+    if token:
+        try:
+            user_id = resolve_user_id(token)
+        except (JWTError, TypeError, ValueError):
+            pass
+    async with read_session(user_id) as session:
+        yield session
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -26,61 +133,52 @@ def get_current_user(
     )
 
     try:
-        payload = decode_token(token)
-    except JWTError as exc:
-        raise credentials_exception from exc
-
-    subject = payload.get("sub")
-    if subject is None:
-        raise credentials_exception
-
-    try:
-        user_id = int(subject)
-    except (TypeError, ValueError) as exc:
+        user_id = resolve_user_id(token)
+    except (JWTError, TypeError, ValueError) as exc:
         raise credentials_exception from exc
 
-    statement = select(User).where(User.id == user_id)
-    user = session.exec(statement).first()
+    user = await _load_user(session, user_id)
     if user is None:
         raise credentials_exception
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    set_request_user(user.id)
     return user
 
 
-def get_current_active_superuser(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_superuser(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_superuser:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
     return current_user
 
 
-def get_optional_user(
+async def get_optional_user(
     token: Optional[str] = Depends(optional_oauth2_scheme),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ) -> Optional[User]:
     if not token:
         return None
 
     try:
-        payload = decode_token(token)
-        subject = payload.get("sub")
-        if subject is None:
-            return None
-        user_id = int(subject)
+        user_id = resolve_user_id(token)
     except Exception:
         return None
 
-    statement = select(User).where(User.id == user_id)
-    user = session.exec(statement).first()
+    user = await _load_user(session, user_id)
     if user is None or not user.is_active:
         return None
     return user
 
 
 __all__ = [
+    "clear_auth_cache",
     "get_current_active_superuser",
     "get_current_user",
     "get_optional_user",
+    "get_read_session",
+    "invalidate_user",
     "oauth2_scheme",
     "optional_oauth2_scheme",
+    "resolve_user_id",
+    "subscribe_user_changes",
 ]
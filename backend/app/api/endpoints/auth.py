@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.api.deps import get_current_user
 from app.core.security import (
+    PasswordHasherBusy,
     create_access_token,
     create_password_reset_token,
-    hash_password,
-    verify_password,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
     verify_password_reset_token,
 )
-from app.db import get_session
+from app.db import get_session, pin_to_primary
 from app.models import User
 from app.schemas.auth import (
     PasswordResetConfirm,
@@ -26,48 +29,64 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserPublic, status_code=status.HTTP_201_CREATED)
-def register_user(user_in: UserCreate, session: Session = Depends(get_session)) -> UserPublic:
+async def register_user(
+    user_in: UserCreate, session: AsyncSession = Depends(get_session)
+) -> UserPublic:
     statement = select(User).where(User.email == user_in.email)
-    if session.exec(statement).first() is not None:
+    if (await session.exec(statement)).first() is not None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
     user = User(
         email=user_in.email,
-        hashed_password=hash_password(user_in.password),
+        hashed_password=await hash_password_async(user_in.password),
         display_name=user_in.display_name,
     )
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
+    # the new account may not have reached the replicas by the time it signs in
+    pin_to_primary(user.id)
     return user
 
 
 @router.post("/login", response_model=Token)
-def login_user(payload: UserLoginRequest, session: Session = Depends(get_session)) -> Token:
+async def login_user(
+    payload: UserLoginRequest, session: AsyncSession = Depends(get_session)
+) -> Token:
     statement = select(User).where(User.email == payload.email)
-    user = session.exec(statement).first()
-    if user is None or not verify_password(payload.password, user.hashed_password):
+    user = (await session.exec(statement)).first()
+    if user is None or not await verify_password_async(payload.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if password_needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await hash_password_async(payload.password)
+        except PasswordHasherBusy:
+            pass  # the login itself succeeded; upgrade the hash on a quieter login
+        else:
+            user.touch()
+            session.add(user)
+            await session.commit()
+
     access_token = create_access_token(subject=str(user.id))
     return Token(access_token=access_token)
 
 
 @router.get("/me", response_model=UserPublic)
-def read_current_user(current_user: User = Depends(get_current_user)) -> UserPublic:
+async def read_current_user(current_user: User = Depends(get_current_user)) -> UserPublic:
     return current_user
 
 
 @router.post("/password-reset/request", response_model=PasswordResetResponse)
-def request_password_reset(
-    payload: PasswordResetRequest, session: Session = Depends(get_session)
+async def request_password_reset(
+    payload: PasswordResetRequest, session: AsyncSession = Depends(get_session)
 ) -> PasswordResetResponse:
     statement = select(User).where(User.email == payload.email)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     
     if user is None:
         return PasswordResetResponse(message="If the email exists, a reset link will be sent")
@@ -81,22 +100,22 @@ def request_password_reset(
 
 
 @router.post("/password-reset/confirm", response_model=PasswordResetResponse)
-def confirm_password_reset(
-    payload: PasswordResetConfirm, session: Session = Depends(get_session)
+async def confirm_password_reset(
+    payload: PasswordResetConfirm, session: AsyncSession = Depends(get_session)
 ) -> PasswordResetResponse:
     email = verify_password_reset_token(payload.token)
     if email is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid or expired token")
     
     statement = select(User).where(User.email == email)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     if user is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    user.hashed_password = hash_password(payload.new_password)
+    user.hashed_password = await hash_password_async(payload.new_password)
     user.touch()
     session.add(user)
-    session.commit()
+    await session.commit()
     
     return PasswordResetResponse(message="Password successfully reset")
 
@@ -1,119 +1,366 @@
+from collections import Counter
+from collections.abc import AsyncIterator
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Session, col, or_, select
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import get_current_user, get_optional_user
-from app.db import get_session
-from app.models import EmojiSubmission, User
-from app.schemas import Emoji, EmojiCreate, EmojiListResponse, EmojiUpdate
+from app.api.caching import (
+    etag_matches,
+    list_cache_headers,
+    list_cache_key,
+    list_etag,
+    list_response_cache,
+)
+from app.api.deps import get_current_user, get_optional_user, get_read_session
+from app.api.serializers import (
+    dump_json,
+    emoji_list_payload,
+    emoji_payload,
+    export_csv_chunk,
+    export_ndjson_chunk,
+)
+from app.batching import DuplicateEmoji, create_batcher
+from app.catalog import catalog_version
+from app.core.config import settings
+from app.db import get_session, get_session_factory, pin_to_primary, reads_from_replica
+from app.facets import category_facet_statement
+from app.importer import IMPORT_FORMATS, RecordParser, import_records, iter_text_lines
+from app.models import EmojiKeyword, EmojiSubmission, User
+from app.models.emoji import join_keywords
+from app.queries import (
+    apply_cursor,
+    apply_filters,
+    apply_sort,
+    can_delete_expression,
+    count_statement,
+    decode_cursor,
+    encode_cursor,
+    export_statement,
+    list_statement,
+)
+from app.schemas import (
+    Emoji,
+    EmojiBatchDelete,
+    EmojiBatchReport,
+    EmojiBatchResult,
+    EmojiBatchUpdate,
+    EmojiCreate,
+    EmojiImportReport,
+    EmojiListResponse,
+    EmojiSuggestion,
+    EmojiUpdate,
+)
+from app.snapshot import catalog_snapshot
+from app.suggest import suggest_index, track_changes
 
 router = APIRouter(prefix="/emojis", tags=["emojis"])
 
 
+async def _list_session(
+    current_user: Optional[User] = Depends(get_optional_user),
+    session: AsyncSession = Depends(get_read_session),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+) -> AsyncIterator[AsyncSession]:
+    """The read session, or the primary for anonymous pages bound for the response cache.
+
+    Cached pages are keyed by the catalog version the primary bumped on commit; a replica may
+    not have the rows of that version yet.
+    """
+    if current_user is None and list_response_cache is not None and reads_from_replica(session):
+        async with session_factory() as primary:
+            yield primary
+    else:
+        yield session
+
+
 @router.get("", response_model=EmojiListResponse)
-def list_emojis(
+async def list_emojis(
+    request: Request,
     search: Optional[str] = Query(None, description="Search by title, description, or keywords"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    sort: str = Query("date_desc", description="Sort order: date_desc, date_asc, title_asc, title_desc"),
+    keyword: Optional[list[str]] = Query(None, description="Filter by exact keyword"),
+    keyword_mode: str = Query(
+        "all", pattern="^(all|any)$", description="Match all or any of the keywords"
+    ),
+    sort: str = Query(
+        "date_desc",
+        description="Sort order: date_desc, date_asc, title_asc, title_desc, relevance",
+    ),
     limit: int = Query(50, ge=1, le=100, description="Number of items per page"),
     offset: int = Query(0, ge=0, description="Number of items to skip"),
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = Query(None, description="Continue after the page that returned this"),
+    include_total: bool = Query(True, description="Count all matching items"),
+    facets: Optional[str] = Query(
+        None, pattern="^category$", description="Also return counts per category"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    session: AsyncSession = Depends(_list_session),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
     current_user: Optional[User] = Depends(get_optional_user),
-) -> EmojiListResponse:
-    query = select(EmojiSubmission)
-    
-    # Apply search filter
-    if search:
-        search_term = f"%{search.lower()}%"
-        query = query.where(
-            or_(
-                col(EmojiSubmission.title).ilike(search_term),
-                col(EmojiSubmission.description).ilike(search_term),
-                col(EmojiSubmission.keywords).ilike(search_term),
+) -> Response:
+    version = await catalog_version.value_async()
+    etag = list_etag(request, current_user, version)
+    cache_headers = list_cache_headers(etag, current_user)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    # Anonymous pages are identical for every viewer, so they can be served from cache.
+    cache = list_response_cache if current_user is None else None
+    cache_key = list_cache_key(request, version)
+    if cache is not None:
+        cached = await cache.get_async(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json", headers=cache_headers)
+
+    dialect = session.get_bind().dialect.name
+    rank_by_relevance = bool(search) and sort == "relevance"
+
+    position = None
+    if cursor is not None:
+        if rank_by_relevance:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is not supported for relevance sort",
             )
+        try:
+            position = decode_cursor(cursor, sort)
+        except ValueError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from exc
+
+    viewer_id = current_user.id if current_user is not None else None
+    viewer_email = current_user.email if current_user is not None else None
+    total_submissions: Optional[int] = None
+    facet_counts = None
+
+    # Full-text search needs the database's index; everything else can come from the snapshot.
+    if settings.emoji_list_snapshot and not search:
+        snapshot = catalog_snapshot.current
+        if catalog_snapshot.stale:
+            # read changed rows from the primary; a lagging replica would report them deleted
+            async with session_factory() as primary:
+                snapshot = await primary.run_sync(
+                    lambda sync_session: catalog_snapshot.refresh(sync_session.connection())
+                )
+        rows, matched = snapshot.page(
+            sort=sort,
+            limit=limit + 1,
+            offset=offset,
+            after=position,
+            category=category,
+            keywords=keyword,
+            keyword_mode=keyword_mode,
+            viewer_id=viewer_id,
+            viewer_email=viewer_email,
         )
-    
-    # Apply category filter
-    if category:
-        query = query.where(EmojiSubmission.category == category)
-    
-    # Apply sorting
-    if sort == "date_asc":
-        query = query.order_by(EmojiSubmission.created_at.asc())
-    elif sort == "title_asc":
-        query = query.order_by(EmojiSubmission.title.asc())
-    elif sort == "title_desc":
-        query = query.order_by(EmojiSubmission.title.desc())
-    else:  # date_desc (default)
-        query = query.order_by(EmojiSubmission.created_at.desc())
-    
-    # Get total count before pagination
-    count_query = select(EmojiSubmission)
-    if search:
-        search_term = f"%{search.lower()}%"
-        count_query = count_query.where(
-            or_(
-                col(EmojiSubmission.title).ilike(search_term),
-                col(EmojiSubmission.description).ilike(search_term),
-                col(EmojiSubmission.keywords).ilike(search_term),
-            )
+        if include_total:
+            total_submissions = matched
+        if facets == "category":
+            facet_counts = {"category": snapshot.category_facets(keyword, keyword_mode)}
+    else:
+        filters = {
+            "search": search,
+            "category": category,
+            "keywords": keyword,
+            "keyword_mode": keyword_mode,
+        }
+        query = apply_filters(
+            list_statement(viewer_id, viewer_email),
+            dialect=dialect,
+            order_by_rank=rank_by_relevance,
+            **filters,
         )
-    if category:
-        count_query = count_query.where(EmojiSubmission.category == category)
-    
-    total_submissions = len(session.exec(count_query).all())
-    
-    # Apply pagination
-    query = query.limit(limit).offset(offset)
-    submissions = session.exec(query).all()
-    
-    # Convert to response format
-    items: list[Emoji] = []
-    for submission in submissions:
-        can_delete = False
-        if current_user is not None:
-            if submission.submitter_id == current_user.id:
-                can_delete = True
-            elif submission.submitter_id is None and submission.submitter_email == current_user.email:
-                can_delete = True
-        items.append(
-            Emoji(
-                id=submission.id,
-                symbol=submission.symbol,
-                title=submission.title,
-                description=submission.description,
-                category=submission.category,
-                keywords=submission.keyword_list,
-                submitter_email=submission.submitter_email,
-                can_delete=can_delete,
+        if not rank_by_relevance:
+            query = apply_sort(query, sort)
+        if position is not None:
+            query = apply_cursor(query, sort, position)
+
+        if include_total:
+            count_query = count_statement(dialect=dialect, **filters)
+            total_submissions = (await session.exec(count_query)).one()
+
+        if facets == "category":
+            facet_query = category_facet_statement(
+                dialect=dialect, search=search, keywords=keyword, keyword_mode=keyword_mode
             )
+            facet_counts = {
+                "category": [
+                    {"value": value, "count": count}
+                    for value, count in (await session.exec(facet_query)).all()
+                ]
+            }
+
+        # Apply pagination; one extra row tells whether another page follows
+        query = query.limit(limit + 1)
+        if cursor is None:
+            query = query.offset(offset)
+        rows = (await session.exec(query)).all()
+        if reads_from_replica(session):
+            # rows from a lagging replica may predate ``version``: neither cache nor tag them
+            cache = None
+            del cache_headers["ETag"]
+
+    next_cursor: Optional[str] = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if not rank_by_relevance:
+            next_cursor = encode_cursor(sort, rows[-1])
+
+    items = [emoji_payload(row) for row in rows]
+
+    body = dump_json(
+        emoji_list_payload(
+            items,
+            total=total_submissions,
+            limit=limit,
+            offset=offset,
+            next_cursor=next_cursor,
+            facets=facet_counts,
         )
-    
-    return EmojiListResponse(
-        items=items,
-        total=total_submissions,
-        limit=limit,
-        offset=offset,
+    )
+    if cache is not None:
+        await cache.set_async(cache_key, body)
+    return Response(content=body, media_type="application/json", headers=cache_headers)
+
+
+@router.get("/suggest", response_model=list[EmojiSuggestion])
+async def suggest_emojis(
+    q: str = Query(..., min_length=1, max_length=64, description="What the user has typed"),
+    limit: int = Query(8, ge=1, le=20, description="Number of suggestions"),
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    if not suggest_index.loaded:
+        await session.run_sync(lambda sync_session: suggest_index.load(sync_session.connection()))
+    return Response(
+        content=dump_json(suggest_index.suggest(q, limit)), media_type="application/json"
+    )
+
+
+EXPORT_BATCH_SIZE = 1000
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_emojis(
+    search: Optional[str] = Query(None, description="Search by title, description, or keywords"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    after_id: Optional[int] = Query(None, ge=0, description="Resume after this emoji id"),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+) -> StreamingResponse:
+    query = export_statement(after_id)
+
+    async def chunks():
+        # The session belongs to the stream: request dependencies are closed before it runs.
+        async with session_factory() as session:
+            filtered = apply_filters(
+                query, dialect=session.get_bind().dialect.name, search=search, category=category
+            )
+            result = await session.stream(
+                filtered.execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            if format == "csv":
+                yield export_csv_chunk([], header=True)
+            async for rows in result.partitions():
+                if format == "csv":
+                    yield export_csv_chunk(rows)
+                else:
+                    yield export_ndjson_chunk(rows)
+
+    if format == "csv":
+        media_type = "text/csv; charset=utf-8"
+        filename = "emojis.csv"
+    else:
+        media_type = "application/x-ndjson"
+        filename = "emojis.ndjson"
+    return StreamingResponse(
+        chunks(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
+async def _commit_unique(session: AsyncSession) -> None:
+    """Commit, turning a (symbol, title) unique violation into a 400."""
+    try:
+        await session.commit()
+    except IntegrityError as exc:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Emoji already exists"
+        ) from exc
+
+
+def _is_owner(submission: EmojiSubmission, user: User) -> bool:
+    if submission.submitter_id == user.id:
+        return True
+    return submission.submitter_id is None and submission.submitter_email == user.email
+
+
+def _apply_update(submission: EmojiSubmission, payload: EmojiUpdate) -> None:
+    if payload.symbol is not None:
+        submission.symbol = payload.symbol
+    if payload.title is not None:
+        submission.title = payload.title
+    if payload.description is not None:
+        submission.description = payload.description
+    if payload.category is not None:
+        submission.category = payload.category
+    if payload.keywords is not None:
+        submission.keyword_list = payload.keywords
+
+
+def _owned_emoji(submission: EmojiSubmission) -> Emoji:
+    return Emoji(
+        id=submission.id,
+        symbol=submission.symbol,
+        title=submission.title,
+        description=submission.description,
+        category=submission.category,
+        keywords=submission.keyword_list,
+        submitter_email=submission.submitter_email,
+        can_delete=True,
+    )
+
+
+async def _create_batched(
+    payload: EmojiCreate, session_factory: async_sessionmaker, current_user: User
+) -> Emoji:
+    row = {
+        "symbol": payload.symbol,
+        "title": payload.title,
+        "description": payload.description,
+        "category": payload.category,
+        "keywords": join_keywords(payload.keywords),
+        "submitter_email": payload.submitter_email or current_user.email,
+        "submitter_id": current_user.id,
+    }
+    try:
+        emoji_id = await create_batcher.submit(session_factory, row)
+    except DuplicateEmoji as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    # the batch commits in its own task, outside this request's read-your-writes tracking
+    pin_to_primary(current_user.id)
+    return _owned_emoji(EmojiSubmission(id=emoji_id, **row))
+
+
 @router.post("", response_model=Emoji, status_code=status.HTTP_201_CREATED)
-def create_emoji(
+async def create_emoji(
     payload: EmojiCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
     current_user: User = Depends(get_current_user),
 ) -> Emoji:
+    if create_batcher.enabled:
+        return await _create_batched(payload, session_factory, current_user)
+
     normalized_keywords = sorted({tag.strip() for tag in payload.keywords if tag.strip()})
-    
-    existing = session.exec(
-        select(EmojiSubmission).where(
-            EmojiSubmission.symbol == payload.symbol,
-            EmojiSubmission.title == payload.title,
-        )
-    ).first()
-    if existing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Emoji already exists")
 
     submission = EmojiSubmission(
         symbol=payload.symbol,
@@ -126,85 +373,247 @@ def create_emoji(
     submission.keyword_list = normalized_keywords
 
     session.add(submission)
-    session.commit()
-    session.refresh(submission)
+    await _commit_unique(session)
+    await catalog_version.bump_async()
+    await session.refresh(submission)
 
-    return Emoji(
-        id=submission.id,
-        symbol=submission.symbol,
-        title=submission.title,
-        description=submission.description,
-        category=submission.category,
-        keywords=submission.keyword_list,
-        submitter_email=submission.submitter_email,
-        can_delete=True,
+    return _owned_emoji(submission)
+
+
+@router.post("/import", response_model=EmojiImportReport)
+async def import_emojis(
+    request: Request,
+    format: Optional[str] = Query(
+        None, pattern="^(ndjson|csv)$", description="Body format; inferred from Content-Type"
+    ),
+    report: str = Query(
+        "full", pattern="^(full|errors)$", description="Report every row or only rejected rows"
+    ),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Rows per transaction"),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> Response:
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else IMPORT_FORMATS[0]
+    parser = RecordParser(format)
+
+    counts = {"created": 0, "duplicate": 0, "invalid": 0}
+    results: list[dict] = []
+
+    async def flush(pending: list) -> None:
+        outcomes = await session.run_sync(
+            import_records, pending, current_user.id, current_user.email
+        )
+        for outcome in outcomes:
+            counts[outcome.status] += 1
+            if report == "full" or outcome.status != "created":
+                results.append(outcome.as_dict())
+
+    pending: list = []
+    try:
+        async for line in iter_text_lines(request.stream()):
+            pending.extend(parser.feed(line))
+            if len(pending) >= batch_size:
+                await flush(pending)
+                pending = []
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    pending.extend(parser.close())
+    if pending:
+        await flush(pending)
+
+    if counts["created"]:
+        await catalog_version.bump_async()
+    return Response(
+        content=dump_json(
+            {
+                "created": counts["created"],
+                "duplicates": counts["duplicate"],
+                "invalid": counts["invalid"],
+                "results": results,
+            }
+        ),
+        media_type="application/json",
     )
 
 
 @router.put("/{emoji_id}", response_model=Emoji)
-def update_emoji(
+async def update_emoji(
     emoji_id: int,
     payload: EmojiUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> Emoji:
-    submission = session.get(EmojiSubmission, emoji_id)
+    submission = await session.get(EmojiSubmission, emoji_id)
     if submission is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Emoji not found")
-
-    if submission.submitter_id == current_user.id:
-        pass
-    elif submission.submitter_id is None and submission.submitter_email == current_user.email:
-        pass
-    else:
+    if not _is_owner(submission, current_user):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to edit")
 
-    if payload.symbol is not None:
-        submission.symbol = payload.symbol
-    if payload.title is not None:
-        submission.title = payload.title
-    if payload.description is not None:
-        submission.description = payload.description
-    if payload.category is not None:
-        submission.category = payload.category
-    if payload.keywords is not None:
-        submission.keyword_list = payload.keywords
-
+    _apply_update(submission, payload)
     session.add(submission)
-    session.commit()
-    session.refresh(submission)
+    await _commit_unique(session)
+    await catalog_version.bump_async()
+    await session.refresh(submission)
 
-    return Emoji(
-        id=submission.id,
-        symbol=submission.symbol,
-        title=submission.title,
-        description=submission.description,
-        category=submission.category,
-        keywords=submission.keyword_list,
-        submitter_email=submission.submitter_email,
-        can_delete=True,
-    )
+    return _owned_emoji(submission)
 
 
 @router.delete("/{emoji_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_emoji(
+async def delete_emoji(
     emoji_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ) -> None:
-    submission = session.get(EmojiSubmission, emoji_id)
+    submission = await session.get(EmojiSubmission, emoji_id)
     if submission is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Emoji not found")
-
-    if submission.submitter_id == current_user.id:
-        pass
-    elif submission.submitter_id is None and submission.submitter_email == current_user.email:
-        pass
-    else:
+    if not _is_owner(submission, current_user):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed to delete")
 
-    session.delete(submission)
-    session.commit()
+    await session.delete(submission)
+    await session.commit()
+    await catalog_version.bump_async()
+
+
+async def _load_batch(
+    session: AsyncSession, ids: list[int], user: User
+) -> dict[int, tuple[EmojiSubmission, bool]]:
+    """Fetch every target row, and whether ``user`` owns it, in one query."""
+    statement = select(
+        EmojiSubmission, can_delete_expression(user.id, user.email)
+    ).where(col(EmojiSubmission.id).in_(set(ids)))
+    rows = (await session.exec(statement)).all()
+    return {submission.id: (submission, bool(owned)) for submission, owned in rows}
+
+
+def _rejected(
+    emoji_id: int, loaded: dict[int, tuple[EmojiSubmission, bool]], seen: set[int], action: str
+) -> Optional[EmojiBatchResult]:
+    if emoji_id in seen:
+        return EmojiBatchResult(id=emoji_id, status="invalid", detail="Duplicate id in batch")
+    seen.add(emoji_id)
+    if emoji_id not in loaded:
+        return EmojiBatchResult(id=emoji_id, status="not_found", detail="Emoji not found")
+    if not loaded[emoji_id][1]:
+        return EmojiBatchResult(id=emoji_id, status="forbidden", detail=f"Not allowed to {action}")
+    return None
+
+
+def _target_key(submission: EmojiSubmission, payload: EmojiUpdate) -> tuple[str, str]:
+    symbol = payload.symbol if payload.symbol is not None else submission.symbol
+    title = payload.title if payload.title is not None else submission.title
+    return symbol, title
+
+
+@router.patch(":batch", response_model=EmojiBatchReport)
+async def update_emojis(
+    payload: EmojiBatchUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> EmojiBatchReport:
+    loaded = await _load_batch(session, [item.id for item in payload.items], current_user)
+
+    results: dict[int, EmojiBatchResult] = {}
+    accepted = []
+    seen: set[int] = set()
+    for index, item in enumerate(payload.items):
+        rejected = _rejected(item.id, loaded, seen, "edit")
+        if rejected is not None:
+            results[index] = rejected
+        else:
+            accepted.append((index, item))
+
+    # Resolve (symbol, title) clashes up front so one bad row does not sink the transaction.
+    targets = {index: _target_key(loaded[item.id][0], item) for index, item in accepted}
+    taken: set[tuple[str, str]] = set()
+    if targets:
+        statement = select(EmojiSubmission.symbol, EmojiSubmission.title).where(
+            tuple_(EmojiSubmission.symbol, EmojiSubmission.title).in_(set(targets.values())),
+            col(EmojiSubmission.id).not_in([item.id for _, item in accepted]),
+        )
+        taken = set((await session.exec(statement)).all())
+    claims = Counter(targets.values())
+    conflicts = {index for index, target in targets.items() if claims[target] > 1}
+    # a rejected row keeps its current key, which may in turn be another row's target
+    while True:
+        conflicts |= {index for index, target in targets.items() if target in taken}
+        held = {
+            (loaded[item.id][0].symbol, loaded[item.id][0].title)
+            for index, item in accepted
+            if index in conflicts
+        }
+        if held <= taken:
+            break
+        taken |= held
+
+    # Rows are written one savepoint at a time. A row can still clash with a key another row
+    # in the batch has yet to give up, so clashing rows are retried while others make
+    # progress; rows that only trade keys among themselves, like a swap, stay conflicts.
+    updated = []
+    pending = [(index, item) for index, item in accepted if index not in conflicts]
+    while pending:
+        clashed = []
+        for index, item in pending:
+            submission = loaded[item.id][0]
+            try:
+                async with session.begin_nested():
+                    _apply_update(submission, item)
+            except IntegrityError:
+                # the rolled-back savepoint expired the row; load it again before any retry
+                await session.refresh(submission)
+                clashed.append((index, item))
+            else:
+                updated.append((index, submission))
+        if len(clashed) == len(pending):
+            conflicts.update(index for index, _ in clashed)
+            break
+        pending = clashed
+    for index, item in accepted:
+        if index in conflicts:
+            results[index] = EmojiBatchResult(
+                id=item.id, status="conflict", detail="Emoji already exists"
+            )
+
+    if updated:
+        await _commit_unique(session)
+        await catalog_version.bump_async()
+    for index, submission in updated:
+        results[index] = EmojiBatchResult(
+            id=submission.id, status="updated", emoji=_owned_emoji(submission)
+        )
+
+    return EmojiBatchReport(results=[results[index] for index in range(len(payload.items))])
+
+
+@router.delete(":batch", response_model=EmojiBatchReport)
+async def delete_emojis(
+    payload: EmojiBatchDelete,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+) -> EmojiBatchReport:
+    loaded = await _load_batch(session, payload.ids, current_user)
+
+    results = []
+    deleted: list[int] = []
+    seen: set[int] = set()
+    for emoji_id in payload.ids:
+        rejected = _rejected(emoji_id, loaded, seen, "delete")
+        if rejected is None:
+            deleted.append(emoji_id)
+            rejected = EmojiBatchResult(id=emoji_id, status="deleted")
+        results.append(rejected)
+
+    if deleted:
+        # Bulk deletes skip the per-row ORM hook that clears the keyword index.
+        await session.exec(delete(EmojiKeyword).where(col(EmojiKeyword.emoji_id).in_(deleted)))
+        await session.exec(delete(EmojiSubmission).where(col(EmojiSubmission.id).in_(deleted)))
+        track_changes(session.sync_session, deleted=deleted)
+        await session.commit()
+        await catalog_version.bump_async()
+
+    return EmojiBatchReport(results=results)
 
 
 __all__ = ["router"]
@@ -1,5 +1,11 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
+from app.core.metrics import gauge, metrics
+from app.db import read_replicas
+from app.suggest import suggest_index
+
+from .caching import list_response_cache
 from .endpoints import auth, emojis
 
 router = APIRouter()
@@ -9,7 +15,36 @@ router.include_router(emojis.router)
 
 @router.get("/health", tags=["system"])
 async def health_check() -> dict[str, str]:
-    return {"status": "ok"}
+    body = {"status": "ok"}
+    if len(read_replicas):
+        body["read_replicas"] = f"{read_replicas.healthy()}/{len(read_replicas)} healthy"
+    return body
+
+
+@router.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    extra = gauge(
+        "suggest_index_entries", "Emojis in the autocomplete index.", {(): len(suggest_index)}
+    )
+    if list_response_cache is not None:
+        stats = list_response_cache.stats()
+        extra += gauge(
+            "response_cache_lookups",
+            "Emoji list response cache lookups since start, by result.",
+            {("hit",): stats["hits"], ("miss",): stats["misses"]},
+            labels=("result",),
+        )
+    return PlainTextResponse(
+        metrics.render(extra), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@router.get("/cache/stats", tags=["system"])
+async def cache_stats() -> dict[str, dict[str, float]]:
+    stats: dict[str, dict[str, float]] = {}
+    if list_response_cache is not None:
+        stats["emoji_list"] = list_response_cache.stats()
+    return stats
 
 
 __all__ = ["router"]
@@ -0,0 +1,116 @@
+"""Response builders for hot read paths.
+
+Rows read back from the database were validated when they were written, so these build plain
+dicts shaped like the response schemas and encode them with orjson, skipping the per-item
+``Emoji`` validation and FastAPI's ``response_model`` pass.
+"""
+from __future__ import annotations
+
+import csv
+import io
+from typing import Any, Optional
+
+import orjson
+
+from app.models.emoji import split_keywords
+
+
+def emoji_payload(row: Any) -> dict[str, Any]:
+    """Payload for a ``list_statement`` row."""
+    return {
+        "symbol": row.symbol,
+        "title": row.title,
+        "description": row.description,
+        "category": row.category,
+        "keywords": split_keywords(row.keywords),
+        "id": row.id,
+        "submitter_email": row.submitter_email,
+        "can_delete": bool(row.can_delete),
+    }
+
+
+EXPORT_CSV_COLUMNS = (
+    "id",
+    "symbol",
+    "title",
+    "description",
+    "category",
+    "keywords",
+    "submitter_email",
+    "created_at",
+)
+
+
+def export_ndjson_chunk(rows: list[Any]) -> bytes:
+    """One NDJSON line per ``export_statement`` row."""
+    return b"".join(
+        orjson.dumps(
+            {
+                "id": row.id,
+                "symbol": row.symbol,
+                "title": row.title,
+                "description": row.description,
+                "category": row.category,
+                "keywords": split_keywords(row.keywords),
+                "submitter_email": row.submitter_email,
+                "created_at": row.created_at,
+            },
+            option=orjson.OPT_APPEND_NEWLINE,
+        )
+        for row in rows
+    )
+
+
+def export_csv_chunk(rows: list[Any], *, header: bool = False) -> bytes:
+    """CSV lines for ``export_statement`` rows; ``keywords`` stays comma-joined in one cell."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(EXPORT_CSV_COLUMNS)
+    writer.writerows(
+        (
+            row.id,
+            row.symbol,
+            row.title,
+            row.description,
+            row.category,
+            row.keywords,
+            row.submitter_email,
+            row.created_at.isoformat() if row.created_at else None,
+        )
+        for row in rows
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+def emoji_list_payload(
+    items: list[dict[str, Any]],
+    *,
+    total: Optional[int],
+    limit: int,
+    offset: int,
+    next_cursor: Optional[str],
+    facets: Optional[dict[str, list[dict[str, Any]]]] = None,
+) -> dict[str, Any]:
+    return {
+        "items": items,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_cursor": next_cursor,
+        "facets": facets,
+    }
+
+
+def dump_json(payload: Any) -> bytes:
+    return orjson.dumps(payload)
+
+
+__all__ = [
+    "EXPORT_CSV_COLUMNS",
+    "dump_json",
+    "emoji_list_payload",
+    "emoji_payload",
+    "export_csv_chunk",
+    "export_ndjson_chunk",
+]
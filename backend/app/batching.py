@@ -0,0 +1,107 @@
+"""Group commit for emoji submissions.
+
+When ``emoji_create_batch_window_ms`` is set, ``POST /emojis`` queues its row on
+``create_batcher``. The queue is flushed when the window closes or when
+``emoji_create_batch_max_items`` rows are waiting. Each flush inserts the rows with
+``insert_emojis`` in one transaction, so a burst of submissions pays for one commit
+instead of one per request.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.catalog import catalog_version
+from app.core.config import settings
+from app.importer import insert_emojis
+
+# (row, future resolved with the new id)
+_Pending = tuple[dict[str, Any], "asyncio.Future[int]"]
+
+
+class DuplicateEmoji(Exception):
+    """The (symbol, title) pair already exists, or an earlier row in the batch claimed it."""
+
+
+def _insert_and_commit(session: Session, rows: list[dict[str, Any]]) -> dict[tuple[str, str], int]:
+    created = insert_emojis(session, rows)
+    session.commit()
+    return created
+
+
+class CreateBatcher:
+    def __init__(self, window_ms: float, max_items: int) -> None:
+        self.window_ms = window_ms
+        self.max_items = max_items
+        self._pending: list[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_ms > 0
+
+    async def submit(
+        self, session_factory: async_sessionmaker[AsyncSession], row: dict[str, Any]
+    ) -> int:
+        """Queue one submission row; returns its id once the batch has committed.
+
+        Raises ``DuplicateEmoji`` if the row was not inserted because of its (symbol, title).
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[int] = loop.create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_items:
+            self._flush_now(session_factory)
+        elif self._timer is None:
+            self._timer = loop.call_later(
+                self.window_ms / 1000, self._flush_now, session_factory
+            )
+        # shielded so a client disconnecting cannot cancel the outcome for the rest of the batch
+        return await asyncio.shield(future)
+
+    def _flush_now(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._flush(session_factory, batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(
+        self, session_factory: async_sessionmaker[AsyncSession], batch: list[_Pending]
+    ) -> None:
+        unique: dict[tuple[str, str], dict[str, Any]] = {}
+        for row, _ in batch:
+            unique.setdefault((row["symbol"], row["title"]), row)
+        try:
+            async with session_factory() as session:
+                created = await session.run_sync(_insert_and_commit, list(unique.values()))
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        if created:
+            await catalog_version.bump_async()
+        for row, future in batch:
+            key = (row["symbol"], row["title"])
+            if unique.get(key) is row and key in created:
+                future.set_result(created[key])
+            else:
+                future.set_exception(DuplicateEmoji("Emoji already exists"))
+
+
+create_batcher = CreateBatcher(
+    settings.emoji_create_batch_window_ms, settings.emoji_create_batch_max_items
+)
+
+
+__all__ = ["CreateBatcher", "DuplicateEmoji", "create_batcher"]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import secrets
+import threading
+from typing import Callable, Optional, Protocol
+
+from starlette.concurrency import run_in_threadpool
+
+
+class VersionStore(Protocol):
+    """Version counter kept outside the process, shared by every worker using it."""
+
+    def read_version(self) -> str: ...
+
+    def bump_version(self) -> str: ...
+
+
+class CatalogVersion:
+    """Counter bumped on every catalog write, used to validate cached list responses.
+
+    On its own the value carries a random per-process epoch, so versions issued before a
+    restart (or by another worker) never match the current one. Once ``share``d, the value
+    lives in a ``VersionStore`` and every worker using that store agrees on it.
+    """
+
+    def __init__(self) -> None:
+        self._epoch = secrets.token_hex(4)
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._listeners: list[Callable[[], None]] = []
+        self._store: Optional[VersionStore] = None
+
+    def share(self, store: Optional[VersionStore]) -> None:
+        """Read and bump the version through ``store``; ``None`` goes back to a local counter."""
+        self._store = store
+
+    @property
+    def shared(self) -> bool:
+        return self._store is not None
+
+    @property
+    def value(self) -> str:
+        if self._store is not None:
+            return self._store.read_version()
+        return f"{self._epoch}.{self._counter}"
+
+    async def value_async(self) -> str:
+        """``value``, reading a shared store off the event loop."""
+        if self._store is not None:
+            return await run_in_threadpool(self._store.read_version)
+        return self.value
+
+    def subscribe(self, listener: Callable[[], None]) -> None:
+        """Call ``listener`` after every bump, e.g. to drop caches derived from the catalog."""
+        self._listeners.append(listener)
+
+    def bump(self) -> str:
+        if self._store is not None:
+            value = self._store.bump_version()
+        else:
+            with self._lock:
+                self._counter += 1
+                value = self.value
+        self._notify()
+        return value
+
+    async def bump_async(self) -> str:
+        if self._store is not None:
+            return await run_in_threadpool(self.bump)
+        return self.bump()
+
+    def bumped_elsewhere(self) -> None:
+        """Another worker bumped the catalog: follow it and tell the listeners."""
+        if self._store is None:
+            self.bump()
+        else:
+            # the shared store already holds the new value
+            self._notify()
+
+    def _notify(self) -> None:
+        for listener in self._listeners:
+            listener()
+
+
+catalog_version = CatalogVersion()
+
+
+__all__ = ["CatalogVersion", "VersionStore", "catalog_version"]
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Callable, Optional, Protocol
+
+from starlette.concurrency import run_in_threadpool
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after being set."""
+
+    def __init__(
+        self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= self._timer():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._timer() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend(Protocol):
+    """Storage behind a ``ResponseCache``; implementations must be thread-safe."""
+
+    # whether calls do I/O and so must stay off the event loop
+    blocking: bool
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryCacheBackend:
+    """Per-process LRU+TTL storage."""
+
+    blocking = False
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._cache = TTLCache(maxsize, ttl)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self._cache.set(key, value)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class SQLiteCacheBackend:
+    """Storage in a local SQLite file, shared by every worker process on the host.
+
+    The file also holds a version counter, so that workers keying entries by it agree on
+    which entries are current.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self._path = path
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_response_cache_expires_at "
+            "ON response_cache (expires_at)"
+        )
+        # the epoch keeps versions from a deleted and recreated file from matching old ETags
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_version ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), epoch TEXT NOT NULL, counter INTEGER NOT NULL)"
+        )
+        connection.execute(
+            "INSERT OR IGNORE INTO cache_version (id, epoch, counter) VALUES (1, ?, 0)",
+            (secrets.token_hex(4),),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=1.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=wal")
+            connection.execute("PRAGMA synchronous=off")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT value FROM response_cache WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, now + self.ttl),
+        )
+        connection.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM response_cache WHERE key IN (SELECT key FROM response_cache "
+            "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM response_cache")
+
+    def read_version(self) -> str:
+        epoch, counter = self._connection().execute(
+            "SELECT epoch, counter FROM cache_version"
+        ).fetchone()
+        return f"{epoch}.{counter}"
+
+    def bump_version(self) -> str:
+        epoch, counter = self._connection().execute(
+            "UPDATE cache_version SET counter = counter + 1 RETURNING epoch, counter"
+        ).fetchone()
+        return f"{epoch}.{counter}"
+
+
+class ResponseCache:
+    """Serialized-response cache that tracks its hit rate and hit latency."""
+
+    def __init__(self, backend: CacheBackend) -> None:
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.hit_seconds = 0.0
+
+    def get(self, key: str) -> Optional[bytes]:
+        started = time.perf_counter()
+        value = self.backend.get(key)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.hit_seconds += elapsed
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self.backend.set(key, value)
+
+    async def get_async(self, key: str) -> Optional[bytes]:
+        if self.backend.blocking:
+            return await run_in_threadpool(self.get, key)
+        return self.get(key)
+
+    async def set_async(self, key: str, value: bytes) -> None:
+        if self.backend.blocking:
+            await run_in_threadpool(self.set, key, value)
+        else:
+            self.set(key, value)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = 0
+            self.hit_seconds = 0.0
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "avg_hit_latency_ms": 1000 * self.hit_seconds / self.hits if self.hits else 0.0,
+            }
+
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCacheBackend",
+    "ResponseCache",
+    "SQLiteCacheBackend",
+    "TTLCache",
+]
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,7 +9,42 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
     database_url: str = "sqlite:///./app.db"
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_recycle: int = 1800
+    # None: ping before checkout for network databases only, not for SQLite files
+    database_pool_pre_ping: Optional[bool] = None
+    database_read_urls: list[str] = []
+    read_replica_retry_seconds: float = 5.0
+    read_your_writes_seconds: float = 5.0
+    read_your_writes_max_entries: int = 10_000
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
     cors_origins: list[str] = ["*"]
+    emoji_list_max_age_seconds: int = 0
+    emoji_list_snapshot: bool = False
+    response_cache_backend: str = "memory"
+    response_cache_path: str = "./response_cache.db"
+    response_cache_ttl_seconds: float = 30.0
+    response_cache_max_entries: int = 1024
+    invalidation_backend: str = "none"
+    invalidation_path: str = "./invalidation.db"
+    invalidation_poll_seconds: float = 0.5
+    invalidation_retention_seconds: float = 300.0
+    auth_cache_ttl_seconds: float = 30.0
+    auth_cache_max_entries: int = 10_000
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 32
+    emoji_create_batch_window_ms: float = 0.0
+    emoji_create_batch_max_items: int = 64
+    slow_query_threshold_ms: float = 250.0
+    slow_query_explain: bool = True
+    profiling_sample_rate: float = 0.0
+    profiling_token: str = ""
+    profiling_output_dir: str = "./profiles"
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
@@ -0,0 +1,199 @@
+"""Broadcast cache invalidations to every worker process.
+
+Each worker keeps in-process caches, so a write served by one worker leaves the others
+stale until their entries expire. Workers publish what they changed on an
+``InvalidationChannel``, and an ``InvalidationBus`` in every worker polls the channel and
+hands events from the other workers to the registered handlers. Publishing only queues the
+event; the poll, which runs off the event loop, sends it.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, Optional, Protocol
+
+from app.core.config import Settings
+
+logger = logging.getLogger("app.invalidation")
+
+# event kind sent by a channel that may have dropped events; handlers should drop everything
+RESYNC = "resync"
+
+
+class InvalidationChannel(Protocol):
+    """Transport between workers; implementations must be thread-safe."""
+
+    def publish(self, kind: str, payload: Any) -> None:
+        """Queue an event without blocking; ``flush`` or ``poll`` sends it."""
+        ...
+
+    def flush(self) -> None: ...
+
+    def poll(self) -> list[tuple[str, Any]]:
+        """Send queued events, then return those published by other workers since the last
+        poll, oldest first."""
+        ...
+
+
+class SQLiteInvalidationChannel:
+    """Events appended to a local SQLite file that every worker on the host polls."""
+
+    def __init__(self, path: str, retention_seconds: float = 300.0) -> None:
+        self.origin = secrets.token_hex(8)
+        self.retention_seconds = retention_seconds
+        self._path = path
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS invalidation_event ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, kind TEXT NOT NULL, "
+            "payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._last_id = self._latest_id(connection)
+        self._poll_lock = threading.Lock()
+        self._outbox: deque[tuple[str, str]] = deque()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._path, timeout=1.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=wal")
+            connection.execute("PRAGMA synchronous=normal")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _latest_id(connection: sqlite3.Connection) -> int:
+        # AUTOINCREMENT keeps the last id handed out even after its row is pruned
+        row = connection.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'invalidation_event'"
+        ).fetchone()
+        return 0 if row is None else row[0]
+
+    def publish(self, kind: str, payload: Any) -> None:
+        self._outbox.append((kind, json.dumps(payload)))
+
+    def flush(self) -> None:
+        events = []
+        while self._outbox:
+            events.append(self._outbox.popleft())
+        if not events:
+            return
+        now = time.time()
+        connection = self._connection()
+        try:
+            with connection:
+                connection.execute("BEGIN")
+                connection.executemany(
+                    "INSERT INTO invalidation_event (origin, kind, payload, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(self.origin, kind, payload, now) for kind, payload in events],
+                )
+                connection.execute(
+                    "DELETE FROM invalidation_event WHERE created_at < ?",
+                    (now - self.retention_seconds,),
+                )
+        except sqlite3.Error:
+            # keep them, in order, for the next attempt
+            self._outbox.extendleft(reversed(events))
+            raise
+
+    def poll(self) -> list[tuple[str, Any]]:
+        self.flush()
+        connection = self._connection()
+        with self._poll_lock:
+            with connection:
+                connection.execute("BEGIN")
+                latest = self._latest_id(connection)
+                rows = connection.execute(
+                    "SELECT id, origin, kind, payload FROM invalidation_event "
+                    "WHERE id > ? AND id <= ? ORDER BY id",
+                    (self._last_id, latest),
+                ).fetchall()
+            # events this worker had not seen yet were pruned before it polled
+            missed = latest > self._last_id + len(rows)
+            self._last_id = latest
+        events = [
+            (kind, json.loads(payload))
+            for _, origin, kind, payload in rows
+            if origin != self.origin
+        ]
+        return [(RESYNC, None)] if missed else events
+
+
+class InvalidationBus:
+    def __init__(self, channel: InvalidationChannel, poll_seconds: float = 0.5) -> None:
+        self.channel = channel
+        self.poll_seconds = poll_seconds
+        self._handlers: dict[str, list[Callable[[Any], None]]] = {}
+        self._applying = threading.local()
+
+    def on(self, kind: str, handler: Callable[[Any], None]) -> None:
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def publish(self, kind: str, payload: Any = None) -> None:
+        # handlers applying a remote event must not echo it back to the other workers
+        if getattr(self._applying, "active", False):
+            return
+        try:
+            self.channel.publish(kind, payload)
+        except Exception:
+            logger.exception("Could not publish %s invalidation", kind)
+
+    @contextmanager
+    def _remote(self) -> Iterator[None]:
+        self._applying.active = True
+        try:
+            yield
+        finally:
+            self._applying.active = False
+
+    def flush(self) -> None:
+        try:
+            self.channel.flush()
+        except Exception:
+            logger.exception("Could not send queued invalidations")
+
+    def poll(self) -> int:
+        """Send this worker's events and apply the others'; returns how many were received."""
+        events = self.channel.poll()
+        with self._remote():
+            for kind, payload in events:
+                for handler in self._handlers.get(kind, ()):
+                    handler(payload)
+        return len(events)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await asyncio.to_thread(self.poll)
+            except Exception:
+                logger.exception("Invalidation poll failed")
+
+
+def build_invalidation_bus(config: Settings) -> Optional[InvalidationBus]:
+    """The configured bus, or ``None`` when ``invalidation_backend`` is "none"."""
+    if config.invalidation_backend == "sqlite":
+        channel = SQLiteInvalidationChannel(
+            config.invalidation_path, config.invalidation_retention_seconds
+        )
+        return InvalidationBus(channel, config.invalidation_poll_seconds)
+    return None
+
+
+__all__ = [
+    "RESYNC",
+    "InvalidationBus",
+    "InvalidationChannel",
+    "SQLiteInvalidationChannel",
+    "build_invalidation_bus",
+]
@@ -0,0 +1,273 @@
+"""Request and database metrics in the Prometheus text format.
+
+``MetricsMiddleware`` times every HTTP request and counts responses by route template and
+status. Cursor-execute hooks on every SQLAlchemy engine count the queries a request runs and
+the time they take, so an N+1 shows up as a jump in ``db_queries_per_request``. A
+``Server-Timing`` header repeats the database share of each response for browser devtools.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+QUERY_LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+# label for requests that matched no route, so unknown paths cannot inflate the series count
+UNMATCHED_ROUTE = "unmatched"
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    query_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label tuple."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # one slot per bucket, then +Inf, sum
+                series = self._series[label_values] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            bounds = [repr(float(bound)) for bound in self.buckets]
+            for bound, count in zip((*bounds, "+Inf"), series):
+                labels = _labels((*self.labels, "le"), (*label_values, bound))
+                yield f"{self.name}_bucket{labels} {_number(count)}"
+            labels = _labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_number(series[-1])}"
+            yield f"{self.name}_count{labels} {_number(series[-2])}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            snapshot = dict(self._values)
+        for label_values, value in sorted(snapshot.items()):
+            yield f"{self.name}{_labels(self.labels, label_values)} {_number(value)}"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _number(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def gauge(name: str, help_text: str, samples: dict[tuple[str, ...], float], labels=()) -> list[str]:
+    """Render a gauge whose values are read at scrape time."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for label_values, value in sorted(samples.items()):
+        lines.append(f"{name}{_labels(labels, label_values)} {_number(value)}")
+    return lines
+
+
+class Metrics:
+    def __init__(self) -> None:
+        route = ("method", "route")
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Time to serve a request.", route, LATENCY_BUCKETS
+        )
+        self.responses = Counter(
+            "http_responses_total", "Responses sent, by status code.", (*route, "status")
+        )
+        self.request_queries = Histogram(
+            "db_queries_per_request",
+            "Database queries run while serving a request.",
+            route,
+            QUERY_COUNT_BUCKETS,
+        )
+        self.request_query_seconds = Counter(
+            "db_query_seconds_total", "Time spent in database queries, by route.", route
+        )
+        self.query_duration = Histogram(
+            "db_query_duration_seconds", "Time per database query.", (), QUERY_LATENCY_BUCKETS
+        )
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def request_started(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def request_finished(
+        self, method: str, route: str, status: int, seconds: float, stats: RequestStats
+    ) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self.request_duration.observe(seconds, method, route)
+        self.responses.inc(1, method, route, str(status))
+        self.request_queries.observe(stats.queries, method, route)
+        self.request_query_seconds.inc(stats.query_seconds, method, route)
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        lines = [
+            *self.request_duration.render(),
+            *self.responses.render(),
+            *gauge("http_requests_in_flight", "Requests being served.", {(): self.in_flight}),
+            *self.request_queries.render(),
+            *self.request_query_seconds.render(),
+            *self.query_duration.render(),
+            *extra,
+        ]
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        for metric in (
+            self.request_duration,
+            self.responses,
+            self.request_queries,
+            self.request_query_seconds,
+            self.query_duration,
+        ):
+            metric.clear()
+
+
+metrics = Metrics()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+    metrics.query_duration.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_query_timer(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding ``metrics``; add it outermost so it times the whole stack."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+        metrics.request_started()
+
+        async def send_with_timing(message: dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                timing = (
+                    f'db;dur={stats.query_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.1f}"
+                )
+                headers = [*message.get("headers", []), (b"server-timing", timing.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            metrics.request_finished(
+                scope["method"], route_path, status_code, time.perf_counter() - started, stats
+            )
+            _request_stats.reset(token)
+
+
+__all__ = [
+    "Counter",
+    "Histogram",
+    "Metrics",
+    "MetricsMiddleware",
+    "RequestStats",
+    "gauge",
+    "metrics",
+]
@@ -0,0 +1,92 @@
+"""Opt-in cProfile capture of individual requests.
+
+A request is profiled when it carries ``X-Profile: <profiling_token>`` or is picked by
+``profiling_sample_rate``. The profile is written to ``profiling_output_dir`` as
+``<id>.prof`` (open it with ``python -m pstats`` or snakeviz), its hottest functions are
+logged, and the response names it in an ``X-Profile-Id`` header.
+
+cProfile follows the thread rather than the request, so work that other requests do on the
+event loop while the profiled one awaits is included too. Only one request is profiled at a
+time.
+"""
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import secrets
+import threading
+import time
+from typing import Any, Callable
+
+from app.core.config import settings
+
+PROFILE_HEADER = b"x-profile"
+
+profile_logger = logging.getLogger("app.profiling")
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: Any, chance: Callable[[], float] = random.random) -> None:
+        self.app = app
+        self._chance = chance
+        self._busy = threading.Lock()
+
+    def _wanted(self, scope: dict) -> bool:
+        token = settings.profiling_token
+        if token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return secrets.compare_digest(value.decode("latin-1"), token)
+        rate = settings.profiling_sample_rate
+        return rate > 0 and self._chance() < rate
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(4)}"
+
+        async def send_with_id(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                headers = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                profiler.disable()
+            self._save(profiler, profile_id, scope)
+        finally:
+            self._busy.release()
+
+    @staticmethod
+    def _save(profiler: cProfile.Profile, profile_id: str, scope: dict) -> None:
+        os.makedirs(settings.profiling_output_dir, exist_ok=True)
+        path = os.path.join(settings.profiling_output_dir, f"{profile_id}.prof")
+        profiler.dump_stats(path)
+
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(25)
+        profile_logger.info(
+            "profile %s for %s %s saved to %s\n%s",
+            profile_id,
+            scope["method"],
+            scope["path"],
+            path,
+            summary.getvalue(),
+        )
+
+
+__all__ = ["PROFILE_HEADER", "ProfilingMiddleware", "profile_logger"]
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 import bcrypt
 from jose import jwt
@@ -9,12 +12,64 @@ from jose import jwt
 from .config import settings
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the password hashing pool and its queue are full."""
+
+
+# bcrypt releases the GIL, so a small dedicated pool keeps hashing off the request threads
+# while capping how much CPU a login burst can take.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="password-hash"
+)
+_hash_slots = threading.BoundedSemaphore(
+    settings.password_hash_workers + settings.password_hash_max_queue
+)
+
+
+def _submit_hashing(fn: Callable[..., Any], *args: Any) -> Future:
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Password hashing queue is full")
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+def _hashpw(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _submit_hashing(_checkpw, plain_password, hashed_password).result()
+
+
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return _submit_hashing(_hashpw, password).result()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(_submit_hashing(_checkpw, plain_password, hashed_password))
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit_hashing(_hashpw, password))
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether ``hashed_password`` was made with a different cost than ``bcrypt_rounds``."""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return False
+    return rounds != settings.bcrypt_rounds
 
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
@@ -44,10 +99,14 @@ def verify_password_reset_token(token: str) -> Optional[str]:
 
 
 __all__ = [
+    "PasswordHasherBusy",
     "create_access_token",
     "decode_token",
     "hash_password",
+    "hash_password_async",
+    "password_needs_rehash",
     "verify_password",
+    "verify_password_async",
     "create_password_reset_token",
     "verify_password_reset_token",
 ]
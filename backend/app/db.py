@@ -1,21 +1,314 @@
-from collections.abc import Iterator
+import itertools
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
 
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session as ORMSession
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from .core.cache import TTLCache
 from .core.config import settings
 
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
-engine = create_engine(settings.database_url, connect_args=connect_args)
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_database_url(database_url: str) -> str:
+    """Map a sync database URL onto its async driver (aiosqlite, asyncpg)."""
+    url = make_url(database_url)
+    url = url.set(drivername=_ASYNC_DRIVERS.get(url.drivername, url.drivername))
+    return url.render_as_string(hide_password=False)
+
+
+def engine_options(database_url: str) -> dict[str, Any]:
+    """Pool and driver options for ``database_url`` taken from settings."""
+    url = make_url(database_url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    pre_ping = settings.database_pool_pre_ping
+    options: dict[str, Any] = {
+        # a local file cannot drop the connection, so the extra round trip buys nothing
+        "pool_pre_ping": not is_sqlite if pre_ping is None else pre_ping,
+        "pool_recycle": settings.database_pool_recycle,
+    }
+    if is_sqlite:
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # in-memory databases live on a single connection; there is no pool to size
+            return options
+    options["pool_size"] = settings.database_pool_size
+    options["max_overflow"] = settings.database_max_overflow
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection: Any, connection_record: Any = None) -> None:
+    """Tune a new SQLite connection; WAL lets readers proceed while a write commits."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    finally:
+        cursor.close()
+
+
+slow_query_logger = logging.getLogger("app.db.slow_query")
+
+_EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "postgresql": "EXPLAIN "}
+
+
+def _explain(connection: Any, statement: str, parameters: Any) -> str:
+    prefix = _EXPLAIN_PREFIXES.get(connection.dialect.name)
+    if prefix is None or not statement.lstrip().upper().startswith("SELECT"):
+        return ""
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(str(row[-1]) for row in cursor.fetchall())
+    except Exception as exc:  # the plan is a diagnostic extra; never fail the query over it
+        return f"(EXPLAIN failed: {exc})"
+    finally:
+        cursor.close()
+
+
+def install_slow_query_log(target: Engine, threshold_ms: float, explain: bool = True) -> None:
+    """Log statements on ``target`` slower than ``threshold_ms``; 0 or less disables it."""
+    if threshold_ms <= 0:
+        return
+
+    def start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    def check_duration(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed_ms = (time.perf_counter() - conn.info["slow_query_started"].pop()) * 1000
+        if elapsed_ms < threshold_ms:
+            return
+        plan = _explain(conn, statement, parameters) if explain and not executemany else ""
+        slow_query_logger.warning(
+            "slow query (%.1f ms): %s\nparameters: %.500r%s",
+            elapsed_ms,
+            statement,
+            parameters,
+            f"\nplan:\n{plan}" if plan else "",
+        )
+
+    def discard_timer(exception_context) -> None:
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("slow_query_started"):
+            connection.info["slow_query_started"].pop()
+
+    event.listen(target, "before_cursor_execute", start_timer)
+    event.listen(target, "after_cursor_execute", check_duration)
+    event.listen(target, "handle_error", discard_timer)
+
+
+def create_request_engine(database_url: str) -> AsyncEngine:
+    """Async engine for ``database_url`` with the pool, pragma and slow-query settings."""
+    request_engine = create_async_engine(
+        async_database_url(database_url), **engine_options(database_url)
+    )
+    if request_engine.dialect.name == "sqlite":
+        event.listen(request_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    install_slow_query_log(
+        request_engine.sync_engine, settings.slow_query_threshold_ms, settings.slow_query_explain
+    )
+    return request_engine
+
+
+# The sync engine serves init_db and the maintenance scripts; requests use the async engine.
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+install_slow_query_log(engine, settings.slow_query_threshold_ms, settings.slow_query_explain)
+async_engine = create_request_engine(settings.database_url)
+async_session_factory = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+replica_logger = logging.getLogger("app.db.replicas")
+
+
+class ReadReplicas:
+    """Round-robin over read-only copies of the database.
+
+    Sessions from ``session`` pick a replica when they first need a connection, so requests
+    answered from a cache never check one out. A replica that cannot be connected to is
+    skipped for ``retry_after`` seconds and the next replica, or finally the primary, serves
+    the read.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        retry_after: float = 5.0,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.urls = list(urls)
+        self.retry_after = retry_after
+        self._timer = timer
+        self._engines = [create_request_engine(url) for url in self.urls]
+        self._down_until = [0.0] * len(self.urls)
+        self._turns = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def candidates(self) -> list[int]:
+        """Healthy replicas in the order the next read should try them."""
+        now = self._timer()
+        with self._lock:
+            start = next(self._turns)
+        order = [(start + offset) % len(self.urls) for offset in range(len(self.urls))]
+        return [index for index in order if self._down_until[index] <= now]
+
+    def engine(self, index: int) -> Engine:
+        return self._engines[index].sync_engine
+
+    def mark_down(self, index: int) -> None:
+        self._down_until[index] = self._timer() + self.retry_after
+        replica_logger.warning("Read replica %d is unreachable; skipping it", index)
+
+    def healthy(self) -> int:
+        now = self._timer()
+        return sum(1 for down_until in self._down_until if down_until <= now)
+
+    def session(self, primary: async_sessionmaker[AsyncSession]) -> AsyncSession:
+        """A ``primary`` session that reads from the replicas instead."""
+        return primary(sync_session_class=_ReplicaSession, replicas=self)
+
+    async def dispose(self) -> None:
+        for replica in self._engines:
+            await replica.dispose()
+
+
+class _ReplicaSession(Session):
+    """Binds to a replica on first use and moves on to the next one if it cannot connect."""
+
+    def __init__(self, *args: Any, replicas: ReadReplicas, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._replicas = replicas
+        self._candidates: Optional[list[int]] = None
+
+    def on_replica(self) -> bool:
+        """Whether reads go to a replica, i.e. one was reachable; connects to none."""
+        if self._candidates is None:
+            self._candidates = self._replicas.candidates()
+        return bool(self._candidates)
+
+    def get_bind(self, mapper: Any = None, **kwargs: Any) -> Engine:
+        if self.on_replica():
+            return self._replicas.engine(self._candidates[0])
+        return super().get_bind(mapper, **kwargs)
+
+    def _connection_for_bind(
+        self, engine: Any, execution_options: Any = None, **kwargs: Any
+    ) -> Connection:
+        while True:
+            try:
+                return super()._connection_for_bind(engine, execution_options, **kwargs)
+            except (DBAPIError, OSError):
+                if not self._candidates or engine is not self.get_bind():
+                    raise
+                self._replicas.mark_down(self._candidates.pop(0))
+                engine = self.get_bind()
+
+
+read_replicas = ReadReplicas(settings.database_read_urls, settings.read_replica_retry_seconds)
+
+# user id -> True while that user's reads go to the primary after a write
+_primary_pins = TTLCache(
+    settings.read_your_writes_max_entries, settings.read_your_writes_seconds
+)
+_pin_listeners: list[Callable[[int], None]] = []
+_request_user: ContextVar[Optional[int]] = ContextVar("request_user", default=None)
+
+
+def set_request_user(user_id: Optional[int]) -> None:
+    """Attribute commits made while serving this request to ``user_id``."""
+    _request_user.set(user_id)
+
+
+def pin_to_primary(user_id: int) -> None:
+    """Send ``user_id``'s reads to the primary for ``read_your_writes_seconds``."""
+    _primary_pins.set(user_id, True)
+    for listener in _pin_listeners:
+        listener(user_id)
+
+
+def subscribe_pins(listener: Callable[[int], None]) -> None:
+    """Call ``listener`` with the user id of every ``pin_to_primary``."""
+    _pin_listeners.append(listener)
+
+
+def pinned_to_primary(user_id: Optional[int]) -> bool:
+    return user_id is not None and _primary_pins.get(user_id, False)
+
+
+def clear_primary_pins() -> None:
+    _primary_pins.clear()
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _pin_writer(session: ORMSession) -> None:
+    user_id = _request_user.get()
+    if user_id is not None:
+        pin_to_primary(user_id)
+
+
+@asynccontextmanager
+async def read_session(
+    user_id: Optional[int] = None,
+    *,
+    replicas: ReadReplicas = read_replicas,
+    primary: async_sessionmaker[AsyncSession] = async_session_factory,
+) -> AsyncIterator[AsyncSession]:
+    """A replica session, unless ``user_id`` wrote recently or no replica is reachable."""
+    if len(replicas) and not pinned_to_primary(user_id):
+        session = replicas.session(primary)
+    else:
+        session = primary()
+    async with session:
+        yield session
+
+
+def reads_from_replica(session: AsyncSession) -> bool:
+    """Whether ``session`` reads from a replica, which may lag behind the primary."""
+    sync_session = session.sync_session
+    return isinstance(sync_session, _ReplicaSession) and sync_session.on_replica()
+
+
+migration_logger = logging.getLogger("app.db.migrations")
 
 
 def init_db() -> None:
     import app.models  # noqa: F401 - ensure models are registered
-    from app.models import EmojiSubmission
+    from app.facets import install_category_counts, rebuild_category_counts
+    from app.models import CategoryCount, EmojiKeyword, EmojiSubmission
+    from app.models.emoji import rename_duplicate_titles
+    from app.models.keyword import backfill_keywords
+    from app.search import install_search_index
 
+    inspector = inspect(engine)
+    needs_keyword_backfill = not inspector.has_table(EmojiKeyword.__table__.name)
+    needs_category_recount = not inspector.has_table(CategoryCount.__table__.name)
     SQLModel.metadata.create_all(bind=engine)
 
+    table_name = EmojiSubmission.__table__.name
     if settings.database_url.startswith("sqlite"):
-        table_name = EmojiSubmission.__table__.name
         with engine.connect() as connection:
             columns = connection.exec_driver_sql(f"PRAGMA table_info('{table_name}')").fetchall()
             if not columns:
@@ -26,10 +319,58 @@ def init_db() -> None:
                     f"ALTER TABLE {table_name} ADD COLUMN submitter_id INTEGER"
                 )
 
+    with engine.begin() as connection:
+        existing = {index["name"] for index in inspect(connection).get_indexes(table_name)}
+        if "uq_emojisubmission_symbol_title" not in existing:
+            repeated = rename_duplicate_titles(connection)
+            if repeated:
+                migration_logger.warning(
+                    "Numbered the titles of duplicate emojis before adding the unique "
+                    "(symbol, title) index: %s",
+                    ", ".join(f"{symbol} {title!r}" for symbol, title in repeated),
+                )
+        for index in EmojiSubmission.__table__.indexes:
+            index.create(connection, checkfirst=True)
+        install_search_index(connection)
+        install_category_counts(connection)
+        if needs_keyword_backfill:
+            backfill_keywords(connection)
+        if needs_category_recount:
+            rebuild_category_counts(connection)
+
 
-def get_session() -> Iterator[Session]:
-    with Session(engine) as session:
+async def get_session() -> AsyncIterator[AsyncSession]:
+    async with async_session_factory() as session:
         yield session
 
 
-__all__ = ["engine", "get_session", "init_db"]
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """For streaming responses, which outlive the sessions ``get_session`` hands out."""
+    return async_session_factory
+
+
+__all__ = [
+    "ReadReplicas",
+    "apply_sqlite_pragmas",
+    "async_database_url",
+    "async_engine",
+    "async_session_factory",
+    "clear_primary_pins",
+    "create_request_engine",
+    "engine",
+    "engine_options",
+    "get_session",
+    "get_session_factory",
+    "init_db",
+    "install_slow_query_log",
+    "migration_logger",
+    "pin_to_primary",
+    "pinned_to_primary",
+    "read_replicas",
+    "read_session",
+    "reads_from_replica",
+    "replica_logger",
+    "set_request_user",
+    "slow_query_logger",
+    "subscribe_pins",
+]
@@ -0,0 +1,160 @@
+"""Per-category counts for the emoji list.
+
+Unfiltered counts come from ``CategoryCount``, which triggers on the submission table keep
+current on SQLite and Postgres, so reading them costs one row per category. Filtered counts
+(search, keywords) are one GROUP BY over the matching rows. Uncategorised submissions are not
+counted.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlmodel import col
+
+from app.models import CategoryCount, EmojiSubmission
+from app.queries import apply_filters
+
+FACET_FIELDS = ("category",)
+
+# dialects whose triggers maintain CategoryCount
+_COUNTED_DIALECTS = ("sqlite", "postgresql")
+
+
+def _sqlite_statements(source: str, counts: str) -> list[str]:
+    increment = (
+        f"INSERT INTO {counts} (category, emoji_count) SELECT new.category, 1 "
+        "WHERE new.category IS NOT NULL "
+        "ON CONFLICT (category) DO UPDATE SET emoji_count = emoji_count + 1;"
+    )
+    decrement = (
+        f"UPDATE {counts} SET emoji_count = emoji_count - 1 WHERE category = old.category; "
+        f"DELETE FROM {counts} WHERE category = old.category AND emoji_count <= 0;"
+    )
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {counts}_ai AFTER INSERT ON {source} BEGIN
+            {increment}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {counts}_ad AFTER DELETE ON {source} BEGIN
+            {decrement}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {counts}_au AFTER UPDATE OF category ON {source}
+        WHEN old.category IS NOT new.category BEGIN
+            {decrement}
+            {increment}
+        END
+        """,
+    ]
+
+
+def _postgres_statements(source: str, counts: str) -> list[str]:
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION {counts}_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                IF OLD.category IS NOT NULL THEN
+                    UPDATE {counts} SET emoji_count = emoji_count - 1
+                    WHERE category = OLD.category;
+                    DELETE FROM {counts} WHERE category = OLD.category AND emoji_count <= 0;
+                END IF;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                IF NEW.category IS NOT NULL THEN
+                    INSERT INTO {counts} (category, emoji_count) VALUES (NEW.category, 1)
+                    ON CONFLICT (category)
+                    DO UPDATE SET emoji_count = {counts}.emoji_count + 1;
+                END IF;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"DROP TRIGGER IF EXISTS {counts}_sync ON {source}",
+        f"""
+        CREATE TRIGGER {counts}_sync
+        AFTER INSERT OR DELETE OR UPDATE OF category ON {source}
+        FOR EACH ROW
+        EXECUTE FUNCTION {counts}_sync()
+        """,
+    ]
+
+
+def install_category_counts(connection: Connection) -> None:
+    """Create the triggers that maintain ``CategoryCount`` if they are missing."""
+    source = EmojiSubmission.__table__.name
+    counts = CategoryCount.__table__.name
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        statements = _sqlite_statements(source, counts)
+    elif dialect == "postgresql":
+        statements = _postgres_statements(source, counts)
+    else:
+        return
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def rebuild_category_counts(connection: Connection) -> int:
+    """Recount ``CategoryCount`` from scratch; returns the number of categories."""
+    table = CategoryCount.__table__
+    source = EmojiSubmission.__table__
+    connection.execute(delete(table))
+    grouped = (
+        select(source.c.category, func.count())
+        .where(source.c.category.is_not(None))
+        .group_by(source.c.category)
+    )
+    result = connection.execute(
+        insert(table).from_select(["category", "emoji_count"], grouped)
+    )
+    return result.rowcount
+
+
+def category_facet_statement(
+    *,
+    dialect: str,
+    search: Optional[str] = None,
+    keywords: Optional[list[str]] = None,
+    keyword_mode: str = "all",
+) -> Any:
+    """(category, count) rows, largest first, for submissions matching the filters.
+
+    The category filter itself is not applied, so every alternative category is counted.
+    """
+    if not search and not keywords and dialect in _COUNTED_DIALECTS:
+        return select(CategoryCount.category, CategoryCount.emoji_count).order_by(
+            col(CategoryCount.emoji_count).desc(), CategoryCount.category
+        )
+
+    count = func.count().label("emoji_count")
+    statement = select(EmojiSubmission.category, count).select_from(EmojiSubmission)
+    statement = apply_filters(
+        statement, dialect=dialect, search=search, keywords=keywords, keyword_mode=keyword_mode
+    )
+    return (
+        statement.where(col(EmojiSubmission.category).is_not(None))
+        .group_by(EmojiSubmission.category)
+        .order_by(count.desc(), EmojiSubmission.category)
+    )
+
+
+def _handle_table_created(target: Any, connection: Connection, **_: Any) -> None:
+    install_category_counts(connection)
+
+
+event.listen(EmojiSubmission.__table__, "after_create", _handle_table_created)
+
+
+__all__ = [
+    "FACET_FIELDS",
+    "category_facet_statement",
+    "install_category_counts",
+    "rebuild_category_counts",
+]
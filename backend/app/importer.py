@@ -0,0 +1,309 @@
+"""Bulk emoji import from NDJSON or CSV.
+
+Records are validated against ``EmojiCreate`` in batches. Each batch is inserted with one
+multi-row ``INSERT ... ON CONFLICT DO NOTHING RETURNING`` in its own transaction, so
+duplicates on (symbol, title) are resolved by the unique index instead of per-row lookups.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from collections import deque
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import EmojiKeyword, EmojiSubmission
+from app.models.emoji import join_keywords
+from app.models.keyword import keyword_rows
+from app.schemas import EmojiCreate
+from app.suggest import track_changes
+
+IMPORT_FORMATS = ("ndjson", "csv")
+CSV_COLUMNS = ("symbol", "title", "description", "category", "keywords", "submitter_email")
+# written by the export endpoint; accepted so an export can be imported as-is
+_IGNORED_CSV_COLUMNS = ("id", "created_at")
+
+# (line number, record) or (line number, reason the line could not be parsed)
+ParsedLine = tuple[int, Union[dict[str, Any], str]]
+
+
+@dataclass
+class ImportOutcome:
+    line: int
+    status: str  # "created", "duplicate" or "invalid"
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class _PendingLines:
+    """Iterator over lines fed so far; reports exhaustion until more lines arrive."""
+
+    def __init__(self) -> None:
+        self.lines: deque[str] = deque()
+
+    def __iter__(self) -> _PendingLines:
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+class RecordParser:
+    """Turn input lines, fed one at a time, into records.
+
+    CSV input needs a header row naming a subset of ``CSV_COLUMNS``; its ``keywords`` cell is
+    comma-separated. One ``csv.reader`` reads the whole stream, so quoted fields may span
+    lines; such a record is reported under the line it starts on.
+    """
+
+    def __init__(self, fmt: str) -> None:
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.fmt = fmt
+        self.line_number = 0
+        self._header: Optional[list[str]] = None
+        self._pending = _PendingLines()
+        self._reader = csv.reader(self._pending)
+        self._quotes = 0  # quote characters seen since the last complete record
+        self._consumed = 0
+
+    def feed(self, line: str) -> list[ParsedLine]:
+        self.line_number += 1
+        if self.fmt == "ndjson":
+            if not line.strip():
+                return []
+            return [(self.line_number, self._parse_json(line))]
+        self._pending.lines.append(line + "\n")
+        self._quotes += line.count('"')
+        if self._quotes % 2:
+            # inside a quoted field: wait for the line that closes it
+            return []
+        self._quotes = 0
+        return self._read_csv()
+
+    def close(self) -> list[ParsedLine]:
+        """Records left at the end of the input, i.e. an unterminated quoted field."""
+        if not self._pending.lines:
+            return []
+        start = self._consumed + 1
+        self._pending.lines.clear()
+        self._consumed = self.line_number
+        return [(start, "Unterminated quoted field")]
+
+    @staticmethod
+    def _parse_json(line: str) -> Union[dict[str, Any], str]:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return "Invalid JSON"
+        if not isinstance(record, dict):
+            return "Expected a JSON object"
+        return record
+
+    def _read_csv(self) -> list[ParsedLine]:
+        parsed = []
+        while self._pending.lines:
+            cells = next(self._reader)
+            start, self._consumed = self._consumed + 1, self._reader.line_num
+            if len(cells) <= 1 and not "".join(cells).strip():
+                continue
+            record = self._parse_csv(start, cells)
+            if record is not None:
+                parsed.append(record)
+        return parsed
+
+    def _parse_csv(self, line_number: int, cells: list[str]) -> Optional[ParsedLine]:
+        if self._header is None:
+            header = [cell.strip() for cell in cells]
+            unknown = set(header) - set(CSV_COLUMNS) - set(_IGNORED_CSV_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown CSV columns: {', '.join(sorted(unknown))}")
+            self._header = header
+            return None
+        if len(cells) != len(self._header):
+            return line_number, f"Expected {len(self._header)} columns, got {len(cells)}"
+
+        record: dict[str, Any] = {}
+        for name, value in zip(self._header, cells):
+            if name in _IGNORED_CSV_COLUMNS:
+                continue
+            if name == "keywords":
+                record[name] = value.split(",") if value else []
+            elif value != "" or name in ("symbol", "title"):
+                record[name] = value
+        return line_number, record
+
+
+async def iter_text_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def _insert_new_rows(session: Session, rows: list[dict[str, Any]]) -> dict[tuple[str, str], int]:
+    """Insert ``rows``, skipping existing (symbol, title) pairs; returns ids of new rows."""
+    table = EmojiSubmission.__table__
+    connection = session.connection()
+    dialect = connection.dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        statement = (
+            dialect_insert(table)
+            .on_conflict_do_nothing(index_elements=["symbol", "title"])
+            .returning(table.c.id, table.c.symbol, table.c.title)
+        )
+        created = connection.execute(statement, rows).all()
+        return {(symbol, title): emoji_id for emoji_id, symbol, title in created}
+
+    keys = [(row["symbol"], row["title"]) for row in rows]
+    existing = set(
+        connection.execute(
+            select(table.c.symbol, table.c.title).where(
+                tuple_(table.c.symbol, table.c.title).in_(keys)
+            )
+        ).all()
+    )
+    fresh = [row for row, key in zip(rows, keys) if key not in existing]
+    if not fresh:
+        return {}
+    statement = insert(table).returning(
+        table.c.id, table.c.symbol, table.c.title, sort_by_parameter_order=True
+    )
+    created = connection.execute(statement, fresh).all()
+    return {(symbol, title): emoji_id for emoji_id, symbol, title in created}
+
+
+def insert_emojis(session: Session, rows: list[dict[str, Any]]) -> dict[tuple[str, str], int]:
+    """Insert submission rows and their keyword rows without committing.
+
+    Rows whose (symbol, title) already exists are skipped; returns the ids of the new rows.
+    """
+    created = _insert_new_rows(session, rows)
+    # Core inserts bypass the ORM hooks that maintain the keyword index.
+    tags = [
+        tag
+        for row in rows
+        if (row["symbol"], row["title"]) in created
+        for tag in keyword_rows(created[(row["symbol"], row["title"])], row["keywords"])
+    ]
+    if tags:
+        session.connection().execute(insert(EmojiKeyword.__table__), tags)
+    track_changes(
+        session,
+        upserted=[
+            (created[key], row["symbol"], row["title"], row["keywords"])
+            for row in rows
+            if (key := (row["symbol"], row["title"])) in created
+        ],
+    )
+    return created
+
+
+def import_records(
+    session: Session, records: list[ParsedLine], owner_id: int, owner_email: str
+) -> list[ImportOutcome]:
+    """Validate and insert one batch of parsed lines in a single transaction."""
+    outcomes: list[ImportOutcome] = []
+    accepted: dict[tuple[str, str], int] = {}
+    rows: list[dict[str, Any]] = []
+
+    for line, record in records:
+        if isinstance(record, str):
+            outcomes.append(ImportOutcome(line=line, status="invalid", detail=record))
+            continue
+        try:
+            emoji = EmojiCreate.model_validate(record)
+        except ValidationError as exc:
+            detail = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in exc.errors()
+            )
+            outcomes.append(ImportOutcome(line=line, status="invalid", detail=detail))
+            continue
+
+        key = (emoji.symbol, emoji.title)
+        if key in accepted:
+            outcomes.append(
+                ImportOutcome(line=line, status="duplicate", detail="Emoji already exists")
+            )
+            continue
+        accepted[key] = line
+        rows.append(
+            {
+                "symbol": emoji.symbol,
+                "title": emoji.title,
+                "description": emoji.description,
+                "category": emoji.category,
+                "keywords": join_keywords(emoji.keywords),
+                "submitter_email": emoji.submitter_email or owner_email,
+                "submitter_id": owner_id,
+            }
+        )
+
+    if rows:
+        created = insert_emojis(session, rows)
+        for key, line in accepted.items():
+            if key in created:
+                outcomes.append(ImportOutcome(line=line, status="created", id=created[key]))
+            else:
+                outcomes.append(
+                    ImportOutcome(line=line, status="duplicate", detail="Emoji already exists")
+                )
+    session.commit()
+
+    outcomes.sort(key=lambda outcome: outcome.line)
+    return outcomes
+
+
+def import_lines(
+    session: Session,
+    lines: Iterable[str],
+    fmt: str,
+    owner_id: int,
+    owner_email: str,
+    batch_size: int = 1000,
+) -> Iterator[ImportOutcome]:
+    """Import ``lines`` in ``batch_size`` chunks, yielding each line's outcome."""
+    parser = RecordParser(fmt)
+    pending: list[ParsedLine] = []
+    for line in lines:
+        pending.extend(parser.feed(line.rstrip("\r\n")))
+        if len(pending) >= batch_size:
+            yield from import_records(session, pending, owner_id, owner_email)
+            pending = []
+    pending.extend(parser.close())
+    if pending:
+        yield from import_records(session, pending, owner_id, owner_email)
+
+
+__all__ = [
+    "CSV_COLUMNS",
+    "IMPORT_FORMATS",
+    "ImportOutcome",
+    "RecordParser",
+    "import_lines",
+    "import_records",
+    "insert_emojis",
+    "iter_text_lines",
+]
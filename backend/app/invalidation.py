@@ -0,0 +1,114 @@
+"""Keep the per-process caches of every worker in step through ``invalidation_bus``.
+
+Local writes are published as they commit:
+- catalog version bumps, which clear the list response cache and change list ETags
+- emoji changes, which feed the autocomplete index and the list snapshot
+- user changes, which evict cached user rows
+- read-your-writes pins, so a user's next read skips the replicas on every worker
+
+Events from other workers are applied here without being published again. Scripts that write
+the catalog outside the API call ``publish_offline_writes`` once they are done.
+"""
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from app.api.deps import clear_auth_cache, invalidate_user, subscribe_user_changes
+from app.catalog import catalog_version
+from app.core.config import settings
+from app.core.invalidation import RESYNC, InvalidationBus, build_invalidation_bus
+from app.db import pin_to_primary, read_replicas, subscribe_pins
+from app.snapshot import catalog_snapshot
+from app.suggest import Changes, apply_changes, subscribe_changes, suggest_index
+
+import app.api.caching  # noqa: F401 - shares the catalog version with a sqlite response cache
+
+_bus: Optional[InvalidationBus] = None
+
+
+def _publish(kind: str, payload: Any = None) -> None:
+    if _bus is not None:
+        _bus.publish(kind, payload)
+
+
+catalog_version.subscribe(lambda: _publish("catalog"))
+subscribe_changes(lambda changes: _publish("emojis", [[*item] for item in changes.items()]))
+subscribe_user_changes(lambda user_ids: _publish("users", sorted(user_ids)))
+
+
+def _publish_pin(user_id: int) -> None:
+    # without replicas every read already goes to the primary
+    if len(read_replicas):
+        _publish("pins", [user_id])
+
+
+subscribe_pins(_publish_pin)
+
+
+def _apply_remote_changes(payload: list) -> None:
+    changes: Changes = {
+        emoji_id: None if row is None else tuple(row) for emoji_id, row in payload
+    }
+    apply_changes(changes)
+
+
+def _apply_remote_users(payload: list[int]) -> None:
+    for user_id in payload:
+        invalidate_user(user_id)
+
+
+def _apply_remote_pins(payload: list[int]) -> None:
+    for user_id in payload:
+        pin_to_primary(user_id)
+
+
+def _resync(payload: Any) -> None:
+    # the channel dropped events: rebuild everything from the database on demand
+    clear_auth_cache()
+    suggest_index.clear()
+    catalog_snapshot.clear()
+    catalog_version.bumped_elsewhere()
+
+
+def connect_invalidation_bus(bus: Optional[InvalidationBus]) -> None:
+    """Publish local writes on ``bus`` and apply its remote events; ``None`` disconnects."""
+    global _bus
+    _bus = bus
+    if bus is not None:
+        bus.on("catalog", lambda payload: catalog_version.bumped_elsewhere())
+        bus.on("emojis", _apply_remote_changes)
+        bus.on("users", _apply_remote_users)
+        bus.on("pins", _apply_remote_pins)
+        bus.on(RESYNC, _resync)
+
+
+# printed by scripts when ``publish_offline_writes`` could not reach the servers
+RESTART_HINT = (
+    "! Running servers keep serving their cached catalog until restarted; set "
+    "INVALIDATION_BACKEND=sqlite to have them pick up offline writes"
+)
+
+
+def publish_offline_writes() -> bool:
+    """Tell running servers about the catalog writes this process committed, e.g. a script.
+
+    Bumps the catalog version and sends the queued events. Returns False when the servers
+    cannot hear about it: no invalidation bus and no version shared through a sqlite response
+    cache. They then serve their cached pages, snapshot and suggestions until restarted.
+    """
+    catalog_version.bump()
+    if _bus is not None:
+        _bus.flush()
+    return _bus is not None or catalog_version.shared
+
+
+invalidation_bus = build_invalidation_bus(settings)
+connect_invalidation_bus(invalidation_bus)
+
+
+__all__ = [
+    "RESTART_HINT",
+    "connect_invalidation_bus",
+    "invalidation_bus",
+    "publish_offline_writes",
+]
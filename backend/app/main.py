@@ -1,9 +1,18 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .api import router as api_router
 from .core.config import settings
-from .db import init_db
+from .core.metrics import MetricsMiddleware
+from .core.profiling import ProfilingMiddleware
+from .core.security import PasswordHasherBusy
+from .db import engine, init_db
+from .invalidation import invalidation_bus
+from .snapshot import catalog_snapshot
+from .suggest import suggest_index
 
 
 def create_app() -> FastAPI:
@@ -15,11 +24,39 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    app.add_middleware(ProfilingMiddleware)
+    # added last so it wraps every other middleware
+    app.add_middleware(MetricsMiddleware)
     app.include_router(api_router)
 
+    @app.exception_handler(PasswordHasherBusy)
+    def handle_password_hasher_busy(request: Request, exc: PasswordHasherBusy) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Server is busy, please retry shortly"},
+            headers={"Retry-After": "1"},
+        )
+
     @app.on_event("startup")
     def handle_startup() -> None:
         init_db()
+        with engine.connect() as connection:
+            suggest_index.load(connection)
+            if settings.emoji_list_snapshot:
+                catalog_snapshot.load(connection)
+
+    @app.on_event("startup")
+    async def start_invalidation_bus() -> None:
+        if invalidation_bus is not None:
+            app.state.invalidation_task = asyncio.create_task(invalidation_bus.run())
+
+    @app.on_event("shutdown")
+    async def stop_invalidation_bus() -> None:
+        task = getattr(app.state, "invalidation_task", None)
+        if task is not None:
+            task.cancel()
+            # send what this worker published since the last poll
+            await asyncio.to_thread(invalidation_bus.flush)
 
     return app
 
@@ -1,4 +1,6 @@
+from .category import CategoryCount
 from .emoji import EmojiSubmission
+from .keyword import EmojiKeyword
 from .user import User
 
-__all__ = ["EmojiSubmission", "User"]
+__all__ = ["CategoryCount", "EmojiKeyword", "EmojiSubmission", "User"]
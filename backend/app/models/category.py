@@ -0,0 +1,11 @@
+from sqlmodel import Field, SQLModel
+
+
+class CategoryCount(SQLModel, table=True):
+    """Submissions per category, kept current by database triggers (see ``app.facets``)."""
+
+    category: str = Field(primary_key=True, max_length=64)
+    emoji_count: int = Field(default=0)
+
+
+__all__ = ["CategoryCount"]
@@ -1,10 +1,30 @@
+from collections.abc import Iterable
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index, func, select, update
+from sqlalchemy.engine import Connection
 from sqlmodel import Field, SQLModel
 
 
+def split_keywords(keywords: str) -> list[str]:
+    return [word for word in keywords.split(",") if word]
+
+
+def join_keywords(tags: Iterable[str]) -> str:
+    return ",".join(sorted({tag.strip() for tag in tags if tag.strip()}))
+
+
 class EmojiSubmission(SQLModel, table=True):
+    __table_args__ = (
+        Index("uq_emojisubmission_symbol_title", "symbol", "title", unique=True),
+        # keyset pagination keys, one per sort column
+        Index("ix_emojisubmission_created_at_id", "created_at", "id"),
+        Index("ix_emojisubmission_title_id", "title", "id"),
+        # category filter in the default date order
+        Index("ix_emojisubmission_category_created_at_id", "category", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     symbol: str = Field(max_length=8, nullable=False)
     title: str = Field(max_length=128, nullable=False)
@@ -13,15 +33,46 @@ class EmojiSubmission(SQLModel, table=True):
     keywords: str = Field(default="", max_length=512)
     submitter_email: Optional[str] = Field(default=None, max_length=256)
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
-    submitter_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    submitter_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True)
 
     @property
     def keyword_list(self) -> list[str]:
-        return [word for word in self.keywords.split(",") if word]
+        return split_keywords(self.keywords)
 
     @keyword_list.setter
     def keyword_list(self, value: list[str]) -> None:
-        self.keywords = ",".join(sorted({tag.strip() for tag in value if tag.strip()}))
+        self.keywords = join_keywords(value)
+
+
+def rename_duplicate_titles(connection: Connection) -> list[tuple[str, str]]:
+    """Number the titles of repeated (symbol, title) pairs, keeping the oldest row as is.
+
+    Databases created before the unique index may hold such repeats, which would stop the
+    index from being created. Returns the keys that were repeated.
+    """
+    table = EmojiSubmission.__table__
+    repeated = connection.execute(
+        select(table.c.symbol, table.c.title)
+        .group_by(table.c.symbol, table.c.title)
+        .having(func.count() > 1)
+    ).all()
+    title_length = table.c.title.type.length
+    for symbol, title in repeated:
+        same_symbol = table.c.symbol == symbol
+        taken = set(connection.execute(select(table.c.title).where(same_symbol)).scalars())
+        ids = connection.execute(
+            select(table.c.id).where(same_symbol, table.c.title == title).order_by(table.c.id)
+        ).scalars()
+        number = 1
+        for emoji_id in list(ids)[1:]:
+            renamed = title
+            while renamed in taken:
+                number += 1
+                suffix = f" ({number})"
+                renamed = title[: title_length - len(suffix)] + suffix
+            taken.add(renamed)
+            connection.execute(update(table).where(table.c.id == emoji_id).values(title=renamed))
+    return [(symbol, title) for symbol, title in repeated]
 
 
-__all__ = ["EmojiSubmission"]
+__all__ = ["EmojiSubmission", "join_keywords", "rename_duplicate_titles", "split_keywords"]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import Index, delete, event, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlmodel import Field, SQLModel
+
+from .emoji import EmojiSubmission
+
+
+class EmojiKeyword(SQLModel, table=True):
+    """One row per (emoji, keyword); the inverted index behind exact keyword filters."""
+
+    __table_args__ = (Index("ix_emojikeyword_keyword_emoji_id", "keyword", "emoji_id"),)
+
+    emoji_id: int = Field(foreign_key="emojisubmission.id", primary_key=True)
+    keyword: str = Field(primary_key=True, max_length=128)
+
+
+def normalize_keyword(tag: str) -> str:
+    return tag.strip().lower()
+
+
+def keyword_rows(emoji_id: int, keywords: str) -> list[dict[str, Any]]:
+    tags = {normalize_keyword(tag) for tag in keywords.split(",")}
+    return [{"emoji_id": emoji_id, "keyword": tag} for tag in sorted(tags) if tag]
+
+
+def _replace_keywords(connection: Connection, emoji_id: int, keywords: str) -> None:
+    table = EmojiKeyword.__table__
+    connection.execute(delete(table).where(table.c.emoji_id == emoji_id))
+    rows = keyword_rows(emoji_id, keywords)
+    if rows:
+        connection.execute(insert(table), rows)
+
+
+def backfill_keywords(connection: Connection, chunk_size: int = 1000) -> int:
+    """Rebuild the keyword table from ``EmojiSubmission.keywords``; returns rows written."""
+    table = EmojiKeyword.__table__
+    source = EmojiSubmission.__table__
+    connection.execute(delete(table))
+
+    written = 0
+    statement = select(source.c.id, source.c.keywords).where(source.c.keywords != "")
+    result = connection.execute(statement.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        rows = [row for emoji_id, keywords in partition for row in keyword_rows(emoji_id, keywords)]
+        if rows:
+            connection.execute(insert(table), rows)
+            written += len(rows)
+    return written
+
+
+@event.listens_for(EmojiSubmission, "after_insert")
+def _keywords_after_insert(mapper: Any, connection: Connection, target: EmojiSubmission) -> None:
+    if target.keywords:
+        _replace_keywords(connection, target.id, target.keywords)
+
+
+@event.listens_for(EmojiSubmission, "after_update")
+def _keywords_after_update(mapper: Any, connection: Connection, target: EmojiSubmission) -> None:
+    if inspect(target).attrs.keywords.history.has_changes():
+        _replace_keywords(connection, target.id, target.keywords)
+
+
+@event.listens_for(EmojiSubmission, "before_delete")
+def _keywords_before_delete(mapper: Any, connection: Connection, target: EmojiSubmission) -> None:
+    table = EmojiKeyword.__table__
+    connection.execute(delete(table).where(table.c.emoji_id == target.id))
+
+
+__all__ = ["EmojiKeyword", "backfill_keywords", "keyword_rows", "normalize_keyword"]
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import and_, case, false, func, tuple_
+from sqlmodel import col, select
+
+from app.models import EmojiKeyword, EmojiSubmission
+from app.models.keyword import normalize_keyword
+from app.search import apply_search
+
+
+def can_delete_expression(user_id: Optional[int], email: Optional[str]) -> Any:
+    """SQL for whether the viewer owns a submission (legacy rows match on email)."""
+    if user_id is None:
+        return false()
+    legacy_owner = and_(
+        col(EmojiSubmission.submitter_id).is_(None), EmojiSubmission.submitter_email == email
+    )
+    return case(
+        (EmojiSubmission.submitter_id == user_id, True), (legacy_owner, True), else_=False
+    )
+
+
+def list_statement(user_id: Optional[int] = None, email: Optional[str] = None) -> Any:
+    """Select only the columns a list page needs, as plain rows rather than ORM entities."""
+    return select(
+        EmojiSubmission.id,
+        EmojiSubmission.symbol,
+        EmojiSubmission.title,
+        EmojiSubmission.description,
+        EmojiSubmission.category,
+        EmojiSubmission.keywords,
+        EmojiSubmission.submitter_email,
+        EmojiSubmission.created_at,
+        can_delete_expression(user_id, email).label("can_delete"),
+    ).select_from(EmojiSubmission)
+
+
+def apply_filters(
+    statement: Any,
+    *,
+    dialect: str,
+    search: Optional[str] = None,
+    category: Optional[str] = None,
+    keywords: Optional[list[str]] = None,
+    keyword_mode: str = "all",
+    order_by_rank: bool = False,
+) -> Any:
+    if search:
+        statement = apply_search(statement, search, dialect, order_by_rank=order_by_rank)
+    if category:
+        statement = statement.where(EmojiSubmission.category == category)
+    if keywords:
+        statement = statement.where(keyword_filter(keywords, keyword_mode))
+    return statement
+
+
+def keyword_filter(keywords: list[str], mode: str = "all") -> Any:
+    """Match submissions tagged with all (or, for ``mode="any"``, at least one) ``keywords``."""
+    wanted = sorted({normalize_keyword(tag) for tag in keywords} - {""})
+    matches = select(EmojiKeyword.emoji_id).where(col(EmojiKeyword.keyword).in_(wanted))
+    if mode == "all" and len(wanted) > 1:
+        matches = matches.group_by(EmojiKeyword.emoji_id).having(func.count() == len(wanted))
+    return col(EmojiSubmission.id).in_(matches)
+
+
+# sort option -> (key column, descending); ``id`` breaks ties in the same direction
+_SORT_KEYS: dict[str, tuple[Any, bool]] = {
+    "date_desc": (EmojiSubmission.created_at, True),
+    "date_asc": (EmojiSubmission.created_at, False),
+    "title_asc": (EmojiSubmission.title, False),
+    "title_desc": (EmojiSubmission.title, True),
+}
+
+
+def _sort_key(sort: str) -> tuple[Any, bool]:
+    return _SORT_KEYS.get(sort, _SORT_KEYS["date_desc"])
+
+
+def apply_sort(statement: Any, sort: str) -> Any:
+    key, descending = _sort_key(sort)
+    if descending:
+        return statement.order_by(key.desc(), EmojiSubmission.id.desc())
+    return statement.order_by(key.asc(), EmojiSubmission.id.asc())
+
+
+def encode_cursor(sort: str, row: Any) -> str:
+    """Cursor positioned after ``row``, an ``EmojiSubmission`` or a ``list_statement`` row."""
+    key, _ = _sort_key(sort)
+    value = getattr(row, key.key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, row.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple[Any, int]:
+    """Return the (key, id) position encoded in ``cursor``.
+
+    Raises ``ValueError`` if the cursor is malformed or was issued for another sort order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, emoji_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if cursor_sort != sort or not isinstance(emoji_id, int) or not isinstance(value, str):
+        raise ValueError("Cursor does not match sort order")
+
+    key, _ = _sort_key(sort)
+    if key is EmojiSubmission.created_at:
+        value = datetime.fromisoformat(value)
+    return value, emoji_id
+
+
+def apply_cursor(statement: Any, sort: str, position: tuple[Any, int]) -> Any:
+    key, descending = _sort_key(sort)
+    current = tuple_(key, EmojiSubmission.id)
+    if descending:
+        return statement.where(current < tuple_(*position))
+    return statement.where(current > tuple_(*position))
+
+
+def export_statement(after_id: Optional[int] = None) -> Any:
+    """``list_statement`` rows in id order, starting after ``after_id`` to resume an export."""
+    statement = list_statement().order_by(EmojiSubmission.id.asc())
+    if after_id is not None:
+        statement = statement.where(EmojiSubmission.id > after_id)
+    return statement
+
+
+def count_statement(*, dialect: str, **filters: Any) -> Any:
+    statement = select(func.count()).select_from(EmojiSubmission)
+    return apply_filters(statement, dialect=dialect, **filters)
+
+
+__all__ = [
+    "apply_cursor",
+    "apply_filters",
+    "apply_sort",
+    "can_delete_expression",
+    "count_statement",
+    "decode_cursor",
+    "encode_cursor",
+    "export_statement",
+    "keyword_filter",
+    "list_statement",
+]
@@ -6,14 +6,37 @@ from .auth import (
     TokenPayload,
     UserLoginRequest,
 )
-from .emoji import Emoji, EmojiCreate, EmojiListResponse, EmojiUpdate
+from .emoji import (
+    Emoji,
+    EmojiBatchDelete,
+    EmojiBatchReport,
+    EmojiBatchResult,
+    EmojiBatchUpdate,
+    EmojiBatchUpdateItem,
+    EmojiCreate,
+    EmojiImportReport,
+    EmojiImportResult,
+    EmojiListResponse,
+    EmojiSuggestion,
+    EmojiUpdate,
+    FacetCount,
+)
 from .user import UserCreate, UserPublic
 
 __all__ = [
     "Emoji",
+    "EmojiBatchDelete",
+    "EmojiBatchReport",
+    "EmojiBatchResult",
+    "EmojiBatchUpdate",
+    "EmojiBatchUpdateItem",
     "EmojiCreate",
+    "EmojiImportReport",
+    "EmojiImportResult",
     "EmojiListResponse",
+    "EmojiSuggestion",
     "EmojiUpdate",
+    "FacetCount",
     "PasswordResetConfirm",
     "PasswordResetRequest",
     "PasswordResetResponse",
@@ -32,11 +32,76 @@ class Emoji(EmojiBase):
         from_attributes = True
 
 
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
 class EmojiListResponse(BaseModel):
     items: list[Emoji]
-    total: int
+    total: Optional[int] = None
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
+    facets: Optional[dict[str, list[FacetCount]]] = None
+
+
+class EmojiSuggestion(BaseModel):
+    id: int
+    symbol: str
+    title: str
+
+
+class EmojiBatchUpdateItem(EmojiUpdate):
+    id: int
+
+
+class EmojiBatchUpdate(BaseModel):
+    items: list[EmojiBatchUpdateItem] = Field(min_length=1, max_length=1000)
+
+
+class EmojiBatchDelete(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=1000)
+
+
+class EmojiBatchResult(BaseModel):
+    id: int
+    status: str
+    detail: Optional[str] = None
+    emoji: Optional[Emoji] = None
+
+
+class EmojiBatchReport(BaseModel):
+    results: list[EmojiBatchResult]
+
+
+class EmojiImportResult(BaseModel):
+    line: int
+    status: str
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class EmojiImportReport(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: list[EmojiImportResult]
 
 
-__all__ = ["Emoji", "EmojiBase", "EmojiCreate", "EmojiUpdate", "EmojiListResponse"]
+__all__ = [
+    "Emoji",
+    "EmojiBase",
+    "EmojiBatchDelete",
+    "EmojiBatchReport",
+    "EmojiBatchResult",
+    "EmojiBatchUpdate",
+    "EmojiBatchUpdateItem",
+    "EmojiCreate",
+    "EmojiImportReport",
+    "EmojiImportResult",
+    "EmojiUpdate",
+    "EmojiListResponse",
+    "EmojiSuggestion",
+    "FacetCount",
+]
@@ -0,0 +1,164 @@
+"""Full-text search index over emoji submissions.
+
+SQLite uses an external-content FTS5 table kept in sync by triggers. Postgres uses a GIN
+expression index over ``to_tsvector`` plus a trigram index for queries without word tokens.
+Other dialects fall back to ``ILIKE``.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from sqlalchemy import column, event, func, literal_column, or_, table
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import col
+
+from app.models import EmojiSubmission
+
+FTS_TABLE = "emojisubmission_fts"
+
+# bm25 column weights, in FTS column order: title, description, keywords
+_FTS_WEIGHTS = (10.0, 1.0, 5.0)
+
+_PG_DOCUMENT = (
+    "to_tsvector('simple', coalesce(emojisubmission.title, '') || ' ' || "
+    "coalesce(emojisubmission.description, '') || ' ' || coalesce(emojisubmission.keywords, ''))"
+)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# the default list order (newest first); breaks ties in rank and orders searches without words
+_DEFAULT_ORDER = (col(EmojiSubmission.created_at).desc(), col(EmojiSubmission.id).desc())
+
+
+def _sqlite_statements(source: str) -> list[str]:
+    columns = "title, description, keywords"
+    old_values = "old.title, old.description, old.keywords"
+    new_values = "new.title, new.description, new.keywords"
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {source} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {source} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns})
+            VALUES ('delete', old.id, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {columns} ON {source} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns})
+            VALUES ('delete', old.id, {old_values});
+            INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});
+        END
+        """,
+    ]
+
+
+def _install_sqlite(connection: Connection) -> None:
+    source = EmojiSubmission.__table__.name
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).first()
+    if not exists:
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"title, description, keywords, content='{source}', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+    for statement in _sqlite_statements(source):
+        connection.exec_driver_sql(statement)
+    if not exists:
+        connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def _install_postgres(connection: Connection) -> None:
+    source = EmojiSubmission.__table__.name
+    connection.exec_driver_sql(
+        f"CREATE INDEX IF NOT EXISTS ix_{source}_search ON {source} USING GIN ({_PG_DOCUMENT})"
+    )
+    savepoint = connection.begin_nested()
+    try:
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        connection.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{source}_title_trgm ON {source} "
+            "USING GIN (title gin_trgm_ops)"
+        )
+    except DBAPIError:
+        # pg_trgm needs extension privileges; token-less searches then scan.
+        savepoint.rollback()
+    else:
+        savepoint.commit()
+
+
+def install_search_index(connection: Connection) -> None:
+    """Create the search index and its sync triggers if they are missing."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        _install_sqlite(connection)
+    elif dialect == "postgresql":
+        _install_postgres(connection)
+
+
+def search_tokens(search: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(search.lower())
+
+
+def _ilike_clause(search: str) -> Any:
+    search_term = f"%{search.lower()}%"
+    return or_(
+        col(EmojiSubmission.title).ilike(search_term),
+        col(EmojiSubmission.description).ilike(search_term),
+        col(EmojiSubmission.keywords).ilike(search_term),
+    )
+
+
+def apply_search(statement: Any, search: str, dialect: str, *, order_by_rank: bool = False) -> Any:
+    """Restrict ``statement`` to submissions matching ``search``.
+
+    Every word is matched as a prefix and all words must match. When ``order_by_rank`` is set
+    the best matches come first; a search without words has no rank and keeps the default
+    newest-first order.
+    """
+    tokens = search_tokens(search)
+
+    if dialect == "sqlite" and tokens:
+        fts = table(FTS_TABLE, column("rowid"))
+        match = " ".join(f'"{token}"*' for token in tokens)
+        rank = func.bm25(literal_column(FTS_TABLE), *_FTS_WEIGHTS)
+        matches = (
+            fts.select()
+            .with_only_columns(fts.c.rowid.label("id"), rank.label("rank"))
+            .where(literal_column(FTS_TABLE).match(match))
+            .subquery("search_matches")
+        )
+        statement = statement.join(matches, matches.c.id == EmojiSubmission.id)
+        if order_by_rank:
+            statement = statement.order_by(matches.c.rank.asc(), *_DEFAULT_ORDER)
+        return statement
+
+    if dialect == "postgresql" and tokens:
+        document = literal_column(_PG_DOCUMENT)
+        query = func.to_tsquery(literal_column("'simple'"), " & ".join(f"{t}:*" for t in tokens))
+        statement = statement.where(document.op("@@")(query))
+        if order_by_rank:
+            statement = statement.order_by(func.ts_rank(document, query).desc(), *_DEFAULT_ORDER)
+        return statement
+
+    statement = statement.where(_ilike_clause(search))
+    if order_by_rank:
+        statement = statement.order_by(*_DEFAULT_ORDER)
+    return statement
+
+
+def _handle_table_created(target: Any, connection: Connection, **_: Any) -> None:
+    install_search_index(connection)
+
+
+event.listen(EmojiSubmission.__table__, "after_create", _handle_table_created)
+
+
+__all__ = ["FTS_TABLE", "apply_search", "install_search_index", "search_tokens"]
@@ -0,0 +1,573 @@
+"""In-memory, columnar copy of the catalog for serving ``GET /emojis`` without SQL.
+
+Rows live in append-only columns: arrays of ids, creation times and submitter ids, interned
+category codes, and plain lists for the text fields. A ``CatalogSnapshot`` is one immutable
+version of the catalog over those columns: the live slots pre-sorted by date and by title,
+overall and per category and keyword, and per-category totals. Writes never touch a published
+snapshot. Changed rows are appended as new slots and a new snapshot is swapped in, so readers
+need no locks.
+
+Committed writes are picked up through ``subscribe_changes``; the affected rows are read back
+by id on the next list request. Full-text search is still answered by the database.
+"""
+from __future__ import annotations
+
+import heapq
+import threading
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import datetime, timedelta
+from typing import Any, Callable, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from app.models import EmojiSubmission
+from app.models.keyword import normalize_keyword
+from app.suggest import subscribe_changes
+
+# id, symbol, title, description, category, keywords, submitter_email, created_at, submitter_id
+Row = tuple[
+    int, str, str, Optional[str], Optional[str], str, Optional[str], datetime, Optional[int]
+]
+
+
+class ListRow(NamedTuple):
+    """Same fields as a ``list_statement`` row."""
+
+    id: int
+    symbol: str
+    title: str
+    description: Optional[str]
+    category: Optional[str]
+    keywords: str
+    submitter_email: Optional[str]
+    created_at: datetime
+    can_delete: bool
+
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NONE = -1
+# changes per refresh spliced into the sort orders one at a time; above this they are re-sorted
+_MAX_SPLICES = 32
+# filter combinations whose match counts a snapshot remembers (and carries over to the next)
+_MAX_CACHED_TOTALS = 256
+
+
+def _micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class _Columns:
+    """Append-only row storage shared by every snapshot built on it."""
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.created = array("q")
+        self.submitters = array("q")
+        self.categories = array("i")
+        self.symbols: list[str] = []
+        self.titles: list[str] = []
+        self.descriptions: list[Optional[str]] = []
+        self.keywords: list[str] = []
+        self.emails: list[Optional[str]] = []
+        self.category_names: list[str] = []
+        self.category_codes: dict[str, int] = {}
+        # normalized keywords per slot; equal tags share one string
+        self.tags: list[tuple[str, ...]] = []
+        self._tag_names: dict[str, str] = {}
+
+    def append(self, row: Row) -> int:
+        emoji_id, symbol, title, description, category, keywords, email, created, owner = row
+        slot = len(self.ids)
+        code = _NONE
+        if category is not None:
+            code = self.category_codes.get(category, _NONE)
+            if code == _NONE:
+                code = self.category_codes[category] = len(self.category_names)
+                self.category_names.append(category)
+        tags = {normalize_keyword(tag) for tag in keywords.split(",")} - {""}
+        self.tags.append(tuple(self._tag_names.setdefault(tag, tag) for tag in sorted(tags)))
+        self.ids.append(emoji_id)
+        self.created.append(_micros(created))
+        self.submitters.append(_NONE if owner is None else owner)
+        self.categories.append(code)
+        self.symbols.append(symbol)
+        self.titles.append(title)
+        self.descriptions.append(description)
+        self.keywords.append(keywords)
+        self.emails.append(email)
+        return slot
+
+    def row(self, slot: int) -> Row:
+        code = self.categories[slot]
+        owner = self.submitters[slot]
+        return (
+            self.ids[slot],
+            self.symbols[slot],
+            self.titles[slot],
+            self.descriptions[slot],
+            None if code == _NONE else self.category_names[code],
+            self.keywords[slot],
+            self.emails[slot],
+            _EPOCH + self.created[slot] * _MICROSECOND,
+            None if owner == _NONE else owner,
+        )
+
+
+def _bisect(order: Sequence[int], target: tuple, key: Callable[[int], tuple], right: bool) -> int:
+    low, high = 0, len(order)
+    while low < high:
+        middle = (low + high) // 2
+        value = key(order[middle])
+        if value < target or (right and value == target):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _spliced(
+    order: array, removed: list[int], added: list[int], key: Callable[[int], tuple]
+) -> array:
+    """Copy of ``order`` without ``removed`` and with ``added``, still sorted by ``key``."""
+    if len(removed) + len(added) > _MAX_SPLICES:
+        gone = set(removed)
+        return array("i", sorted([*(s for s in order if s not in gone), *added], key=key))
+    order = array("i", order)
+    for slot in removed:
+        del order[_bisect(order, key(slot), key, right=False)]
+    for slot in added:
+        order.insert(_bisect(order, key(slot), key, right=False), slot)
+    return order
+
+
+def _respliced(
+    orders: dict[Any, array],
+    changes: dict[Any, tuple[list[int], list[int]]],
+    key: Callable[[int], tuple],
+) -> dict[Any, array]:
+    orders = dict(orders)
+    for name, (removed, added) in changes.items():
+        order = _spliced(orders.get(name, array("i")), removed, added, key)
+        if order:
+            orders[name] = order
+        else:
+            orders.pop(name, None)
+    return orders
+
+
+class _Orders:
+    """Live slots in one sort order: all of them, and the ones per category and keyword."""
+
+    def __init__(self, slots: array, categories: dict[int, array], tags: dict[str, array]) -> None:
+        self.slots = slots
+        self.categories = categories
+        self.tags = tags
+
+    @classmethod
+    def build(cls, columns: _Columns, order: list[int]) -> _Orders:
+        categories: dict[int, list[int]] = {}
+        tags: dict[str, list[int]] = {}
+        for slot in order:
+            code = columns.categories[slot]
+            if code != _NONE:
+                categories.setdefault(code, []).append(slot)
+            for tag in columns.tags[slot]:
+                tags.setdefault(tag, []).append(slot)
+        return cls(
+            array("i", order),
+            {code: array("i", slots) for code, slots in categories.items()},
+            {tag: array("i", slots) for tag, slots in tags.items()},
+        )
+
+    def apply(
+        self,
+        columns: _Columns,
+        removed: list[int],
+        added: list[int],
+        key: Callable[[int], tuple],
+    ) -> _Orders:
+        # only the categories and keywords of changed rows are copied
+        by_category: dict[int, tuple[list[int], list[int]]] = {}
+        by_tag: dict[str, tuple[list[int], list[int]]] = {}
+        for side, slots in enumerate((removed, added)):
+            for slot in slots:
+                code = columns.categories[slot]
+                if code != _NONE:
+                    by_category.setdefault(code, ([], []))[side].append(slot)
+                for tag in columns.tags[slot]:
+                    by_tag.setdefault(tag, ([], []))[side].append(slot)
+        return _Orders(
+            _spliced(self.slots, removed, added, key),
+            _respliced(self.categories, by_category, key),
+            _respliced(self.tags, by_tag, key),
+        )
+
+
+class _Filter(NamedTuple):
+    """Category and keyword filters of a page, normalized so equal filters compare equal."""
+
+    category: Optional[int]  # category code; ``_NONE`` matches nothing
+    tags: tuple[str, ...]
+    any_tag: bool
+
+
+def _predicate(columns: _Columns, pattern: _Filter) -> Callable[[int], bool]:
+    """Whether the row in a slot passes ``pattern``."""
+    categories, tags = columns.categories, columns.tags
+    code, wanted = pattern.category, frozenset(pattern.tags)
+    if pattern.any_tag:
+        if code is None:
+            return lambda slot: not wanted.isdisjoint(tags[slot])
+        return lambda slot: categories[slot] == code and not wanted.isdisjoint(tags[slot])
+    if code is None:
+        return lambda slot: wanted.issubset(tags[slot])
+    return lambda slot: categories[slot] == code and wanted.issubset(tags[slot])
+
+
+# e.g. keywords that are all blank: no row can match
+_NOTHING = _Filter(_NONE, (), False)
+
+
+def _unique(slots: Iterator[int]) -> Iterator[int]:
+    """Drop repeats from merged sort orders, where a slot in several of them comes out in a row."""
+    previous = None
+    for slot in slots:
+        if slot != previous:
+            yield slot
+            previous = slot
+
+
+class CatalogSnapshot:
+    def __init__(
+        self,
+        columns: _Columns,
+        orders: dict[str, _Orders],
+        category_totals: dict[int, int],
+        filter_totals: Optional[dict[_Filter, int]] = None,
+    ) -> None:
+        self._columns = columns
+        self._orders = orders
+        self._category_totals = category_totals
+        # rows matching a combination of filters, counted once and kept up to date by ``apply``
+        self._filter_totals = filter_totals if filter_totals is not None else {}
+        self._live = len(orders["date"].slots)
+
+    @classmethod
+    def build(cls, rows: Iterable[Row]) -> CatalogSnapshot:
+        columns = _Columns()
+        for row in rows:
+            columns.append(row)
+        return cls._from_columns(columns, range(len(columns.ids)))
+
+    @classmethod
+    def _from_columns(cls, columns: _Columns, slots: Iterable[int]) -> CatalogSnapshot:
+        slots = list(slots)
+        orders = {
+            column: _Orders.build(columns, sorted(slots, key=cls._key_function(columns, column)))
+            for column in ("date", "title")
+        }
+        totals = Counter(columns.categories[slot] for slot in slots)
+        totals.pop(_NONE, None)
+        return cls(columns, orders, dict(totals))
+
+    @staticmethod
+    def _key_function(columns: _Columns, column: str) -> Callable[[int], tuple]:
+        ids = columns.ids
+        if column == "title":
+            titles = columns.titles
+            return lambda slot: (titles[slot], ids[slot])
+        created = columns.created
+        return lambda slot: (created[slot], ids[slot])
+
+    def __len__(self) -> int:
+        return self._live
+
+    def _compacted(self, slots: dict[int, int]) -> CatalogSnapshot:
+        """Rebuild on fresh columns holding only the rows in ``slots``, renumbering them."""
+        columns = _Columns()
+        for emoji_id, slot in sorted(slots.items()):
+            slots[emoji_id] = columns.append(self._columns.row(slot))
+        return self._from_columns(columns, range(len(columns.ids)))
+
+    def apply(self, changes: dict[int, Optional[Row]], slots: dict[int, int]) -> CatalogSnapshot:
+        """New snapshot with ``changes`` (id -> row, or None once deleted) applied.
+
+        ``slots`` maps ids to their current slot and is updated in place; only the store that
+        owns the columns may call this, and only on its latest snapshot.
+        """
+        columns = self._columns
+        removed = [slots.pop(emoji_id) for emoji_id in changes if emoji_id in slots]
+        added = []
+        for row in changes.values():
+            if row is not None:
+                slots[row[0]] = columns.append(row)
+                added.append(slots[row[0]])
+        if len(removed) + len(added) > self._live // 2 or len(columns.ids) > 2 * len(slots):
+            return self._compacted(slots)
+
+        totals = dict(self._category_totals)
+        for slot, delta in [*((slot, -1) for slot in removed), *((slot, 1) for slot in added)]:
+            code = columns.categories[slot]
+            if code != _NONE:
+                totals[code] = totals.get(code, 0) + delta
+                if not totals[code]:
+                    del totals[code]
+        filter_totals = {}
+        # a copy: pages read from this snapshot may be adding counts meanwhile
+        for pattern, count in dict(self._filter_totals).items():
+            matches = _predicate(columns, pattern)
+            filter_totals[pattern] = count - sum(map(matches, removed)) + sum(map(matches, added))
+
+        orders = {
+            column: order.apply(columns, removed, added, self._key_function(columns, column))
+            for column, order in self._orders.items()
+        }
+        return CatalogSnapshot(columns, orders, totals, filter_totals)
+
+    def _filter(
+        self, category: Optional[str], keywords: Optional[list[str]], keyword_mode: str
+    ) -> Optional[_Filter]:
+        """The filters of a page, or None when there are none."""
+        code = None
+        if category:
+            code = self._columns.category_codes.get(category, _NONE)
+        tags: tuple[str, ...] = ()
+        if keywords:
+            tags = tuple(sorted({normalize_keyword(tag) for tag in keywords} - {""}))
+            if not tags:
+                return _NOTHING
+        if code is None and not tags:
+            return None
+        return _Filter(code, tags, keyword_mode == "any" and len(tags) > 1)
+
+    @staticmethod
+    def _groups(orders: _Orders, pattern: _Filter) -> list[list[array]]:
+        """Sort orders grouped so that a row matches ``pattern`` when it is in (the union of)
+        every group; smallest group first."""
+        empty = array("i")
+        tag_orders = [orders.tags.get(tag, empty) for tag in pattern.tags]
+        groups = [tag_orders] if pattern.any_tag else [[order] for order in tag_orders]
+        if pattern.category is not None:
+            groups.append([orders.categories.get(pattern.category, empty)])
+        return sorted(groups, key=lambda group: sum(map(len, group)))
+
+    def _matching(self, pattern: _Filter) -> set[int]:
+        groups = self._groups(self._orders["date"], pattern)
+        matching = set().union(*groups[0])
+        for group in groups[1:]:
+            matching.intersection_update(group[0] if len(group) == 1 else set().union(*group))
+        return matching
+
+    def _total(self, pattern: _Filter) -> int:
+        if not pattern.tags and pattern.category is not None:
+            return self._category_totals.get(pattern.category, 0)
+        if len(pattern.tags) == 1 and pattern.category is None:
+            return len(self._orders["date"].tags.get(pattern.tags[0], ()))
+        total = self._filter_totals.get(pattern)
+        if total is None:
+            total = len(self._matching(pattern))
+            if len(self._filter_totals) >= _MAX_CACHED_TOTALS:
+                self._filter_totals.clear()
+            self._filter_totals[pattern] = total
+        return total
+
+    def category_facets(
+        self, keywords: Optional[list[str]], keyword_mode: str
+    ) -> list[dict[str, Any]]:
+        """Counts per category; like the SQL facets, the category filter itself is ignored."""
+        pattern = self._filter(None, keywords, keyword_mode)
+        if pattern is None:
+            totals = self._category_totals
+        else:
+            categories = self._columns.categories
+            totals = Counter(categories[slot] for slot in self._matching(pattern))
+            totals.pop(_NONE, None)
+        names = self._columns.category_names
+        counts = sorted(
+            ((names[code], count) for code, count in totals.items()),
+            key=lambda item: (-item[1], item[0]),
+        )
+        return [{"value": value, "count": count} for value, count in counts]
+
+    def page(
+        self,
+        *,
+        sort: str,
+        limit: int,
+        offset: int = 0,
+        after: Optional[tuple[Any, int]] = None,
+        category: Optional[str] = None,
+        keywords: Optional[list[str]] = None,
+        keyword_mode: str = "all",
+        viewer_id: Optional[int] = None,
+        viewer_email: Optional[str] = None,
+    ) -> tuple[list[ListRow], int]:
+        """Up to ``limit`` rows in ``sort`` order, plus the number of rows matching the filters.
+
+        ``after`` is a decoded cursor; as in SQL, ``offset`` only applies without one.
+        """
+        # unknown sort options fall back to date_desc, as in ``app.queries``
+        column = "title" if sort in ("title_asc", "title_desc") else "date"
+        descending = sort not in ("date_asc", "title_asc")
+        key = self._key_function(self._columns, column)
+        orders = self._orders[column]
+        pattern = self._filter(category, keywords, keyword_mode)
+        matches: Optional[Callable[[int], bool]] = None
+        if pattern is None:
+            sources = [orders.slots]
+            total = self._live
+        else:
+            groups = self._groups(orders, pattern)
+            # walk the smallest group; with other groups to pass, test each of its rows
+            sources = groups[0]
+            if len(groups) > 1:
+                matches = _predicate(self._columns, pattern)
+            total = self._total(pattern)
+
+        position = None
+        if after is not None:
+            value, emoji_id = after
+            position = (_micros(value) if column == "date" else value, emoji_id)
+            offset = 0
+
+        def walk(order: array) -> range:
+            if position is None:
+                start = len(order) if descending else 0
+            else:
+                start = _bisect(order, position, key, right=not descending)
+            return range(start - 1, -1, -1) if descending else range(start, len(order))
+
+        # rows of a single source all match when it is the only filter: skip straight to offset
+        if len(sources) == 1 and matches is None:
+            order = sources[0]
+            picked = [order[index] for index in walk(order)[offset : offset + limit]]
+        else:
+            streams = [map(order.__getitem__, walk(order)) for order in sources]
+            slots: Iterator[int] = streams[0]
+            if len(streams) > 1:
+                slots = _unique(heapq.merge(*streams, key=key, reverse=descending))
+            picked = []
+            for slot in slots:
+                if matches is not None and not matches(slot):
+                    continue
+                if offset:
+                    offset -= 1
+                    continue
+                picked.append(slot)
+                if len(picked) == limit:
+                    break
+        return [self._list_row(slot, viewer_id, viewer_email) for slot in picked], total
+
+    def _list_row(
+        self, slot: int, viewer_id: Optional[int], viewer_email: Optional[str]
+    ) -> ListRow:
+        emoji_id, symbol, title, description, category, keywords, email, created, owner = (
+            self._columns.row(slot)
+        )
+        # mirrors ``can_delete_expression``: legacy rows without an owner match on email
+        can_delete = viewer_id is not None and (
+            owner == viewer_id or (owner is None and email == viewer_email)
+        )
+        return ListRow(
+            emoji_id, symbol, title, description, category, keywords, email, created, can_delete
+        )
+
+
+def _row_statement() -> Any:
+    table = EmojiSubmission.__table__
+    return select(
+        table.c.id,
+        table.c.symbol,
+        table.c.title,
+        table.c.description,
+        table.c.category,
+        table.c.keywords,
+        table.c.submitter_email,
+        table.c.created_at,
+        table.c.submitter_id,
+    )
+
+
+class SnapshotStore:
+    """Holds the current ``CatalogSnapshot`` and the ids changed since it was built."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshot: Optional[CatalogSnapshot] = None
+            self._slots: dict[int, int] = {}
+            # emoji id -> generation of its latest change; read back on the next refresh
+            self._pending: dict[int, int] = {}
+            self._generation = 0
+
+    @property
+    def current(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    @property
+    def stale(self) -> bool:
+        return self._snapshot is None or bool(self._pending)
+
+    def mark_changed(self, emoji_ids: Iterable[int]) -> None:
+        with self._lock:
+            self._generation += 1
+            for emoji_id in emoji_ids:
+                self._pending[emoji_id] = self._generation
+
+    def load(self, connection: Connection, chunk_size: int = 10_000) -> None:
+        with self._lock:
+            started = self._generation
+        result = connection.execute(_row_statement().execution_options(yield_per=chunk_size))
+        snapshot = CatalogSnapshot.build(
+            tuple(row) for partition in result.partitions() for row in partition
+        )
+        slots = {emoji_id: slot for slot, emoji_id in enumerate(snapshot._columns.ids)}
+        with self._lock:
+            self._snapshot, self._slots = snapshot, slots
+            # changes committed once the read had started are read back by the next refresh
+            self._pending = {
+                emoji_id: generation
+                for emoji_id, generation in self._pending.items()
+                if generation > started
+            }
+
+    def refresh(self, connection: Connection) -> CatalogSnapshot:
+        """The current snapshot, after loading it or applying pending changes."""
+        if self._snapshot is None:
+            self.load(connection)
+        with self._lock:
+            pending = dict(self._pending)
+        if pending:
+            table = EmojiSubmission.__table__
+            fetched = {
+                row[0]: tuple(row)
+                for row in connection.execute(
+                    _row_statement().where(table.c.id.in_(list(pending)))
+                )
+            }
+            with self._lock:
+                # a change newer than this read stays pending for the next refresh
+                changes = {
+                    emoji_id: fetched.get(emoji_id)
+                    for emoji_id, generation in pending.items()
+                    if self._pending.get(emoji_id) == generation
+                }
+                for emoji_id in changes:
+                    del self._pending[emoji_id]
+                if changes and self._snapshot is not None:
+                    self._snapshot = self._snapshot.apply(changes, self._slots)
+        return self._snapshot
+
+
+catalog_snapshot = SnapshotStore()
+subscribe_changes(lambda changes: catalog_snapshot.mark_changed(changes))
+
+
+__all__ = ["CatalogSnapshot", "ListRow", "SnapshotStore", "catalog_snapshot"]
@@ -0,0 +1,428 @@
+"""In-memory autocomplete over emoji titles and keywords.
+
+Every title word and keyword is a term. Terms are kept sorted for prefix lookups (a flat
+trie) and indexed by trigram, so a misspelled word can be matched to terms within a small
+edit distance without scanning the vocabulary. The index is loaded once per process and then
+follows committed writes: ORM changes are picked up from the session, and bulk Core writes
+report theirs with ``track_changes``. Other in-memory views of the catalog can follow the same
+changes with ``subscribe_changes``.
+"""
+from __future__ import annotations
+
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from typing import Any, Callable, NamedTuple, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session as ORMSession
+
+from app.models import EmojiSubmission
+from app.search import search_tokens
+
+# emoji id -> (symbol, title, keywords csv), or None once deleted
+Changes = dict[int, Optional[tuple[str, str, str]]]
+
+_PENDING_KEY = "suggest_changes"
+# ids gathered before ranking a multi-word or misspelled query; when every word is this
+# common, only a sample of the matches is ranked
+_MAX_CANDIDATES = 300
+# best entries kept per single-word prefix; suggest limits stay well under it, so deletes
+# rarely force a rebuild
+_PREFIX_TOP = 40
+# vocabulary words, most trigrams in common first, checked for edit distance per query word
+_MAX_FUZZY_TERMS = 64
+
+
+def _grams(text: str) -> set[str]:
+    padded = f"  {text}"
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+def _allowed_typos(token: str) -> int:
+    if len(token) < 3:
+        return 0
+    return 1 if len(token) <= 5 else 2
+
+
+def prefix_distance(token: str, term: str, bound: int) -> int:
+    """Edit distance from ``token`` to the closest prefix of ``term``, capped at ``bound + 1``."""
+    previous = list(range(len(token) + 1))
+    best = previous[-1]
+    for position, char in enumerate(term[: len(token) + bound], 1):
+        current = [position]
+        for index, token_char in enumerate(token, 1):
+            current.append(
+                min(
+                    previous[index] + 1,
+                    current[index - 1] + 1,
+                    previous[index - 1] + (token_char != char),
+                )
+            )
+        best = min(best, current[-1])
+        if min(current) > bound:
+            break
+        previous = current
+    return min(best, bound + 1)
+
+
+class _Entry(NamedTuple):
+    symbol: str
+    title: str
+    terms: tuple[str, ...]
+    # the query-independent end of the ranking: shorter titles first, then alphabetical
+    rank: tuple[int, str, int]
+    # the term the title starts with, if it starts with one
+    lead: Optional[str]
+
+
+class _PrefixTop:
+    """Best-ranked entries with a term starting with one prefix, kept up to date on writes."""
+
+    __slots__ = ("count", "top", "lead_count", "leads")
+
+    def __init__(self, entries: list[_Entry], prefix: str) -> None:
+        leads = [entry.rank for entry in entries if entry.lead and entry.lead.startswith(prefix)]
+        self.count = len(entries)
+        self.top = heapq.nsmallest(_PREFIX_TOP, (entry.rank for entry in entries))
+        self.lead_count = len(leads)
+        self.leads = heapq.nsmallest(_PREFIX_TOP, leads)
+
+    def short(self, limit: int) -> bool:
+        """Whether deletes left fewer ranks than ``limit`` results need."""
+        return len(self.top) < min(limit, self.count) or len(self.leads) < min(
+            limit, self.lead_count
+        )
+
+    def add(self, rank: tuple, lead: bool) -> None:
+        self.count += 1
+        _keep_best(self.top, rank)
+        if lead:
+            self.lead_count += 1
+            _keep_best(self.leads, rank)
+
+    def remove(self, rank: tuple, lead: bool) -> None:
+        self.count -= 1
+        _discard(self.top, rank)
+        if lead:
+            self.lead_count -= 1
+            _discard(self.leads, rank)
+
+
+def _keep_best(ranks: list[tuple], rank: tuple) -> None:
+    if len(ranks) < _PREFIX_TOP or rank < ranks[-1]:
+        insort(ranks, rank)
+        del ranks[_PREFIX_TOP:]
+
+
+def _discard(ranks: list, value: Any) -> None:
+    position = bisect_left(ranks, value)
+    if position < len(ranks) and ranks[position] == value:
+        del ranks[position]
+
+
+def _prefixes(terms: Iterable[str]) -> set[str]:
+    return {term[:end] for term in terms for end in range(1, len(term) + 1)}
+
+
+class SuggestIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop everything; the next ``suggest`` caller reloads from the database."""
+        with self._lock:
+            self.loaded = False
+            self._entries: dict[int, _Entry] = {}
+            self._postings: dict[str, set[int]] = {}
+            self._grams: dict[str, set[str]] = {}
+            self._terms: list[str] = []
+            # filled in per prefix as single-word queries ask for it
+            self._prefix_tops: dict[str, _PrefixTop] = {}
+            self._loading = 0
+            self._replay: Changes = {}
+
+    def load(self, connection: Connection, chunk_size: int = 10_000) -> None:
+        """Rebuild from the submission table."""
+        with self._lock:
+            self._loading += 1
+            self._replay = {}
+        fresh = SuggestIndex()
+        try:
+            table = EmojiSubmission.__table__
+            statement = select(table.c.id, table.c.symbol, table.c.title, table.c.keywords)
+            result = connection.execute(statement.execution_options(yield_per=chunk_size))
+            for partition in result.partitions():
+                for emoji_id, symbol, title, keywords in partition:
+                    fresh._add(emoji_id, symbol, title, keywords)
+        finally:
+            with self._lock:
+                self._loading -= 1
+                replay, self._replay = self._replay, {}
+        with self._lock:
+            self._entries = fresh._entries
+            self._postings = fresh._postings
+            self._grams = fresh._grams
+            self._terms = sorted(fresh._postings)
+            self._prefix_tops = {}
+            self.loaded = True
+            # writes committed while the table was being read
+            self._apply(replay)
+
+    def apply(self, changes: Changes) -> None:
+        with self._lock:
+            if self._loading:
+                self._replay.update(changes)
+            if self.loaded:
+                self._apply(changes)
+
+    def _apply(self, changes: Changes) -> None:
+        for emoji_id, row in changes.items():
+            self._remove(emoji_id)
+            if row is not None:
+                self._add(emoji_id, *row)
+
+    def _add(self, emoji_id: int, symbol: str, title: str, keywords: str) -> None:
+        title_terms = search_tokens(title)
+        terms = tuple(dict.fromkeys(title_terms + search_tokens(keywords.replace(",", " "))))
+        lead = title_terms[0] if title_terms and title.lower().startswith(title_terms[0]) else None
+        entry = _Entry(symbol, title, terms, (len(title), title, emoji_id), lead)
+        self._entries[emoji_id] = entry
+        for term in terms:
+            ids = self._postings.get(term)
+            if ids is None:
+                ids = self._postings[term] = set()
+                for gram in _grams(term):
+                    self._grams.setdefault(gram, set()).add(term)
+                # a loading index sorts its vocabulary once, at the end
+                if self.loaded:
+                    insort(self._terms, term)
+            ids.add(emoji_id)
+        self._update_prefix_tops(entry, _PrefixTop.add)
+
+    def _remove(self, emoji_id: int) -> None:
+        entry = self._entries.pop(emoji_id, None)
+        if entry is None:
+            return
+        for term in entry.terms:
+            ids = self._postings[term]
+            ids.discard(emoji_id)
+            if not ids:
+                del self._postings[term]
+                for gram in _grams(term):
+                    self._grams[gram].discard(term)
+                _discard(self._terms, term)
+        self._update_prefix_tops(entry, _PrefixTop.remove)
+
+    def _update_prefix_tops(
+        self, entry: _Entry, update: Callable[[_PrefixTop, tuple, bool], None]
+    ) -> None:
+        if not self._prefix_tops:
+            return
+        for prefix in _prefixes(entry.terms):
+            top = self._prefix_tops.get(prefix)
+            if top is not None:
+                update(top, entry.rank, bool(entry.lead and entry.lead.startswith(prefix)))
+                if not top.count:
+                    del self._prefix_tops[prefix]
+
+    def _terms_starting_with(self, prefix: str) -> Iterator[str]:
+        terms = self._terms
+        index = bisect_left(terms, prefix)
+        while index < len(terms) and terms[index].startswith(prefix):
+            yield terms[index]
+            index += 1
+
+    def _rank_prefix(self, token: str, limit: int) -> list[int]:
+        """``_rank`` for a query that is one word, from that prefix's best entries."""
+        top = self._prefix_tops.get(token)
+        if top is None or top.short(limit):
+            ids = set()
+            for term in self._terms_starting_with(token):
+                ids.update(self._postings[term])
+            if not ids:
+                return []
+            top = self._prefix_tops[token] = _PrefixTop(
+                [self._entries[emoji_id] for emoji_id in ids], token
+            )
+        # titles starting with the query come first; every prefix match costs nothing
+        ranked = [rank[2] for rank in top.leads[:limit]]
+        if len(ranked) < limit:
+            leading = set(ranked)
+            ranked += [rank[2] for rank in top.top if rank[2] not in leading][
+                : limit - len(ranked)
+            ]
+        return ranked
+
+    def _prefix_match_count(self, token: str) -> int:
+        """How many ids ``_prefix_matches`` gathers for ``token``, counting up to the cap."""
+        count = 0
+        for term in self._terms_starting_with(token):
+            count += len(self._postings[term])
+            if count >= _MAX_CANDIDATES:
+                break
+        return min(count, _MAX_CANDIDATES)
+
+    def _prefix_matches(self, token: str, costs: dict[int, int]) -> None:
+        for term in self._terms_starting_with(token):
+            for emoji_id in self._postings[term]:
+                costs[emoji_id] = 0
+                if len(costs) >= _MAX_CANDIDATES:
+                    return
+
+    def _typo_terms(self, token: str) -> dict[str, int]:
+        """Vocabulary words within the allowed edits of ``token``, with their distance."""
+        allowed = _allowed_typos(token)
+        if not allowed:
+            return {}
+        token_grams = _grams(token)
+        # a word within ``allowed`` edits still shares this many trigrams with the token
+        needed = max(1, len(token_grams) - 3 * allowed)
+        shared = Counter(term for gram in token_grams for term in self._grams.get(gram, ()))
+        terms = {}
+        for term, count in shared.most_common(_MAX_FUZZY_TERMS):
+            if count < needed:
+                break
+            distance = prefix_distance(token, term, allowed)
+            if distance <= allowed:
+                terms[term] = distance
+        return terms
+
+    def _fuzzy_matches(self, token: str, costs: dict[int, int]) -> None:
+        for term, distance in self._typo_terms(token).items():
+            for emoji_id in self._postings[term]:
+                if costs.get(emoji_id, distance + 1) > distance:
+                    costs[emoji_id] = distance
+                    if len(costs) >= _MAX_CANDIDATES:
+                        return
+
+    def _rank(self, query: str, tokens: list[str], limit: int, fuzzy: bool) -> list[int]:
+        # candidates come from the most selective word; the other words filter and score them
+        first = min(tokens, key=lambda token: (self._prefix_match_count(token), -len(token)))
+        total: dict[int, int] = {}
+        self._prefix_matches(first, total)
+        if fuzzy:
+            self._fuzzy_matches(first, total)
+        others = list(tokens)
+        others.remove(first)
+        for token in others:
+            typos = self._typo_terms(token) if fuzzy else {}
+            for emoji_id in list(total):
+                cost = _token_cost(self._entries[emoji_id].terms, token, typos)
+                if cost is None:
+                    del total[emoji_id]
+                else:
+                    total[emoji_id] += cost
+        if not total:
+            return []
+
+        def rank_key(emoji_id: int) -> tuple:
+            entry = self._entries[emoji_id]
+            return (total[emoji_id], not entry.title.lower().startswith(query), entry.rank)
+
+        return heapq.nsmallest(limit, total, key=rank_key)
+
+    def suggest(self, query: str, limit: int = 8) -> list[dict[str, Any]]:
+        """Best ``limit`` matches; typos are only considered when exact prefixes run short."""
+        tokens = search_tokens(query)
+        if not tokens:
+            return []
+        normalized = " ".join(query.lower().split())
+        with self._lock:
+            if tokens == [normalized] and limit <= _PREFIX_TOP:
+                ranked = self._rank_prefix(normalized, limit)
+            else:
+                ranked = self._rank(normalized, tokens, limit, fuzzy=False)
+            if len(ranked) < limit:
+                ranked = self._rank(normalized, tokens, limit, fuzzy=True)
+            entries = [(emoji_id, self._entries[emoji_id]) for emoji_id in ranked]
+        return [
+            {"id": emoji_id, "symbol": entry.symbol, "title": entry.title}
+            for emoji_id, entry in entries
+        ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _token_cost(terms: tuple[str, ...], token: str, typos: dict[str, int]) -> Optional[int]:
+    """Cost of ``token`` against an entry's terms, or None when none of them matches."""
+    best = None
+    for term in terms:
+        if term.startswith(token):
+            return 0
+        distance = typos.get(term)
+        if distance is not None and (best is None or distance < best):
+            best = distance
+    return best
+
+
+suggest_index = SuggestIndex()
+_change_listeners: list[Callable[[Changes], None]] = []
+
+
+def subscribe_changes(listener: Callable[[Changes], None]) -> None:
+    """Call ``listener`` with the emoji changes of every commit, after ``suggest_index``."""
+    _change_listeners.append(listener)
+
+
+def track_changes(
+    session: ORMSession,
+    *,
+    upserted: Iterable[tuple[int, str, str, str]] = (),
+    deleted: Iterable[int] = (),
+) -> None:
+    """Queue changes made with Core statements, applied to the index when ``session`` commits."""
+    pending: Changes = session.info.setdefault(_PENDING_KEY, {})
+    for emoji_id, symbol, title, keywords in upserted:
+        pending[emoji_id] = (symbol, title, keywords)
+    for emoji_id in deleted:
+        pending[emoji_id] = None
+
+
+@event.listens_for(ORMSession, "after_flush")
+def _collect_changes(session: ORMSession, flush_context: Any) -> None:
+    upserted = [
+        (instance.id, instance.symbol, instance.title, instance.keywords)
+        for instance in (*session.new, *session.dirty)
+        if isinstance(instance, EmojiSubmission)
+    ]
+    deleted = [
+        instance.id for instance in session.deleted if isinstance(instance, EmojiSubmission)
+    ]
+    if upserted or deleted:
+        track_changes(session, upserted=upserted, deleted=deleted)
+
+
+def apply_changes(changes: Changes) -> None:
+    """Apply committed changes to ``suggest_index`` and pass them to the subscribers."""
+    suggest_index.apply(changes)
+    for listener in _change_listeners:
+        listener(changes)
+
+
+@event.listens_for(ORMSession, "after_commit")
+def _apply_changes(session: ORMSession) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        apply_changes(changes)
+
+
+@event.listens_for(ORMSession, "after_soft_rollback")
+def _discard_changes(session: ORMSession, previous_transaction: Any) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+__all__ = [
+    "Changes",
+    "SuggestIndex",
+    "apply_changes",
+    "prefix_distance",
+    "subscribe_changes",
+    "suggest_index",
+    "track_changes",
+]
@@ -0,0 +1 @@
+"""Performance benchmarks for the emoji backend; see the individual modules for usage."""
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Load test for the API hot paths against a seeded SQLite catalog.
+
+Seeds a synthetic catalog (cached under benchmarks/.data), starts uvicorn on it, drives a
+weighted mix of requests from concurrent clients and writes per-scenario latency
+percentiles, throughput and the server's peak RSS as JSON. ``compare`` gates a run against
+a baseline and exits non-zero on regressions.
+
+Usage:
+    python -m benchmarks.load seed --rows 100k
+    python -m benchmarks.load run --rows 100k --concurrency 16 --duration 30 \\
+        --mix list=60,search=15,suggest=15,login=5,create=5 --output results.json
+    python -m benchmarks.load compare baseline.json results.json --max-regression 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+import httpx
+from sqlalchemy import create_engine, event, insert
+from sqlmodel import SQLModel
+
+from app.core.security import hash_password
+from app.db import apply_sqlite_pragmas
+from app.models import EmojiKeyword, EmojiSubmission, User
+from app.models.emoji import join_keywords
+from app.models.keyword import keyword_rows
+
+import app.facets  # noqa: F401 - registers the category count triggers
+import app.search  # noqa: F401 - registers the full-text index
+
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+PASSWORD = "BenchPassword123!"
+CATEGORIES = ("Smileys", "People", "Nature", "Food", "Travel", "Activities", "Objects", "Flags")
+SYMBOLS = ("😀", "🚀", "🎉", "🤖", "🌈", "🍕", "⚽", "🔥", "💡", "🎸")
+WORDS = (
+    "happy rocket party robot rainbow pizza ball fire idea guitar space launch smile night "
+    "sun moon star cloud rain snow tree flower cat dog fish bird car train plane boat music "
+    "book phone heart ghost crown magic coffee cake apple lemon"
+).split()
+DEFAULT_MIX = "list=60,search=15,suggest=15,login=5,create=5"
+# percentiles gated by ``compare``; throughput is gated separately
+GATED_LATENCIES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def parse_count(value: str) -> int:
+    """``1k``/``100k``/``1m`` style row counts."""
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    value = value.strip().lower()
+    if value[-1:] in multipliers:
+        return int(float(value[:-1]) * multipliers[value[-1]])
+    return int(value)
+
+
+def catalog_path(rows: int, users: int) -> Path:
+    return DATA_DIR / f"catalog-{rows}-{users}.db"
+
+
+def seed(rows: int, users: int, chunk_size: int = 10_000) -> Path:
+    """Build (or reuse) a catalog database with ``rows`` emojis owned by ``users`` users."""
+    path = catalog_path(rows, users)
+    if path.exists():
+        return path
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    partial.unlink(missing_ok=True)
+
+    engine = create_engine(f"sqlite:///{partial}")
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(rows)
+    hashed = hash_password(PASSWORD)
+    started = time.perf_counter()
+    base_time = datetime(2024, 1, 1)
+
+    with engine.begin() as connection:
+        connection.execute(
+            insert(User.__table__),
+            [
+                {
+                    "email": f"user{index}@bench.example",
+                    "hashed_password": hashed,
+                    "display_name": f"Bench User {index}",
+                    "is_active": True,
+                    "is_superuser": False,
+                }
+                for index in range(users)
+            ],
+        )
+
+    for start in range(0, rows, chunk_size):
+        batch = []
+        for emoji_id in range(start + 1, min(start + chunk_size, rows) + 1):
+            owner = rng.randrange(users)
+            words = rng.sample(WORDS, 3)
+            batch.append(
+                {
+                    "id": emoji_id,
+                    "symbol": rng.choice(SYMBOLS),
+                    "title": f"{words[0].title()} {words[1]} {emoji_id}",
+                    "description": f"A {words[2]} for {words[0]} moments.",
+                    "category": rng.choice(CATEGORIES),
+                    "keywords": join_keywords(rng.sample(WORDS, 3)),
+                    "submitter_email": f"user{owner}@bench.example",
+                    "submitter_id": owner + 1,
+                    "created_at": base_time + timedelta(seconds=emoji_id),
+                }
+            )
+        tags = [tag for row in batch for tag in keyword_rows(row["id"], row["keywords"])]
+        with engine.begin() as connection:
+            connection.execute(insert(EmojiSubmission.__table__), batch)
+            connection.execute(insert(EmojiKeyword.__table__), tags)
+        print(f"\rseeded {start + len(batch):,}/{rows:,} rows", end="", file=sys.stderr)
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql("ANALYZE")
+    engine.dispose()
+    partial.rename(path)
+    print(f"\nseeded {path.name} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return path
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+class Client:
+    """One simulated user: a connection, a login token and a random stream."""
+
+    def __init__(self, http: httpx.AsyncClient, index: int, users: int, seed_value: int):
+        self.http = http
+        self.rng = random.Random(seed_value * 1000 + index)
+        self.email = f"user{index % users}@bench.example"
+        self.index = index
+        self.created = 0
+        self.headers: dict[str, str] = {}
+
+    async def login(self) -> httpx.Response:
+        response = await self.http.post(
+            "/api/auth/login", json={"email": self.email, "password": PASSWORD}
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+
+async def scenario_list(client: Client) -> httpx.Response:
+    params: dict[str, Any] = {"limit": 50, "sort": client.rng.choice(("date_desc", "title_asc"))}
+    if client.rng.random() < 0.3:
+        params["category"] = client.rng.choice(CATEGORIES)
+    if client.rng.random() < 0.5:
+        params["offset"] = client.rng.randrange(0, 500, 50)
+    return await client.http.get("/api/emojis", params=params)
+
+
+async def scenario_search(client: Client) -> httpx.Response:
+    query = " ".join(client.rng.sample(WORDS, client.rng.choice((1, 2))))
+    return await client.http.get("/api/emojis", params={"search": query, "limit": 20})
+
+
+async def scenario_suggest(client: Client) -> httpx.Response:
+    word = client.rng.choice(WORDS)
+    prefix = word[: client.rng.randint(2, len(word))]
+    return await client.http.get("/api/emojis/suggest", params={"q": prefix})
+
+
+async def scenario_login(client: Client) -> httpx.Response:
+    return await client.login()
+
+
+async def scenario_create(client: Client) -> httpx.Response:
+    client.created += 1
+    payload = {
+        "symbol": client.rng.choice(SYMBOLS),
+        "title": f"Bench {client.index}-{client.created}-{time.time_ns()}",
+        "category": client.rng.choice(CATEGORIES),
+        "keywords": client.rng.sample(WORDS, 2),
+    }
+    return await client.http.post("/api/emojis", json=payload, headers=client.headers)
+
+
+SCENARIOS: dict[str, Callable[[Client], Any]] = {
+    "list": scenario_list,
+    "search": scenario_search,
+    "suggest": scenario_suggest,
+    "login": scenario_login,
+    "create": scenario_create,
+}
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+async def drive(
+    base_url: str,
+    *,
+    users: int,
+    concurrency: int,
+    duration: float,
+    mix: dict[str, float],
+    seed_value: int,
+) -> dict[str, Any]:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    errors: dict[str, int] = {name: 0 for name in names}
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        clients = [Client(http, index, users, seed_value) for index in range(concurrency)]
+        await asyncio.gather(*(client.login() for client in clients))
+
+        deadline = time.perf_counter() + duration
+
+        async def run_client(client: Client) -> None:
+            while time.perf_counter() < deadline:
+                name = client.rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = await SCENARIOS[name](client)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies[name].append(time.perf_counter() - started)
+                errors[name] += failed
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_client(client) for client in clients))
+        elapsed = time.perf_counter() - started
+
+    every = [value for values in latencies.values() for value in values]
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "total": summarize(every, sum(errors.values()), elapsed),
+        "scenarios": {
+            name: summarize(latencies[name], errors[name], elapsed) for name in names
+        },
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 600) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/api/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("server did not become ready in time")
+
+
+def peak_child_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    rows, users = parse_count(args.rows), args.users
+    mix = parse_mix(args.mix)
+    database = seed(rows, users)
+
+    # run on a copy so created rows do not leak into the cached catalog
+    working = database.with_name(f"run-{os.getpid()}.db")
+    working.write_bytes(database.read_bytes())
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{working}",
+        "BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        "SLOW_QUERY_THRESHOLD_MS": "0",
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+    ]  # fmt: skip
+    server = subprocess.Popen(command, env=env, cwd=Path(__file__).resolve().parent.parent)
+    try:
+        wait_until_ready(base_url, server)
+        results = asyncio.run(
+            drive(
+                base_url,
+                users=users,
+                concurrency=args.concurrency,
+                duration=args.duration,
+                mix=mix,
+                seed_value=args.seed,
+            )
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{working}{suffix}").unlink(missing_ok=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rows": rows,
+            "users": users,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "workers": args.workers,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "mix": mix,
+            "seed": args.seed,
+        },
+        **results,
+        "peak_rss_mb": peak_child_rss_mb(),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+    return report
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], max_regression: float) -> list[str]:
+    """Describe every metric that got worse than ``max_regression`` percent."""
+    failures = []
+    limit = 1 + max_regression / 100
+    for name, before in {"total": baseline["total"], **baseline["scenarios"]}.items():
+        after = current["total"] if name == "total" else current["scenarios"].get(name)
+        if after is None:
+            continue
+        for metric in GATED_LATENCIES:
+            if before[metric] and after[metric] > before[metric] * limit:
+                failures.append(f"{name}.{metric}: {before[metric]} -> {after[metric]}")
+        if after["throughput_rps"] * limit < before["throughput_rps"]:
+            failures.append(
+                f"{name}.throughput_rps: {before['throughput_rps']} -> {after['throughput_rps']}"
+            )
+        if after["errors"] > before["errors"]:
+            failures.append(f"{name}.errors: {before['errors']} -> {after['errors']}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="build a catalog database")
+    seed_parser.add_argument("--rows", default="100k", help="1k, 100k, 1m, ...")
+    seed_parser.add_argument("--users", type=int, default=100)
+
+    run_parser = commands.add_parser("run", help="load-test a seeded catalog")
+    run_parser.add_argument("--rows", default="100k", help="1k, 100k, 1m, ...")
+    run_parser.add_argument("--users", type=int, default=100)
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    run_parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,...")
+    run_parser.add_argument("--workers", type=int, default=1)
+    run_parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--output", help="write the JSON report here")
+
+    compare_parser = commands.add_parser("compare", help="fail if a run regressed")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--max-regression", type=float, default=10.0, help="allowed slowdown in percent"
+    )
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        print(seed(parse_count(args.rows), args.users))
+    elif args.command == "run":
+        run(args)
+    else:
+        baseline = json.loads(Path(args.baseline).read_text())
+        current = json.loads(Path(args.current).read_text())
+        failures = compare(baseline, current, args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            raise SystemExit(1)
+        print(f"no regressions beyond {args.max_regression}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: list page serialization through Pydantic + response_model versus the fast path.
+
+Usage: python -m benchmarks.serialization [--rounds 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.serializers import dump_json, emoji_list_payload, emoji_payload
+from app.models import EmojiSubmission
+from app.schemas import Emoji, EmojiListResponse
+
+PAGE_SIZES = (10, 50, 100)
+
+
+# the shape of a list_statement row
+ListRow = namedtuple(
+    "ListRow",
+    "id symbol title description category keywords submitter_email created_at can_delete",
+)
+
+
+def make_rows(count: int) -> list[EmojiSubmission]:
+    return [
+        EmojiSubmission(
+            id=index,
+            symbol="🚀",
+            title=f"Rocket {index}",
+            description="Symbolizes fast progress or launching new ideas.",
+            category="Travel",
+            keywords="launch,space,startup",
+            submitter_email=f"user{index}@example.com",
+            submitter_id=index,
+            created_at=datetime(2024, 1, 1),
+        )
+        for index in range(count)
+    ]
+
+
+async def pydantic_path(rows: list[EmojiSubmission], field) -> bytes:
+    items = [
+        Emoji(
+            id=row.id,
+            symbol=row.symbol,
+            title=row.title,
+            description=row.description,
+            category=row.category,
+            keywords=row.keyword_list,
+            submitter_email=row.submitter_email,
+            can_delete=False,
+        )
+        for row in rows
+    ]
+    result = EmojiListResponse(items=items, total=len(rows), limit=len(rows), offset=0)
+    content = await serialize_response(field=field, response_content=result)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+async def fast_path(rows: list[ListRow]) -> bytes:
+    items = [emoji_payload(row) for row in rows]
+    payload = emoji_list_payload(items, total=len(rows), limit=len(rows), offset=0, next_cursor=None)
+    return dump_json(payload)
+
+
+async def measure(rounds: int) -> list[dict[str, float]]:
+    field = create_response_field(name="Response_list_emojis", type_=EmojiListResponse)
+    results = []
+    for size in PAGE_SIZES:
+        rows = make_rows(size)
+        list_rows = [
+            ListRow(
+                row.id,
+                row.symbol,
+                row.title,
+                row.description,
+                row.category,
+                row.keywords,
+                row.submitter_email,
+                row.created_at,
+                False,
+            )
+            for row in rows
+        ]
+        timings = {}
+        for name, run in (
+            ("pydantic", lambda: pydantic_path(rows, field)),
+            ("fast", lambda: fast_path(list_rows)),
+        ):
+            await run()  # warm up
+            started = time.perf_counter()
+            for _ in range(rounds):
+                await run()
+            timings[name] = (time.perf_counter() - started) / rounds * 1000
+        results.append(
+            {
+                "page_size": size,
+                "pydantic_ms": timings["pydantic"],
+                "fast_ms": timings["fast"],
+                "speedup": timings["pydantic"] / timings["fast"],
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'page':>6} {'pydantic ms':>12} {'fast ms':>10} {'speedup':>8}")
+    for row in asyncio.run(measure(args.rounds)):
+        print(
+            f"{row['page_size']:>6} {row['pydantic_ms']:>12.3f} "
+            f"{row['fast_ms']:>10.3f} {row['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
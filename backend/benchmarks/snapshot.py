@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: ``GET /emojis`` pages served from the in-memory catalog snapshot.
+
+Times unfiltered, category, keyword and combined pages on a synthetic catalog shaped like the
+load test's, both on a settled snapshot and on the snapshot published right after a write.
+
+Usage: python -m benchmarks.snapshot [--rows 500k] [--max-ms 5.0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from app.snapshot import CatalogSnapshot
+from benchmarks.load import CATEGORIES, SYMBOLS, WORDS, parse_count
+
+# page filters, as ``CatalogSnapshot.page`` keyword arguments
+QUERIES: dict[str, Callable[[random.Random], dict[str, Any]]] = {
+    "unfiltered": lambda rng: {},
+    "category": lambda rng: {"category": rng.choice(CATEGORIES)},
+    "keyword": lambda rng: {"keywords": [rng.choice(WORDS)]},
+    "two_keywords": lambda rng: {"keywords": rng.sample(WORDS, 2)},
+    "any_keyword": lambda rng: {"keywords": rng.sample(WORDS, 2), "keyword_mode": "any"},
+    "keyword_category": lambda rng: {
+        "keywords": [rng.choice(WORDS)],
+        "category": rng.choice(CATEGORIES),
+    },
+    "deep_offset": lambda rng: {"category": rng.choice(CATEGORIES), "offset": 5000},
+}
+
+
+def _row(emoji_id: int, rng: random.Random) -> tuple:
+    words = rng.sample(WORDS, 3)
+    return (
+        emoji_id,
+        rng.choice(SYMBOLS),
+        f"{words[0].title()} {words[1]} {emoji_id}",
+        None,
+        rng.choice(CATEGORIES),
+        ",".join(rng.sample(WORDS, 3)),
+        "bench@example.com",
+        datetime(2024, 1, 1) + timedelta(seconds=rng.randrange(10**8)),
+        None,
+    )
+
+
+def measure(rows: int, rounds: int) -> dict[str, dict[str, float]]:
+    rng = random.Random(7)
+    snapshot = CatalogSnapshot.build(_row(emoji_id, rng) for emoji_id in range(1, rows + 1))
+    slots = {emoji_id: emoji_id - 1 for emoji_id in range(1, rows + 1)}
+    next_id = rows + 1
+    results = {}
+    for name, query in QUERIES.items():
+        for after_write in (False, True):
+            latencies = []
+            for _ in range(rounds):
+                if after_write:
+                    snapshot = snapshot.apply({next_id: _row(next_id, rng)}, slots)
+                    next_id += 1
+                page = query(rng)
+                sort = rng.choice(("date_desc", "date_asc", "title_asc"))
+                started = time.perf_counter()
+                snapshot.page(sort=sort, limit=51, **page)
+                latencies.append((time.perf_counter() - started) * 1000)
+            latencies.sort()
+            results[f"{name}{'+write' if after_write else ''}"] = {
+                "p50_ms": latencies[len(latencies) // 2],
+                "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+            }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=parse_count, default=500_000)
+    parser.add_argument("--rounds", type=int, default=300)
+    parser.add_argument(
+        "--max-ms", type=float, default=None, help="fail when a settled page's p99 is slower"
+    )
+    args = parser.parse_args()
+
+    results = measure(args.rows, args.rounds)
+    print(f"{'pages':>22} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, row in results.items():
+        print(f"{name:>22} {row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f}")
+    if args.max_ms is not None:
+        slow = [
+            name for name in QUERIES if results[name]["p99_ms"] > args.max_ms
+        ]
+        if slow:
+            sys.exit(f"p99 above {args.max_ms} ms for: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
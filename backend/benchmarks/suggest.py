@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: autocomplete latency on a synthetic catalog shaped like the load test's.
+
+Prefix results are built the first time a prefix is asked for, so "cold" times the first query
+of each prefix and every other row times repeat queries, including queries right after writes.
+
+Usage: python -m benchmarks.suggest [--rows 100k] [--max-ms 1.0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import Callable
+
+from app.suggest import SuggestIndex
+from benchmarks.load import SYMBOLS, WORDS, parse_count
+
+
+def build_index(rows: int, rng: random.Random) -> SuggestIndex:
+    index = SuggestIndex()
+    index.loaded = True
+    changes = {}
+    for emoji_id in range(1, rows + 1):
+        words = rng.sample(WORDS, 3)
+        title = f"{words[0].title()} {words[1]} {emoji_id}"
+        changes[emoji_id] = (rng.choice(SYMBOLS), title, ",".join(rng.sample(WORDS, 3)))
+    index.apply(changes)
+    return index
+
+
+def timed(queries: list[str], run: Callable[[str], object]) -> dict[str, float]:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        run(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+def measure(rows: int, rounds: int) -> dict[str, dict[str, float]]:
+    rng = random.Random(7)
+    index = build_index(rows, rng)
+    # what the load test's suggest scenario sends: a prefix of one word
+    words = [rng.choice(WORDS) for _ in range(rounds)]
+    prefixes = [word[: rng.randint(2, len(word))] for word in words]
+    next_id = rows + 1
+
+    def after_write(query: str) -> None:
+        nonlocal next_id
+        index.apply({next_id: ("🆕", f"{query.title()}ish {next_id}", "")})
+        next_id += 1
+        index.suggest(query)
+
+    results = {"cold": timed(sorted(set(prefixes)), index.suggest)}
+    results["word"] = timed(prefixes, index.suggest)
+    results["after_write"] = timed(prefixes, after_write)
+    results["two_words"] = timed(
+        [f"{rng.choice(WORDS)} {prefix}" for prefix in prefixes], index.suggest
+    )
+    results["typo"] = timed([f"{word}x"[1:] + word[0] for word in words], index.suggest)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=parse_count, default=100_000)
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument(
+        "--max-ms", type=float, default=None, help="fail when a warm word query p99 is slower"
+    )
+    args = parser.parse_args()
+
+    results = measure(args.rows, args.rounds)
+    print(f"{'queries':>12} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, row in results.items():
+        print(f"{name:>12} {row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f}")
+    if args.max_ms is not None:
+        slow = [name for name in ("word", "after_write") if results[name]["p99_ms"] > args.max_ms]
+        if slow:
+            sys.exit(f"p99 above {args.max_ms} ms for: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Bulk-import emojis from an NDJSON or CSV file (or stdin) as submissions owned by a user.
+Existing (symbol, title) pairs are skipped; one line per rejected row is printed.
+"""
+
+import argparse
+import sys
+import time
+
+from sqlmodel import Session, select
+
+from app.db import engine, init_db
+from app.importer import IMPORT_FORMATS, import_lines
+from app.invalidation import RESTART_HINT, publish_offline_writes
+from app.models import User
+
+
+def import_emojis(path, owner_email, fmt=None, batch_size=1000):
+    """Import ``path`` ("-" for stdin); returns per-status counts."""
+    init_db()
+    if fmt is None:
+        fmt = "csv" if path.endswith(".csv") else "ndjson"
+
+    counts = {"created": 0, "duplicate": 0, "invalid": 0}
+    started = time.perf_counter()
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    with stream, Session(engine) as session:
+        owner = session.exec(select(User).where(User.email == owner_email)).first()
+        if owner is None:
+            raise SystemExit(f"No user with email {owner_email}")
+
+        for outcome in import_lines(session, stream, fmt, owner.id, owner.email, batch_size):
+            counts[outcome.status] += 1
+            if outcome.status != "created":
+                print(f"line {outcome.line}: {outcome.status}: {outcome.detail}")
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✓ Created {counts['created']}, skipped {counts['duplicate']} duplicates, "
+        f"rejected {counts['invalid']} invalid rows in {elapsed:.1f}s"
+    )
+    if counts["created"] and not publish_offline_writes():
+        print(RESTART_HINT)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", help="NDJSON or CSV file, or - for stdin")
+    parser.add_argument("--owner", required=True, help="email of the user who owns the rows")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="default: from file extension")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    import_emojis(args.path, args.owner, args.format, args.batch_size)
@@ -8,7 +8,9 @@ from sqlmodel import Session, select
 
 from app.core.security import hash_password
 from app.db import engine, init_db
-from app.models import EmojiSubmission, User
+from app.importer import import_records
+from app.invalidation import RESTART_HINT, publish_offline_writes
+from app.models import User
 
 CATALOG_EMOJIS = [
     {
@@ -74,40 +76,19 @@ def migrate_catalog():
         else:
             print(f"✓ User already exists with ID: {user.id}")
 
-        # Add catalog emojis
+        # Add catalog emojis in one set-based batch; existing ones are skipped
         added_count = 0
         skipped_count = 0
 
-        for emoji_data in CATALOG_EMOJIS:
-            # Check if emoji already exists
-            existing = session.exec(
-                select(EmojiSubmission).where(
-                    EmojiSubmission.symbol == emoji_data["symbol"],
-                    EmojiSubmission.title == emoji_data["title"],
-                )
-            ).first()
-
-            if existing:
-                print(f"⊘ Skipping '{emoji_data['title']}' - already exists")
+        records = [(line, emoji_data) for line, emoji_data in enumerate(CATALOG_EMOJIS, 1)]
+        for outcome in import_records(session, records, user.id, OWNER_EMAIL):
+            emoji_data = CATALOG_EMOJIS[outcome.line - 1]
+            if outcome.status == "created":
+                print(f"✓ Added '{emoji_data['title']}' ({emoji_data['symbol']})")
+                added_count += 1
+            else:
+                print(f"⊘ Skipping '{emoji_data['title']}' - {outcome.detail}")
                 skipped_count += 1
-                continue
-
-            # Create emoji submission
-            submission = EmojiSubmission(
-                symbol=emoji_data["symbol"],
-                title=emoji_data["title"],
-                description=emoji_data["description"],
-                category=emoji_data["category"],
-                submitter_email=OWNER_EMAIL,
-                submitter_id=user.id,
-            )
-            submission.keyword_list = emoji_data["keywords"]
-
-            session.add(submission)
-            print(f"✓ Added '{emoji_data['title']}' ({emoji_data['symbol']})")
-            added_count += 1
-
-        session.commit()
 
         print(f"\n{'='*50}")
         print(f"Migration complete!")
@@ -116,6 +97,9 @@ def migrate_catalog():
         print(f"  Owner: {OWNER_EMAIL} (ID: {user.id})")
         print(f"{'='*50}")
 
+    if added_count and not publish_offline_writes():
+        print(RESTART_HINT)
+
 
 if __name__ == "__main__":
     migrate_catalog()
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Migration script to rebuild the normalized keyword table from EmojiSubmission.keywords.
+Safe to run repeatedly; init_db runs it automatically when the table is first created.
+"""
+
+from app.db import engine, init_db
+from app.models.keyword import backfill_keywords
+
+
+def migrate_keywords():
+    """Backfill emojikeyword from the comma-joined keywords column."""
+    init_db()
+
+    with engine.begin() as connection:
+        written = backfill_keywords(connection)
+
+    print(f"✓ Indexed {written} emoji keywords")
+
+
+if __name__ == "__main__":
+    migrate_keywords()
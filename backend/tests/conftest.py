@@ -1,36 +1,89 @@
 from __future__ import annotations
 
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
+from app.api.caching import list_response_cache
+from app.api.deps import clear_auth_cache, get_read_session
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db import apply_sqlite_pragmas, clear_primary_pins, get_session, get_session_factory
 from app.main import app as fastapi_app
+from app.snapshot import catalog_snapshot
+from app.suggest import suggest_index
 
 import app.models  # noqa: F401
 
 
+@pytest.fixture(autouse=True)
+def fast_password_hashing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+
+
+def clear_caches() -> None:
+    clear_auth_cache()
+    clear_primary_pins()
+    suggest_index.clear()
+    catalog_snapshot.clear()
+    metrics.reset()
+    if list_response_cache is not None:
+        list_response_cache.clear()
+        list_response_cache.reset_stats()
+
+
+@pytest.fixture(autouse=True)
+def reset_caches() -> Generator:
+    clear_caches()
+    yield
+    clear_caches()
+
+
+@pytest.fixture()
+def database_path(tmp_path) -> str:
+    # a file, so the sync fixture engine and the app's async engine see the same data
+    return str(tmp_path / "test.db")
+
+
 @pytest.fixture()
-def engine() -> Generator:
+def engine(database_path: str) -> Generator:
     test_engine = create_engine(
-        "sqlite://",
+        f"sqlite:///{database_path}",
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
     )
+    event.listen(test_engine, "connect", apply_sqlite_pragmas)
     SQLModel.metadata.create_all(test_engine)
     yield test_engine
+    test_engine.dispose()
 
 
 @pytest.fixture()
-def client(engine) -> Generator[TestClient, None, None]:
-    def get_test_session() -> Generator[Session, None, None]:
-        with Session(engine) as session:
+def async_engine(engine, database_path: str):
+    # TestClient may drive each request on a fresh event loop, so never reuse connections.
+    test_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+    event.listen(test_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    return test_engine
+
+
+@pytest.fixture()
+def client(async_engine) -> Generator[TestClient, None, None]:
+    session_factory = async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    async def get_test_session() -> AsyncGenerator[AsyncSession, None]:
+        async with session_factory() as session:
             yield session
 
     fastapi_app.dependency_overrides[get_session] = get_test_session
+    fastapi_app.dependency_overrides[get_read_session] = get_test_session
+    fastapi_app.dependency_overrides[get_session_factory] = lambda: session_factory
     test_client = TestClient(fastapi_app)
     yield test_client
     fastapi_app.dependency_overrides.clear()
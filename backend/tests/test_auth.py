@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import threading
+
 from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core import security
+from app.core.config import settings
+from app.models import User
 
 
 def register_payload(email: str = "user@example.com", password: str = "SecretPwd123!") -> dict[str, str]:
@@ -57,3 +64,62 @@ def test_login_with_invalid_credentials(client: TestClient) -> None:
     )
     assert bad_login.status_code == 401
     assert bad_login.json()["detail"] == "Incorrect email or password"
+
+
+def test_profile_reflects_user_changes_despite_cache(client: TestClient, engine) -> None:
+    payload = register_payload()
+    client.post("/api/auth/register", json=payload)
+    token = client.post(
+        "/api/auth/login",
+        json={"email": payload["email"], "password": payload["password"]},
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/api/auth/me", headers=headers).json()["display_name"] == "Emoji Fan"
+
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.email == payload["email"])).one()
+        user.display_name = "Renamed"
+        session.add(user)
+        session.commit()
+    assert client.get("/api/auth/me", headers=headers).json()["display_name"] == "Renamed"
+
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.email == payload["email"])).one()
+        user.is_active = False
+        session.add(user)
+        session.commit()
+    assert client.get("/api/auth/me", headers=headers).status_code == 403
+
+
+def test_cached_token_still_rejects_garbage(client: TestClient) -> None:
+    response = client.get("/api/auth/me", headers={"Authorization": "Bearer not.a.token"})
+    assert response.status_code == 401
+
+
+def test_login_rehashes_when_cost_changes(client: TestClient, engine, monkeypatch) -> None:
+    payload = register_payload()
+    client.post("/api/auth/register", json=payload)
+
+    monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+    login = {"email": payload["email"], "password": payload["password"]}
+    assert client.post("/api/auth/login", json=login).status_code == 200
+
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.email == payload["email"])).one()
+        assert user.hashed_password.startswith("$2b$05$")
+    assert client.post("/api/auth/login", json=login).status_code == 200
+
+
+def test_login_fails_fast_when_hashing_pool_is_full(client: TestClient, monkeypatch) -> None:
+    payload = register_payload()
+    client.post("/api/auth/register", json=payload)
+
+    monkeypatch.setattr(security, "_hash_slots", threading.BoundedSemaphore(1))
+    security._hash_slots.acquire()
+    response = client.post(
+        "/api/auth/login",
+        json={"email": payload["email"], "password": payload["password"]},
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
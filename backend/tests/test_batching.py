@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import batching
+from app.batching import CreateBatcher, DuplicateEmoji
+
+
+def _row(symbol: str, title: str, keywords: str = "") -> dict:
+    return {
+        "symbol": symbol,
+        "title": title,
+        "description": None,
+        "category": None,
+        "keywords": keywords,
+        "submitter_email": "batch@example.com",
+        "submitter_id": None,
+    }
+
+
+def test_concurrent_submissions_share_one_commit(engine, async_engine) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO emojisubmission (symbol, title, keywords, created_at) "
+                "VALUES ('🚀', 'Rocket', '', '2024-01-01')"
+            )
+        )
+    session_factory = async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    commits = []
+    event.listen(async_engine.sync_engine, "commit", lambda connection: commits.append(1))
+    batcher = CreateBatcher(window_ms=20, max_items=100)
+
+    async def scenario() -> list:
+        rows = [
+            _row("🐢", "Turtle", "animal,slow"),
+            _row("🚀", "Rocket"),
+            _row("🐇", "Rabbit", "animal"),
+            _row("🐢", "Turtle"),
+        ]
+        return await asyncio.gather(
+            *(batcher.submit(session_factory, row) for row in rows), return_exceptions=True
+        )
+
+    turtle, rocket, rabbit, second_turtle = asyncio.run(scenario())
+
+    assert isinstance(turtle, int) and isinstance(rabbit, int)
+    assert isinstance(rocket, DuplicateEmoji)
+    assert isinstance(second_turtle, DuplicateEmoji)
+    assert len(commits) == 1
+    with engine.connect() as connection:
+        tags = connection.execute(
+            text("SELECT keyword FROM emojikeyword WHERE emoji_id = :id ORDER BY keyword"),
+            {"id": turtle},
+        ).scalars()
+        assert list(tags) == ["animal", "slow"]
+
+
+def test_full_batch_flushes_before_the_window_closes(async_engine) -> None:
+    session_factory = async_sessionmaker(
+        async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    batcher = CreateBatcher(window_ms=60_000, max_items=2)
+
+    async def scenario() -> list[int]:
+        submissions = [
+            batcher.submit(session_factory, _row("🍎", "Apple")),
+            batcher.submit(session_factory, _row("🍐", "Pear")),
+        ]
+        return await asyncio.wait_for(asyncio.gather(*submissions), timeout=5)
+
+    assert len(set(asyncio.run(scenario()))) == 2
+
+
+def test_create_endpoint_uses_the_batcher(client, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(batching.create_batcher, "window_ms", 5)
+    account = {"email": "batch@example.com", "password": "SecretPwd123!"}
+    client.post("/api/auth/register", json={**account, "display_name": "Batcher"})
+    token = client.post("/api/auth/login", json=account).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = {"symbol": "🎈", "title": "Balloon", "keywords": ["party", " party"]}
+
+    response = client.post("/api/emojis", json=payload, headers=headers)
+    assert response.status_code == 201
+    body = response.json()
+    assert body["keywords"] == ["party"]
+    assert body["submitter_email"] == "batch@example.com"
+    assert body["can_delete"] is True
+
+    duplicate = client.post("/api/emojis", json=payload, headers=headers)
+    assert duplicate.status_code == 400
+    assert duplicate.json()["detail"] == "Emoji already exists"
+
+    listed = client.get("/api/emojis?search=balloon").json()["items"]
+    assert [item["id"] for item in listed] == [body["id"]]
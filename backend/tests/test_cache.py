@@ -0,0 +1,67 @@
+from app.api.endpoints import emojis
+from app.catalog import catalog_version
+from app.core.cache import ResponseCache, SQLiteCacheBackend, TTLCache
+
+
+def test_ttl_cache_expires_and_evicts_least_recent() -> None:
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path) -> None:
+    path = str(tmp_path / "cache.db")
+    writer = ResponseCache(SQLiteCacheBackend(path, maxsize=2, ttl=60))
+    reader = ResponseCache(SQLiteCacheBackend(path, maxsize=2, ttl=60))
+
+    writer.set("a", b"1")
+    writer.set("b", b"2")
+    writer.set("c", b"3")
+    assert reader.get("c") == b"3"
+    assert reader.get("a") is None
+
+    reader.clear()
+    assert writer.get("c") is None
+    assert writer.stats()["misses"] == 1
+
+
+def test_workers_sharing_a_sqlite_cache_hit_each_others_pages(
+    client, tmp_path, monkeypatch
+) -> None:
+    path = str(tmp_path / "cache.db")
+    workers = [ResponseCache(SQLiteCacheBackend(path, maxsize=10, ttl=60)) for _ in range(2)]
+
+    def serve_from(worker: ResponseCache) -> None:
+        # what a worker process configured with RESPONSE_CACHE_BACKEND=sqlite sets up
+        monkeypatch.setattr(emojis, "list_response_cache", worker)
+        catalog_version.share(worker.backend)
+
+    monkeypatch.setattr(catalog_version, "_store", None)
+    serve_from(workers[0])
+    first = client.get("/api/emojis?limit=5")
+    assert workers[0].stats()["misses"] == 1
+
+    serve_from(workers[1])
+    second = client.get("/api/emojis?limit=5")
+    assert workers[1].stats()["hits"] == 1
+    assert second.headers["etag"] == first.headers["etag"]
+    revalidated = client.get(
+        "/api/emojis?limit=5", headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+
+    catalog_version.bump()  # a write served by the second worker
+    serve_from(workers[0])
+    assert client.get("/api/emojis?limit=5").headers["etag"] != first.headers["etag"]
+    assert workers[0].stats()["misses"] == 2
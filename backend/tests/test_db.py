@@ -0,0 +1,246 @@
+import asyncio
+import logging
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app import db
+from app.api.deps import get_read_session
+from app.core.config import settings
+from app.db import (
+    ReadReplicas,
+    async_database_url,
+    clear_primary_pins,
+    create_request_engine,
+    engine_options,
+    init_db,
+    install_slow_query_log,
+    pin_to_primary,
+    pinned_to_primary,
+    read_session,
+)
+from app.main import app as fastapi_app
+
+
+def test_sqlite_connections_use_wal_and_busy_timeout(engine) -> None:
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+
+def test_engine_options_size_the_pool_for_file_databases() -> None:
+    options = engine_options("sqlite:///./app.db")
+    assert options["pool_size"] == 5
+    assert options["max_overflow"] == 10
+    assert options["pool_pre_ping"] is False
+    assert engine_options("postgresql://u:p@db/emoji")["pool_pre_ping"] is True
+
+    in_memory = engine_options("sqlite://")
+    assert "pool_size" not in in_memory
+    assert in_memory["connect_args"] == {"check_same_thread": False}
+
+
+def test_async_database_url_swaps_driver() -> None:
+    assert async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert async_database_url("postgresql://u:p@db/emoji") == "postgresql+asyncpg://u:p@db/emoji"
+
+
+def test_slow_query_log_records_sql_parameters_and_plan(database_path, engine, caplog) -> None:
+    logged_engine = create_engine(f"sqlite:///{database_path}")
+    install_slow_query_log(logged_engine, threshold_ms=1e-6)
+
+    with caplog.at_level(logging.WARNING, logger="app.db.slow_query"):
+        with logged_engine.connect() as connection:
+            connection.execute(
+                text("SELECT id FROM emojisubmission WHERE title = :title"), {"title": "Rocket"}
+            ).all()
+
+    message = caplog.records[-1].getMessage()
+    assert "SELECT id FROM emojisubmission WHERE title = ?" in message
+    assert "('Rocket',)" in message
+    assert "SEARCH emojisubmission USING COVERING INDEX ix_emojisubmission_title_id" in message
+    logged_engine.dispose()
+
+
+def _marker_database(path, name: str) -> str:
+    marker_engine = create_engine(f"sqlite:///{path}")
+    with marker_engine.begin() as connection:
+        connection.execute(text("CREATE TABLE marker (name TEXT)"))
+        connection.execute(text("INSERT INTO marker VALUES (:name)"), {"name": name})
+    marker_engine.dispose()
+    return f"sqlite:///{path}"
+
+
+def test_read_session_round_robins_and_skips_unreachable_replicas(tmp_path) -> None:
+    now = [0.0]
+    replicas = ReadReplicas(
+        [
+            _marker_database(tmp_path / "a.db", "a"),
+            f"sqlite:///{tmp_path / 'missing' / 'b.db'}",
+            _marker_database(tmp_path / "c.db", "c"),
+        ],
+        retry_after=10,
+        timer=lambda: now[0],
+    )
+    primary_engine = create_request_engine(_marker_database(tmp_path / "primary.db", "primary"))
+    primary = async_sessionmaker(primary_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def read_marker(user_id=None) -> str:
+        async with read_session(user_id, replicas=replicas, primary=primary) as session:
+            return (await session.exec(text("SELECT name FROM marker"))).scalar_one()
+
+    async def scenario() -> list[str]:
+        seen = [await read_marker() for _ in range(4)]
+        assert replicas.healthy() == 2
+        pin_to_primary(7)
+        seen.append(await read_marker(user_id=7))
+        seen.append(await read_marker(user_id=8))
+        now[0] = 11  # the unreachable replica is tried again, and fails again
+        seen.append(await read_marker())
+        seen.append(await read_marker())
+        await replicas.dispose()
+        await primary_engine.dispose()
+        return seen
+
+    assert asyncio.run(scenario()) == ["a", "c", "c", "a", "primary", "c", "c", "a"]
+
+
+def test_read_session_uses_primary_without_replicas(tmp_path) -> None:
+    primary_engine = create_request_engine(_marker_database(tmp_path / "primary.db", "primary"))
+    primary = async_sessionmaker(primary_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def scenario() -> str:
+        async with read_session(replicas=ReadReplicas([]), primary=primary) as session:
+            name = (await session.exec(text("SELECT name FROM marker"))).scalar_one()
+        await primary_engine.dispose()
+        return name
+
+    assert asyncio.run(scenario()) == "primary"
+
+
+def test_writes_pin_the_user_to_the_primary(client) -> None:
+    client.post(
+        "/api/auth/register",
+        json={"email": "pin@example.com", "password": "SecretPwd123!", "display_name": "Pin"},
+    )
+    user_id = client.get("/api/auth/me", headers=_login(client)).json()["id"]
+    clear_primary_pins()
+
+    headers = _login(client)
+    client.get("/api/emojis", headers=headers)
+    assert not pinned_to_primary(user_id)
+
+    payload = {"symbol": "📌", "title": "Pushpin", "keywords": []}
+    assert client.post("/api/emojis", json=payload, headers=headers).status_code == 201
+    assert pinned_to_primary(user_id)
+
+
+def _login(client) -> dict[str, str]:
+    response = client.post(
+        "/api/auth/login", json={"email": "pin@example.com", "password": "SecretPwd123!"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_init_db_numbers_duplicate_titles_before_adding_the_unique_index(
+    tmp_path, monkeypatch, caplog
+) -> None:
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as connection:
+        # the table as it was before (symbol, title) had to be unique
+        connection.execute(
+            text(
+                "CREATE TABLE emojisubmission (id INTEGER PRIMARY KEY, symbol VARCHAR(8) NOT NULL,"
+                " title VARCHAR(128) NOT NULL, description VARCHAR(256), category VARCHAR(64),"
+                " keywords VARCHAR(512) NOT NULL DEFAULT '', submitter_email VARCHAR(256),"
+                " created_at DATETIME NOT NULL)"
+            )
+        )
+        for symbol, title in [("🌙", "Moon"), ("🌙", "Moon"), ("🌙", "Moon (2)"), ("🌙", "Moon")]:
+            connection.execute(
+                text(
+                    "INSERT INTO emojisubmission (symbol, title, created_at)"
+                    " VALUES (:symbol, :title, '2024-01-01')"
+                ),
+                {"symbol": symbol, "title": title},
+            )
+    monkeypatch.setattr(db, "engine", legacy)
+    monkeypatch.setattr(settings, "database_url", str(legacy.url))
+
+    with caplog.at_level(logging.WARNING, logger="app.db.migrations"):
+        init_db()
+
+    with legacy.connect() as connection:
+        titles = connection.execute(text("SELECT title FROM emojisubmission ORDER BY id"))
+        assert titles.scalars().all() == ["Moon", "Moon (3)", "Moon (2)", "Moon (4)"]
+        with pytest.raises(IntegrityError):
+            connection.execute(
+                text(
+                    "INSERT INTO emojisubmission (symbol, title, created_at)"
+                    " VALUES ('🌙', 'Moon', '2024-01-01')"
+                )
+            )
+    assert "🌙 'Moon'" in caplog.text
+    legacy.dispose()
+
+
+def test_read_session_checks_out_a_replica_only_when_used(tmp_path) -> None:
+    replicas = ReadReplicas([_marker_database(tmp_path / "a.db", "a")])
+    primary_engine = create_request_engine(_marker_database(tmp_path / "primary.db", "primary"))
+    primary = async_sessionmaker(primary_engine, class_=AsyncSession, expire_on_commit=False)
+    checkouts = []
+    for target in (replicas.engine(0), primary_engine.sync_engine):
+        event.listen(target, "checkout", lambda *args, url=target.url: checkouts.append(url))
+
+    async def scenario() -> str:
+        async with read_session(replicas=replicas, primary=primary) as session:
+            # e.g. a request answered with a 304 or from the response cache
+            assert session.get_bind().dialect.name == "sqlite"
+        assert checkouts == []
+        async with read_session(replicas=replicas, primary=primary) as session:
+            name = (await session.exec(text("SELECT name FROM marker"))).scalar_one()
+        await replicas.dispose()
+        await primary_engine.dispose()
+        return name
+
+    assert asyncio.run(scenario()) == "a"
+    assert checkouts == [replicas.engine(0).url]
+
+
+def test_list_pages_from_a_lagging_replica_are_not_cached_or_tagged(
+    client, engine, async_engine, tmp_path
+) -> None:
+    client.post(
+        "/api/auth/register",
+        json={"email": "pin@example.com", "password": "SecretPwd123!", "display_name": "Pin"},
+    )
+    headers = _login(client)
+    lagging = tmp_path / "replica.db"
+    with engine.connect() as connection:
+        connection.exec_driver_sql(f"VACUUM INTO '{lagging}'")
+    assert client.post(
+        "/api/emojis", json={"symbol": "🚀", "title": "Rocket"}, headers=headers
+    ).status_code == 201
+    clear_primary_pins()
+
+    replicas = ReadReplicas([f"sqlite:///{lagging}"])
+    primary = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def replica_session():
+        async with read_session(replicas=replicas, primary=primary) as session:
+            yield session
+
+    fastapi_app.dependency_overrides[get_read_session] = replica_session
+    # anonymous pages go in the response cache under the new version: read from the primary
+    anonymous = client.get("/api/emojis")
+    assert [item["title"] for item in anonymous.json()["items"]] == ["Rocket"]
+    assert "etag" in anonymous.headers
+    # the viewer's own page comes from the replica, which has not seen the write yet
+    viewer = client.get("/api/emojis", headers=headers)
+    assert viewer.json()["items"] == []
+    assert "etag" not in viewer.headers
+    asyncio.run(replicas.dispose())
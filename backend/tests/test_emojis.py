@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 
 
@@ -32,6 +34,58 @@ def test_list_emojis(client: TestClient) -> None:
     assert data["offset"] == 0
 
 
+def test_list_total_counts_all_matches(client: TestClient) -> None:
+    headers = auth_headers(client)
+    for index in range(3):
+        client.post(
+            "/api/emojis",
+            headers=headers,
+            json={"symbol": "⭐", "title": f"Star {index}", "category": "Nature"},
+        )
+    client.post("/api/emojis", headers=headers, json={"symbol": "🍎", "title": "Apple"})
+
+    data = client.get("/api/emojis?category=Nature&limit=2").json()
+    assert len(data["items"]) == 2
+    assert data["total"] == 3
+
+    data = client.get("/api/emojis?category=Nature&limit=2&include_total=false").json()
+    assert len(data["items"]) == 2
+    assert data["total"] is None
+
+
+def test_cursor_pagination_walks_every_item_once(client: TestClient) -> None:
+    headers = auth_headers(client)
+    for title in ["Delta", "Alpha", "Echo", "Charlie", "Bravo"]:
+        client.post("/api/emojis", headers=headers, json={"symbol": "🔤", "title": title})
+
+    for sort, expected in [
+        ("title_asc", ["Alpha", "Bravo", "Charlie", "Delta", "Echo"]),
+        ("date_desc", ["Bravo", "Charlie", "Echo", "Alpha", "Delta"]),
+    ]:
+        seen: list[str] = []
+        params = {"sort": sort, "limit": 2}
+        while True:
+            page = client.get("/api/emojis", params=params).json()
+            seen.extend(item["title"] for item in page["items"])
+            if page["next_cursor"] is None:
+                break
+            params["cursor"] = page["next_cursor"]
+        assert seen == expected
+
+
+def test_cursor_must_match_sort(client: TestClient) -> None:
+    headers = auth_headers(client)
+    for title in ["One", "Two"]:
+        client.post("/api/emojis", headers=headers, json={"symbol": "🔢", "title": title})
+
+    next_cursor = client.get("/api/emojis?sort=title_asc&limit=1").json()["next_cursor"]
+    assert next_cursor is not None
+
+    mismatched = client.get("/api/emojis", params={"sort": "date_desc", "cursor": next_cursor})
+    assert mismatched.status_code == 400
+    assert client.get("/api/emojis?cursor=not-a-cursor").status_code == 400
+
+
 def test_submit_emoji(client: TestClient) -> None:
     headers = auth_headers(client)
     payload = {
@@ -70,6 +124,18 @@ def test_duplicate_submission_rejected(client: TestClient) -> None:
     assert duplicate.json()["detail"] == "Emoji already exists"
 
 
+def test_update_into_duplicate_rejected(client: TestClient) -> None:
+    headers = auth_headers(client)
+    client.post("/api/emojis", json={"symbol": "🧊", "title": "Ice Cube"}, headers=headers)
+    other = client.post("/api/emojis", json={"symbol": "🧊", "title": "Ice"}, headers=headers)
+
+    response = client.put(
+        f"/api/emojis/{other.json()['id']}", json={"title": "Ice Cube"}, headers=headers
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Emoji already exists"
+
+
 def test_delete_requires_owner(client: TestClient) -> None:
     owner_headers = auth_headers(client, email="owner@example.com")
     other_headers = auth_headers(client, email="other@example.com")
@@ -92,7 +158,7 @@ def test_delete_requires_owner(client: TestClient) -> None:
     assert all(item["id"] != emoji_id for item in items)
 
 
-def test_delete_for_legacy_entries_with_matching_email(client: TestClient) -> None:
+def test_delete_for_legacy_entries_with_matching_email(client: TestClient, engine) -> None:
     headers = auth_headers(client, email="legacy@example.com")
 
     # create submission then manually clear submitter_id to mimic legacy data
@@ -103,7 +169,6 @@ def test_delete_for_legacy_entries_with_matching_email(client: TestClient) -> No
     )
     emoji_id = response.json()["id"]
 
-    from app.db import engine
     from app.models import EmojiSubmission
     from sqlalchemy import text
 
@@ -120,3 +185,463 @@ def test_delete_for_legacy_entries_with_matching_email(client: TestClient) -> No
 
     delete_response = client.delete(f"/api/emojis/{emoji_id}", headers=headers)
     assert delete_response.status_code == 204
+
+
+def test_search_matches_word_prefixes(client: TestClient) -> None:
+    headers = auth_headers(client)
+    client.post(
+        "/api/emojis",
+        headers=headers,
+        json={"symbol": "🚀", "title": "Rocket Launch", "keywords": ["space", "startup"]},
+    )
+    client.post(
+        "/api/emojis",
+        headers=headers,
+        json={"symbol": "🎉", "title": "Party Popper", "keywords": ["celebration"]},
+    )
+
+    titles = [item["title"] for item in client.get("/api/emojis?search=laun").json()["items"]]
+    assert titles == ["Rocket Launch"]
+
+    response = client.get("/api/emojis?search=rocket%20spa")
+    assert [item["title"] for item in response.json()["items"]] == ["Rocket Launch"]
+    assert response.json()["total"] == 1
+
+    # Prefix matching works on whole words, so "art" no longer matches "party".
+    assert client.get("/api/emojis?search=art").json()["total"] == 0
+
+
+def test_search_ranks_title_matches_first(client: TestClient) -> None:
+    headers = auth_headers(client)
+    client.post(
+        "/api/emojis",
+        headers=headers,
+        json={"symbol": "🌙", "title": "Night Sky", "description": "A calm moon over the sea"},
+    )
+    client.post("/api/emojis", headers=headers, json={"symbol": "🌕", "title": "Full Moon"})
+
+    response = client.get("/api/emojis?search=moon&sort=relevance")
+    assert [item["title"] for item in response.json()["items"]] == ["Full Moon", "Night Sky"]
+
+
+def test_relevance_search_without_words_pages_newest_first(client: TestClient) -> None:
+    headers = auth_headers(client)
+    for title in ("Wow!!!", "Yay!!!", "Zap!!!"):
+        client.post("/api/emojis", headers=headers, json={"symbol": "❗", "title": title})
+
+    # "!!!" has no words to rank, so pages keep the default order instead of none at all
+    pages = [
+        client.get(f"/api/emojis?search=!!!&sort=relevance&limit=2&offset={offset}").json()
+        for offset in (0, 2)
+    ]
+    titles = [item["title"] for page in pages for item in page["items"]]
+    assert titles == ["Zap!!!", "Yay!!!", "Wow!!!"]
+
+
+def test_search_index_follows_updates_and_deletes(client: TestClient) -> None:
+    headers = auth_headers(client)
+    emoji_id = client.post(
+        "/api/emojis", headers=headers, json={"symbol": "🍕", "title": "Pizza Slice"}
+    ).json()["id"]
+
+    client.put(f"/api/emojis/{emoji_id}", headers=headers, json={"title": "Taco Night"})
+    assert client.get("/api/emojis?search=pizza").json()["total"] == 0
+    assert client.get("/api/emojis?search=taco").json()["total"] == 1
+
+    client.delete(f"/api/emojis/{emoji_id}", headers=headers)
+    assert client.get("/api/emojis?search=taco").json()["total"] == 0
+
+
+def test_keyword_filter_is_exact_with_and_or_modes(client: TestClient) -> None:
+    headers = auth_headers(client)
+    client.post(
+        "/api/emojis",
+        headers=headers,
+        json={"symbol": "🎉", "title": "Party Popper", "keywords": ["party", "Celebration"]},
+    )
+    client.post(
+        "/api/emojis",
+        headers=headers,
+        json={"symbol": "🚀", "title": "Rocket", "keywords": ["space", "party"]},
+    )
+    client.post(
+        "/api/emojis", headers=headers, json={"symbol": "🎨", "title": "Palette", "keywords": ["art"]}
+    )
+
+    def titles(params: dict) -> list[str]:
+        items = client.get("/api/emojis", params={"sort": "title_asc", **params}).json()["items"]
+        return [item["title"] for item in items]
+
+    assert titles({"keyword": "art"}) == ["Palette"]
+    assert titles({"keyword": "celebration"}) == ["Party Popper"]
+    assert titles({"keyword": ["party", "space"]}) == ["Rocket"]
+    assert titles({"keyword": ["art", "space"], "keyword_mode": "any"}) == ["Palette", "Rocket"]
+
+
+def test_keyword_index_follows_updates_and_backfill(client: TestClient, engine) -> None:
+    from sqlalchemy import text
+
+    from app.models.keyword import backfill_keywords
+
+    headers = auth_headers(client)
+    emoji_id = client.post(
+        "/api/emojis", headers=headers, json={"symbol": "🍩", "title": "Donut", "keywords": ["food"]}
+    ).json()["id"]
+    client.put(f"/api/emojis/{emoji_id}", headers=headers, json={"keywords": ["sweet"]})
+    assert client.get("/api/emojis?keyword=food").json()["total"] == 0
+    assert client.get("/api/emojis?keyword=sweet").json()["total"] == 1
+
+    with engine.begin() as connection:
+        connection.execute(
+            text("UPDATE emojisubmission SET keywords = 'dessert,sweet' WHERE id = :id"),
+            {"id": emoji_id},
+        )
+        assert backfill_keywords(connection) == 2
+    assert client.get("/api/emojis?keyword=dessert").json()["total"] == 1
+
+
+def test_list_supports_conditional_get(client: TestClient) -> None:
+    headers = auth_headers(client)
+    first = client.get("/api/emojis?limit=10")
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert "public" in first.headers["Cache-Control"]
+
+    not_modified = client.get("/api/emojis?limit=10", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+
+    other_query = client.get("/api/emojis?limit=20", headers={"If-None-Match": etag})
+    assert other_query.status_code == 200
+
+    authenticated = client.get("/api/emojis?limit=10", headers=headers)
+    assert authenticated.headers["ETag"] != etag
+    assert authenticated.headers["Cache-Control"] == "private, no-cache"
+
+    client.post("/api/emojis", headers=headers, json={"symbol": "🆕", "title": "New"})
+    changed = client.get("/api/emojis?limit=10", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_anonymous_pages_are_cached_until_a_write(client: TestClient) -> None:
+    headers = auth_headers(client)
+    client.post("/api/emojis", headers=headers, json={"symbol": "🐢", "title": "Turtle"})
+
+    first = client.get("/api/emojis?sort=title_asc")
+    second = client.get("/api/emojis?sort=title_asc")
+    assert first.json() == second.json()
+    stats = client.get("/api/cache/stats").json()["emoji_list"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+    client.post("/api/emojis", headers=headers, json={"symbol": "🐇", "title": "Rabbit"})
+    titles = [item["title"] for item in client.get("/api/emojis?sort=title_asc").json()["items"]]
+    assert titles == ["Rabbit", "Turtle"]
+
+    # authenticated pages carry can_delete and always bypass the cache
+    assert client.get("/api/emojis?sort=title_asc", headers=headers).json()["items"][0]["can_delete"]
+
+
+def test_import_ndjson_reports_each_row(client: TestClient) -> None:
+    headers = auth_headers(client)
+    client.post("/api/emojis", headers=headers, json={"symbol": "🍎", "title": "Apple"})
+
+    body = "\n".join(
+        [
+            '{"symbol": "🍐", "title": "Pear", "keywords": ["fruit", "Green"]}',
+            '{"symbol": "🍎", "title": "Apple"}',
+            "not json",
+            "",
+            '{"symbol": "", "title": "Empty"}',
+            '{"symbol": "🍐", "title": "Pear"}',
+        ]
+    )
+    response = client.post(
+        "/api/emojis/import",
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+        content=body.encode(),
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["created"], report["duplicates"], report["invalid"]) == (1, 2, 2)
+    assert [(row["line"], row["status"]) for row in report["results"]] == [
+        (1, "created"),
+        (2, "duplicate"),
+        (3, "invalid"),
+        (5, "invalid"),
+        (6, "duplicate"),
+    ]
+
+    page = client.get("/api/emojis?keyword=green").json()
+    assert [item["title"] for item in page["items"]] == ["Pear"]
+    assert page["items"][0]["submitter_email"] == "emoji@example.com"
+
+
+def test_import_csv_in_small_batches(client: TestClient) -> None:
+    headers = auth_headers(client)
+    rows = ["symbol,title,category,keywords"]
+    rows += [f'⭐,Star {index},Nature,"sky,night"' for index in range(5)]
+    rows.append("⭐,Broken")
+    response = client.post(
+        "/api/emojis/import?batch_size=2&report=errors",
+        headers={**headers, "Content-Type": "text/csv"},
+        content="\r\n".join(rows).encode(),
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["created"], report["duplicates"], report["invalid"]) == (5, 0, 1)
+    assert [row["line"] for row in report["results"]] == [7]
+
+    page = client.get("/api/emojis?category=Nature&keyword=sky").json()
+    assert page["total"] == 5
+
+    response = client.post(
+        "/api/emojis/import?format=csv",
+        headers=headers,
+        content="symbol,name\n⭐,Star".encode(),
+    )
+    assert response.status_code == 400
+
+
+def test_export_streams_filtered_rows_and_resumes(client: TestClient) -> None:
+    headers = auth_headers(client)
+    for index in range(4):
+        client.post(
+            "/api/emojis",
+            headers=headers,
+            json={
+                "symbol": "⭐",
+                "title": f"Star {index}",
+                "category": "Nature",
+                "keywords": ["sky"],
+            },
+        )
+    client.post("/api/emojis", headers=headers, json={"symbol": "🍎", "title": "Apple"})
+
+    response = client.get("/api/emojis/export?category=Nature")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == [f"Star {index}" for index in range(4)]
+    assert rows[0]["keywords"] == ["sky"]
+    assert "can_delete" not in rows[0]
+
+    resumed = client.get(f"/api/emojis/export?category=Nature&after_id={rows[1]['id']}")
+    assert [json.loads(line)["title"] for line in resumed.text.splitlines()] == [
+        "Star 2",
+        "Star 3",
+    ]
+
+    exported = client.get("/api/emojis/export?format=csv&search=apple")
+    assert exported.headers["content-type"].startswith("text/csv")
+    lines = exported.text.splitlines()
+    assert lines[0] == "id,symbol,title,description,category,keywords,submitter_email,created_at"
+    assert len(lines) == 2 and ",Apple," in lines[1]
+
+    # an export can be fed straight back into the importer
+    report = client.post(
+        "/api/emojis/import?format=csv", headers=headers, content=exported.content
+    ).json()
+    assert (report["created"], report["duplicates"], report["invalid"]) == (0, 1, 0)
+
+
+def test_csv_export_round_trips_multiline_fields(client: TestClient) -> None:
+    headers = auth_headers(client)
+    description = 'Says "hi",\nthen waves\n\ngoodbye'
+    created = client.post(
+        "/api/emojis",
+        headers=headers,
+        json={"symbol": "👋", "title": "Wave", "description": description},
+    ).json()
+    exported = client.get("/api/emojis/export?format=csv").content
+    assert client.delete(f"/api/emojis/{created['id']}", headers=headers).status_code == 204
+
+    body = exported + ",👋,Wave,,,,,\n🙂,Smile,\"never\nclosed\n".encode()
+    report = client.post("/api/emojis/import?format=csv", headers=headers, content=body).json()
+    assert [(row["line"], row["status"]) for row in report["results"]] == [
+        (2, "created"),
+        (6, "duplicate"),
+        (7, "invalid"),
+    ]
+    assert report["results"][2]["detail"] == "Unterminated quoted field"
+    reexported = client.get("/api/emojis/export?search=wave").text
+    assert [json.loads(line)["description"] for line in reexported.splitlines()] == [description]
+
+
+def test_batch_update_reports_each_id(client: TestClient) -> None:
+    headers = auth_headers(client)
+    other_headers = auth_headers(client, email="other@example.com")
+    ids = [
+        client.post("/api/emojis", headers=headers, json={"symbol": "🔤", "title": title})
+        .json()["id"]
+        for title in ["Alpha", "Bravo", "Charlie"]
+    ]
+    foreign_id = client.post(
+        "/api/emojis", headers=other_headers, json={"symbol": "🔤", "title": "Delta"}
+    ).json()["id"]
+
+    response = client.patch(
+        "/api/emojis:batch",
+        headers=headers,
+        json={
+            "items": [
+                {"id": ids[0], "title": "Alpha 2", "keywords": ["first"]},
+                {"id": ids[1], "title": "Delta"},
+                {"id": foreign_id, "title": "Mine now"},
+                {"id": 999_999, "title": "Ghost"},
+                {"id": ids[0], "title": "Again"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [row["status"] for row in results] == [
+        "updated",
+        "conflict",
+        "forbidden",
+        "not_found",
+        "invalid",
+    ]
+    assert results[0]["emoji"]["keywords"] == ["first"]
+
+    titles = [item["title"] for item in client.get("/api/emojis?sort=title_asc").json()["items"]]
+    assert titles == ["Alpha 2", "Bravo", "Charlie", "Delta"]
+    assert client.get("/api/emojis?keyword=first").json()["total"] == 1
+
+
+def test_batch_delete_removes_only_owned_rows(client: TestClient) -> None:
+    headers = auth_headers(client)
+    other_headers = auth_headers(client, email="other@example.com")
+    ids = [
+        client.post(
+            "/api/emojis",
+            headers=headers,
+            json={"symbol": "🗑", "title": title, "keywords": ["bin"]},
+        ).json()["id"]
+        for title in ["One", "Two"]
+    ]
+    foreign_id = client.post(
+        "/api/emojis", headers=other_headers, json={"symbol": "🗑", "title": "Three"}
+    ).json()["id"]
+
+    response = client.request(
+        "DELETE", "/api/emojis:batch", headers=headers, json={"ids": [*ids, foreign_id]}
+    )
+    assert response.status_code == 200
+    assert [row["status"] for row in response.json()["results"]] == [
+        "deleted",
+        "deleted",
+        "forbidden",
+    ]
+    assert [item["title"] for item in client.get("/api/emojis").json()["items"]] == ["Three"]
+    assert client.get("/api/emojis?keyword=bin").json()["total"] == 0
+    assert client.get("/api/emojis?search=one").json()["total"] == 0
+
+
+def test_category_facets_follow_writes_and_filters(client: TestClient) -> None:
+    headers = auth_headers(client)
+    for title, category in [
+        ("Sun", "Nature"),
+        ("Moon", "Nature"),
+        ("Rocket", "Travel"),
+        ("Sun Car", "Travel"),
+        ("Blank", None),
+    ]:
+        client.post(
+            "/api/emojis",
+            headers=headers,
+            json={"symbol": "🔆", "title": title, "category": category},
+        )
+    client.post(
+        "/api/emojis/import",
+        headers={**headers, "Content-Type": "text/csv"},
+        content="symbol,title,category\n🚲,Bike,Travel".encode(),
+    )
+
+    def category_facets(query: str = "") -> list[tuple[str, int]]:
+        data = client.get(f"/api/emojis?facets=category{query}").json()
+        return [(facet["value"], facet["count"]) for facet in data["facets"]["category"]]
+
+    assert category_facets() == [("Travel", 3), ("Nature", 2)]
+    # the category filter narrows the items but not the facet counts
+    assert category_facets("&category=Nature") == [("Travel", 3), ("Nature", 2)]
+    assert category_facets("&search=sun") == [("Nature", 1), ("Travel", 1)]
+    assert client.get("/api/emojis").json()["facets"] is None
+
+    emoji_id = client.get("/api/emojis?search=moon").json()["items"][0]["id"]
+    client.put(f"/api/emojis/{emoji_id}", headers=headers, json={"category": "Space"})
+    assert category_facets() == [("Travel", 3), ("Nature", 1), ("Space", 1)]
+    client.delete(f"/api/emojis/{emoji_id}", headers=headers)
+    assert category_facets() == [("Travel", 3), ("Nature", 1)]
+
+
+def test_suggest_completes_prefixes_tolerates_typos_and_follows_writes(
+    client: TestClient,
+) -> None:
+    headers = auth_headers(client)
+    for title, keywords in [
+        ("Rocket", ["launch", "space"]),
+        ("Rock Music", ["guitar"]),
+        ("Rainbow", ["pride"]),
+    ]:
+        client.post(
+            "/api/emojis",
+            headers=headers,
+            json={"symbol": "🔎", "title": title, "keywords": keywords},
+        )
+
+    def suggest(query: str) -> list[str]:
+        response = client.get("/api/emojis/suggest", params={"q": query, "limit": 5})
+        assert response.status_code == 200
+        return [item["title"] for item in response.json()]
+
+    assert suggest("roc") == ["Rocket", "Rock Music"]
+    assert suggest("laun") == ["Rocket"]
+    assert suggest("rainbw") == ["Rainbow"]
+    assert suggest("rock mus") == ["Rock Music"]
+    assert suggest("zzz") == []
+
+    # the index is loaded once and then kept current by the writes themselves
+    rainbow_id = client.get("/api/emojis?search=rainbow").json()["items"][0]["id"]
+    client.put(f"/api/emojis/{rainbow_id}", headers=headers, json={"title": "Arc"})
+    client.post(
+        "/api/emojis/import",
+        headers={**headers, "Content-Type": "text/csv"},
+        content="symbol,title\n🪨,Rocky Road".encode(),
+    )
+    assert suggest("rainbow") == []
+    assert suggest("arc") == ["Arc"]
+    assert suggest("rock") == ["Rocket", "Rock Music", "Rocky Road"]
+
+    ids = [item["id"] for item in client.get("/api/emojis?search=rock").json()["items"]]
+    client.request("DELETE", "/api/emojis:batch", headers=headers, json={"ids": ids})
+    assert suggest("rock") == []
+
+
+def test_batch_update_rejects_clashes_row_by_row(client: TestClient) -> None:
+    headers = auth_headers(client)
+
+    def create(title: str) -> int:
+        payload = {"symbol": "🔠", "title": title}
+        return client.post("/api/emojis", headers=headers, json=payload).json()["id"]
+
+    def update(*items: tuple[int, str]) -> list[str]:
+        response = client.patch(
+            "/api/emojis:batch",
+            headers=headers,
+            json={"items": [{"id": emoji_id, "title": title} for emoji_id, title in items]},
+        )
+        assert response.status_code == 200
+        return [row["status"] for row in response.json()["results"]]
+
+    a, b, c, d = (create(title) for title in ["A", "B", "C", "D"])
+    # b and c both want Z, so neither moves and "C" stays taken for a
+    assert update((a, "C"), (b, "Z"), (c, "Z")) == ["conflict", "conflict", "conflict"]
+    # a swap needs each key free before the other row gives it up
+    assert update((a, "B"), (b, "A")) == ["conflict", "conflict"]
+    # a chain works in any order: d gives up "D" for "E", then c takes "D"
+    assert update((c, "D"), (d, "E"), (a, "A 2")) == ["updated", "updated", "updated"]
+
+    titles = [item["title"] for item in client.get("/api/emojis?sort=title_asc").json()["items"]]
+    assert titles == ["A 2", "B", "D", "E"]
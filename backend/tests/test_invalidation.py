@@ -0,0 +1,154 @@
+from collections.abc import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app import invalidation
+from app.catalog import catalog_version
+from app.core.invalidation import RESYNC, InvalidationBus, SQLiteInvalidationChannel
+from app.db import ReadReplicas, pin_to_primary, pinned_to_primary
+from app.importer import import_lines
+from app.invalidation import connect_invalidation_bus, publish_offline_writes
+from app.models import User
+
+
+def test_sqlite_channel_delivers_events_to_other_workers(tmp_path) -> None:
+    path = str(tmp_path / "bus.db")
+    first, second = SQLiteInvalidationChannel(path), SQLiteInvalidationChannel(path)
+
+    first.publish("users", [3])
+    second.publish("catalog", None)
+    # publishing only queues; nothing reaches the file until the publisher flushes or polls
+    assert first.poll() == []
+    second.flush()
+
+    assert first.poll() == [("catalog", None)]
+    assert second.poll() == [("users", [3])]
+    assert first.poll() == second.poll() == []
+
+
+def test_sqlite_channel_asks_for_a_resync_after_missing_events(tmp_path) -> None:
+    path = str(tmp_path / "bus.db")
+    idle = SQLiteInvalidationChannel(path)
+    busy = SQLiteInvalidationChannel(path, retention_seconds=-1)
+
+    busy.publish("catalog", None)
+    busy.flush()
+    busy.publish("catalog", None)
+    busy.flush()  # prunes the first event before ``idle`` saw it
+
+    assert idle.poll() == [(RESYNC, None)]
+    assert idle.poll() == []
+
+
+@pytest.fixture()
+def buses(tmp_path) -> Generator[tuple[InvalidationBus, InvalidationBus], None, None]:
+    """This worker's bus and a peer standing in for another worker."""
+    path = str(tmp_path / "bus.db")
+    local = InvalidationBus(SQLiteInvalidationChannel(path))
+    peer = InvalidationBus(SQLiteInvalidationChannel(path))
+    connect_invalidation_bus(local)
+    yield local, peer
+    connect_invalidation_bus(None)
+
+
+def _login(client: TestClient) -> dict[str, str]:
+    account = {"email": "bus@example.com", "password": "SecretPwd123!"}
+    client.post("/api/auth/register", json={**account, "display_name": "Bus"})
+    token = client.post("/api/auth/login", json=account).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_local_writes_are_published(client: TestClient, buses) -> None:
+    local, peer = buses
+    received = []
+    for kind in ("catalog", "emojis", "users"):
+        peer.on(kind, lambda payload, kind=kind: received.append((kind, payload)))
+    headers = _login(client)
+    received.clear()
+
+    emoji = client.post(
+        "/api/emojis", headers=headers, json={"symbol": "🛰", "title": "Satellite"}
+    ).json()
+    local.flush()
+    peer.poll()
+
+    assert received == [
+        ("emojis", [[emoji["id"], ["🛰", "Satellite", ""]]]),
+        ("catalog", None),
+    ]
+
+
+def test_remote_events_refresh_this_worker(client: TestClient, buses, engine) -> None:
+    local, peer = buses
+    headers = _login(client)
+    assert client.get("/api/auth/me", headers=headers).json()["display_name"] == "Bus"
+    assert client.get("/api/emojis/suggest?q=sat").json() == []
+
+    with engine.begin() as connection:
+        connection.execute(text("UPDATE user SET display_name = 'Renamed'"))
+        user_id = connection.execute(text("SELECT id FROM user")).scalar_one()
+    # the cached user row is served until another worker reports the change
+    assert client.get("/api/auth/me", headers=headers).json()["display_name"] == "Bus"
+
+    version = catalog_version.value
+    peer.publish("users", [user_id])
+    peer.publish("emojis", [[41, ["🛰", "Satellite", "space"]]])
+    peer.publish("catalog")
+    peer.flush()
+    assert local.poll() == 3
+
+    assert client.get("/api/auth/me", headers=headers).json()["display_name"] == "Renamed"
+    assert [item["id"] for item in client.get("/api/emojis/suggest?q=sat").json()] == [41]
+    assert catalog_version.value != version
+    # applying remote events does not echo them back
+    assert peer.poll() == 0
+
+
+def test_read_your_writes_pins_reach_other_workers(buses, monkeypatch, tmp_path) -> None:
+    local, peer = buses
+    received = []
+    peer.on("pins", received.append)
+    # pins are only shared when there are replicas to steer reads away from
+    replicas = ReadReplicas([f"sqlite:///{tmp_path / 'replica.db'}"])
+    monkeypatch.setattr(invalidation, "read_replicas", replicas)
+
+    pin_to_primary(5)
+    local.flush()
+    peer.poll()
+    assert received == [[5]]
+
+    peer.publish("pins", [9])
+    peer.flush()
+    local.poll()
+    assert pinned_to_primary(9)
+
+
+def test_script_writes_reach_running_workers(engine, buses) -> None:
+    local, peer = buses
+    received = []
+    for kind in ("catalog", "emojis"):
+        peer.on(kind, lambda payload, kind=kind: received.append((kind, payload)))
+
+    # what import_emojis.py does, from a process that serves no requests
+    with Session(engine) as session:
+        owner = User(email="script@example.com", hashed_password="x", display_name="Script")
+        session.add(owner)
+        session.commit()
+        lines = ['{"symbol": "🛰", "title": "Satellite"}']
+        outcomes = list(import_lines(session, lines, "ndjson", owner.id, owner.email))
+    assert publish_offline_writes()
+    peer.poll()
+
+    assert received == [
+        ("emojis", [[outcomes[0].id, ["🛰", "Satellite", ""]]]),
+        ("catalog", None),
+    ]
+
+
+def test_script_writes_without_a_bus_need_a_restart(monkeypatch) -> None:
+    monkeypatch.setattr(catalog_version, "_store", None)
+    connect_invalidation_bus(None)
+    assert not publish_offline_writes()
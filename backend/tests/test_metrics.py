@@ -0,0 +1,46 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Histogram
+
+
+def sample(body: str, name: str) -> float:
+    match = re.search(rf"^{re.escape(name)} (\S+)$", body, re.MULTILINE)
+    assert match is not None, name
+    return float(match.group(1))
+
+
+def test_metrics_record_routes_statuses_and_queries(client: TestClient) -> None:
+    response = client.get("/api/emojis")
+    assert response.status_code == 200
+    assert re.match(r'db;dur=[\d.]+;desc="2 queries", app;dur=', response.headers["server-timing"])
+    client.get("/api/emojis?limit=0")
+    client.get("/api/no-such-route")
+
+    body = client.get("/api/metrics").text
+    route = 'method="GET",route="/api/emojis"'
+    assert sample(body, f"http_request_duration_seconds_count{{{route}}}") == 2
+    assert sample(body, f'http_responses_total{{{route},status="200"}}') == 1
+    assert sample(body, f'http_responses_total{{{route},status="422"}}') == 1
+    assert sample(body, 'http_responses_total{method="GET",route="unmatched",status="404"}') == 1
+    # a page and its COUNT; the rejected request never reached the database
+    assert sample(body, f"db_queries_per_request_sum{{{route}}}") == 2
+    assert sample(body, f'db_queries_per_request_bucket{{{route},le="0.0"}}') == 1
+    # the scrape itself is in flight
+    assert sample(body, "http_requests_in_flight") == 1
+    assert sample(body, 'response_cache_lookups{result="miss"}') == 1
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, "/x")
+
+    assert list(histogram.render())[2:] == [
+        'latency_seconds_bucket{route="/x",le="0.1"} 1',
+        'latency_seconds_bucket{route="/x",le="1.0"} 2',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 3',
+        'latency_seconds_sum{route="/x"} 5.55',
+        'latency_seconds_count{route="/x"} 3',
+    ]
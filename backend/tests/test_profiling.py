@@ -0,0 +1,31 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+@pytest.fixture()
+def profiles(monkeypatch: pytest.MonkeyPatch, tmp_path):
+    monkeypatch.setattr(settings, "profiling_token", "let-me-profile")
+    output_dir = tmp_path / "profiles"
+    monkeypatch.setattr(settings, "profiling_output_dir", str(output_dir))
+    return output_dir
+
+
+def test_profile_header_captures_a_request(client: TestClient, profiles) -> None:
+    response = client.get("/api/emojis", headers={"X-Profile": "let-me-profile"})
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+    assert (profiles / f"{profile_id}.prof").stat().st_size > 0
+
+    assert "x-profile-id" not in client.get("/api/emojis").headers
+    assert "x-profile-id" not in client.get("/api/emojis", headers={"X-Profile": "guess"}).headers
+    assert len(list(profiles.iterdir())) == 1
+
+
+def test_sampling_profiles_without_a_header(
+    client: TestClient, profiles, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "profiling_token", "")
+    monkeypatch.setattr(settings, "profiling_sample_rate", 1.0)
+    assert "x-profile-id" in client.get("/api/health").headers
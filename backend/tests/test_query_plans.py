@@ -0,0 +1,127 @@
+"""Guard the emoji list query shapes against falling back to full table scans."""
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Any
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import select
+
+from app.facets import category_facet_statement, rebuild_category_counts
+from app.models import EmojiSubmission
+from app.queries import (
+    apply_cursor,
+    apply_filters,
+    apply_sort,
+    count_statement,
+    list_statement,
+)
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+FILTERS: dict[str, dict[str, Any]] = {
+    "unfiltered": {},
+    "category": {"category": "Nature"},
+    "search": {"search": "rocket laun"},
+    "keyword": {"keywords": ["party"]},
+    "keywords_all": {"keywords": ["party", "space"], "keyword_mode": "all"},
+    "keywords_any": {"keywords": ["party", "space"], "keyword_mode": "any"},
+    "category_keyword": {"category": "Nature", "keywords": ["party"]},
+}
+
+SORTS = ["date_desc", "date_asc", "title_asc", "title_desc"]
+
+CURSORS = {
+    "date_desc": (datetime(2024, 1, 1), 10),
+    "date_asc": (datetime(2024, 1, 1), 10),
+    "title_asc": ("Rocket", 10),
+    "title_desc": ("Rocket", 10),
+}
+
+
+def full_scans(engine, statement: Any) -> list[str]:
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    with engine.connect() as connection:
+        plan = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+    return [row[3] for row in plan if FULL_SCAN.match(row[3])]
+
+
+@pytest.fixture()
+def seeded_engine(engine):
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO emojisubmission "
+                "(symbol, title, keywords, category, created_at, submitter_id) "
+                "VALUES (:symbol, :title, :keywords, :category, :created_at, :submitter_id)"
+            ),
+            [
+                {
+                    "symbol": "🚀",
+                    "title": f"Rocket {index}",
+                    "keywords": "party,space",
+                    "category": "Nature" if index % 2 else "Travel",
+                    "created_at": datetime(2024, 1, 1 + index),
+                    "submitter_id": index % 5,
+                }
+                for index in range(20)
+            ],
+        )
+        connection.execute(text("ANALYZE"))
+    return engine
+
+
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("shape", FILTERS)
+def test_list_query_uses_indexes(seeded_engine, shape: str, sort: str) -> None:
+    statement = list_statement(1, "user@example.com")
+    statement = apply_filters(statement, dialect="sqlite", **FILTERS[shape])
+    statement = apply_sort(statement, sort).limit(50)
+    assert full_scans(seeded_engine, statement) == []
+
+    statement = apply_cursor(statement, sort, CURSORS[sort])
+    assert full_scans(seeded_engine, statement) == []
+
+
+@pytest.mark.parametrize("shape", FILTERS)
+def test_count_query_uses_indexes(seeded_engine, shape: str) -> None:
+    statement = count_statement(dialect="sqlite", **FILTERS[shape])
+    assert full_scans(seeded_engine, statement) == []
+
+
+def test_owner_lookup_uses_index(seeded_engine) -> None:
+    statement = select(EmojiSubmission).where(EmojiSubmission.submitter_id == 1)
+    assert full_scans(seeded_engine, statement) == []
+
+
+def test_duplicate_lookup_uses_unique_index(seeded_engine) -> None:
+    statement = select(EmojiSubmission).where(
+        EmojiSubmission.symbol == "🚀", EmojiSubmission.title == "Rocket 1"
+    )
+    assert full_scans(seeded_engine, statement) == []
+
+
+def test_unindexed_filter_is_reported(seeded_engine) -> None:
+    statement = select(EmojiSubmission).where(EmojiSubmission.description == "x")
+    assert full_scans(seeded_engine, statement) == ["SCAN emojisubmission"]
+
+
+@pytest.mark.parametrize("shape", ["search", "keyword", "keywords_all", "keywords_any"])
+def test_category_facets_use_indexes(seeded_engine, shape: str) -> None:
+    statement = category_facet_statement(dialect="sqlite", **FILTERS[shape])
+    assert full_scans(seeded_engine, statement) == []
+
+
+def test_unfiltered_category_facets_read_only_the_counts(seeded_engine) -> None:
+    statement = category_facet_statement(dialect="sqlite")
+    assert full_scans(seeded_engine, statement) == ["SCAN categorycount"]
+
+
+def test_category_counts_match_a_recount(seeded_engine) -> None:
+    with seeded_engine.begin() as connection:
+        counted = connection.execute(category_facet_statement(dialect="sqlite")).all()
+        rebuild_category_counts(connection)
+        assert connection.execute(category_facet_statement(dialect="sqlite")).all() == counted
+    assert counted == [("Nature", 10), ("Travel", 10)]
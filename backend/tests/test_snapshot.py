@@ -0,0 +1,207 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.caching import list_response_cache
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.models import EmojiSubmission, User
+from app.snapshot import CatalogSnapshot, catalog_snapshot
+
+
+def _row(emoji_id: int, title: str, minute: int, category=None, keywords="", owner=None):
+    created = datetime(2024, 1, 1) + timedelta(minutes=minute)
+    return (emoji_id, "🙂", title, None, category, keywords, "a@example.com", created, owner)
+
+
+def test_snapshot_pages_filters_and_cursors() -> None:
+    snapshot = CatalogSnapshot.build(
+        [
+            _row(1, "Moon", 3, "Space", "night,sky"),
+            _row(2, "Apple", 1, "Food", "fruit"),
+            _row(3, "Comet", 3, "Space", "sky"),
+            _row(4, "Bread", 2, None, "Food"),
+        ]
+    )
+
+    rows, total = snapshot.page(sort="date_desc", limit=10)
+    assert [row.id for row in rows] == [3, 1, 4, 2] and total == 4
+    rows, _ = snapshot.page(sort="title_asc", limit=2, offset=1)
+    assert [row.title for row in rows] == ["Bread", "Comet"]
+    rows, _ = snapshot.page(sort="title_desc", limit=10, after=("Comet", 3))
+    assert [row.title for row in rows] == ["Bread", "Apple"]
+    rows, total = snapshot.page(sort="date_asc", limit=10, keywords=["SKY", "night"])
+    assert [row.id for row in rows] == [1] and total == 1
+    rows, total = snapshot.page(
+        sort="date_asc", limit=10, keywords=["food", "fruit"], keyword_mode="any"
+    )
+    assert [row.id for row in rows] == [2, 4] and total == 2
+    assert snapshot.page(sort="date_asc", limit=10, category="Nope") == ([], 0)
+    assert snapshot.category_facets(None, "all") == [
+        {"value": "Space", "count": 2},
+        {"value": "Food", "count": 1},
+    ]
+
+    slots = {emoji_id: slot for slot, emoji_id in enumerate((1, 2, 3, 4))}
+    updated = snapshot.apply({1: _row(1, "Aardvark", 3, "Animals"), 2: None}, slots)
+    assert [row.title for row in updated.page(sort="title_asc", limit=10)[0]] == [
+        "Aardvark",
+        "Bread",
+        "Comet",
+    ]
+    assert updated.category_facets(None, "all")[0] == {"value": "Animals", "count": 1}
+    # the published snapshot is untouched
+    assert [row.id for row in snapshot.page(sort="date_asc", limit=10)[0]] == [2, 4, 1, 3]
+
+
+def test_incremental_updates_match_a_rebuild() -> None:
+    generator = random.Random(3)
+
+    def random_row(emoji_id: int):
+        return _row(
+            emoji_id,
+            generator.choice(["Sun", "Moon", "Star"]) + str(generator.randrange(5)),
+            generator.randrange(50),
+            generator.choice(["Nature", "Space", None]),
+            ",".join(generator.sample(["a", "b", "c"], 2)),
+            generator.choice([None, 1]),
+        )
+
+    filters = [
+        {},
+        {"category": "Space"},
+        {"keywords": ["a", "b"]},
+        {"keywords": ["a", "c"], "keyword_mode": "any", "category": "Nature"},
+        {"keywords": ["b", "c"], "keyword_mode": "any", "offset": 7},
+        {"keywords": ["c"], "category": "Space", "offset": 3},
+    ]
+    rows = {emoji_id: random_row(emoji_id) for emoji_id in range(1, 301)}
+    snapshot = CatalogSnapshot.build(rows.values())
+    slots = {emoji_id: slot for slot, emoji_id in enumerate(rows)}
+    next_id = 301
+    # small change sets are spliced into the sort orders, the last one is merged by sorting
+    for size in (1, 3, 10, 20, 40):
+        for page_filters in filters:
+            # counted here, then carried over by ``apply``
+            snapshot.page(sort="date_desc", limit=5, **page_filters)
+        changes = {}
+        for _ in range(size):
+            if generator.random() < 0.4:
+                changes[next_id] = rows[next_id] = random_row(next_id)
+                next_id += 1
+            else:
+                emoji_id = generator.choice(list(rows))
+                changes[emoji_id] = rows[emoji_id] = (
+                    None if generator.random() < 0.5 else random_row(emoji_id)
+                )
+                if changes[emoji_id] is None:
+                    del rows[emoji_id]
+        snapshot = snapshot.apply(changes, slots)
+
+    rebuilt = CatalogSnapshot.build(rows.values())
+    for sort in ("date_desc", "date_asc", "title_asc", "title_desc"):
+        for page_filters in filters:
+            page = dict(sort=sort, limit=400, viewer_id=1, **page_filters)
+            assert snapshot.page(**page) == rebuilt.page(**page)
+            # a page after a cursor continues where the first ten rows stopped
+            first, _ = rebuilt.page(**{**page, "limit": 10})
+            if first:
+                value = first[-1].title if sort.startswith("title") else first[-1].created_at
+                after = {**page, "after": (value, first[-1].id)}
+                assert snapshot.page(**after) == rebuilt.page(**after)
+                assert rebuilt.page(**after)[0] == rebuilt.page(**page)[0][len(first) :]
+    assert snapshot.category_facets(["c"], "all") == rebuilt.category_facets(["c"], "all")
+
+
+@pytest.fixture()
+def owner_headers(engine) -> dict[str, str]:
+    generator = random.Random(7)
+    with Session(engine) as session:
+        owner = User(email="owner@example.com", hashed_password="x", display_name="Owner")
+        session.add(owner)
+        session.commit()
+        for index in range(60):
+            session.add(
+                EmojiSubmission(
+                    symbol=str(index),
+                    title=generator.choice(["Sun", "Moon", "Star", "Cloud"]) + f" {index % 7}",
+                    category=generator.choice(["Nature", "Space", "Weather", None]),
+                    keywords=",".join(generator.sample(["sky", "night", "day", "warm"], 2)),
+                    submitter_email=generator.choice(["owner@example.com", "x@example.com"]),
+                    submitter_id=owner.id if index % 3 == 0 else None,
+                    created_at=datetime(2024, 1, 1) + timedelta(hours=generator.randrange(20)),
+                )
+            )
+        session.commit()
+        token = create_access_token(str(owner.id))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _walk(client: TestClient, query: str, headers: dict[str, str]) -> list[dict]:
+    """Every page of ``query``, following cursors, with the response cache out of the way."""
+    pages = []
+    url = f"/api/emojis?{query}"
+    while url:
+        if list_response_cache is not None:
+            list_response_cache.clear()
+        body = client.get(url, headers=headers).json()
+        pages.append(body)
+        url = body["next_cursor"] and f"/api/emojis?{query}&cursor={body['next_cursor']}"
+    return pages
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "limit=7",
+        "limit=7&offset=30&sort=title_asc",
+        "limit=9&sort=title_desc&category=Space",
+        "limit=5&sort=date_asc&keyword=sky&keyword=night",
+        "limit=5&keyword=warm&keyword=day&keyword_mode=any&facets=category",
+        "limit=50&facets=category&category=Nature&include_total=false",
+        "limit=4&sort=relevance&keyword=unknown",
+    ],
+)
+@pytest.mark.parametrize("viewer", ["anonymous", "owner"])
+def test_snapshot_answers_like_the_database(
+    client: TestClient, owner_headers, monkeypatch: pytest.MonkeyPatch, query: str, viewer: str
+) -> None:
+    headers = owner_headers if viewer == "owner" else {}
+    expected = _walk(client, query, headers)
+    assert any(item["can_delete"] for page in expected for item in page["items"]) is (
+        viewer == "owner" and "keyword=unknown" not in query
+    )
+    monkeypatch.setattr(settings, "emoji_list_snapshot", True)
+    assert _walk(client, query, headers) == expected
+    assert catalog_snapshot.current is not None
+
+
+def test_snapshot_follows_writes(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "emoji_list_snapshot", True)
+    account = {"email": "writer@example.com", "password": "SecretPwd123!"}
+    client.post("/api/auth/register", json={**account, "display_name": "Writer"})
+    token = client.post("/api/auth/login", json=account).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def titles() -> list[str]:
+        items = client.get("/api/emojis?sort=title_asc", headers=headers).json()["items"]
+        return [item["title"] for item in items]
+
+    assert titles() == []
+    ids = []
+    for title in ("Star", "Comet"):
+        payload = {"symbol": "⭐", "title": title}
+        ids.append(client.post("/api/emojis", headers=headers, json=payload).json()["id"])
+    assert titles() == ["Comet", "Star"]
+    client.put(f"/api/emojis/{ids[0]}", headers=headers, json={"title": "Asteroid"})
+    client.delete(f"/api/emojis/{ids[1]}", headers=headers)
+    client.post(
+        "/api/emojis/import",
+        headers={**headers, "Content-Type": "text/csv"},
+        content="symbol,title\n🌍,Earth".encode(),
+    )
+    assert titles() == ["Asteroid", "Earth"]
+    assert client.get("/api/emojis", headers=headers).json()["items"][0]["can_delete"] is True
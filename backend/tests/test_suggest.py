@@ -0,0 +1,86 @@
+import random
+
+from sqlalchemy import text
+
+from app.search import search_tokens
+from app.suggest import SuggestIndex, prefix_distance
+
+
+def test_prefix_distance_measures_against_the_closest_prefix() -> None:
+    assert prefix_distance("rock", "rocket", 1) == 0
+    assert prefix_distance("rokc", "rocket", 2) == 1
+    assert prefix_distance("rcket", "rocket", 1) == 1
+    assert prefix_distance("banana", "rocket", 2) == 3
+
+
+def test_index_loads_from_the_table_and_applies_changes(engine) -> None:
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "INSERT INTO emojisubmission (symbol, title, keywords, created_at) "
+                "VALUES ('🚀', 'Rocket', 'launch,space', '2024-01-01')"
+            )
+        )
+
+    index = SuggestIndex()
+    index.apply({99: ("🌙", "Moon", "")})  # ignored until loaded
+    assert index.suggest("moon") == []
+
+    with engine.connect() as connection:
+        index.load(connection)
+    assert [item["title"] for item in index.suggest("spce")] == ["Rocket"]
+    assert len(index) == 1
+
+    index.apply({99: ("🌙", "Moon", "night")})
+    assert index.suggest("nigt") == [{"id": 99, "symbol": "🌙", "title": "Moon"}]
+    index.apply({99: None})
+    assert index.suggest("moon") == []
+
+
+def test_single_word_queries_rank_like_a_full_scan() -> None:
+    generator = random.Random(5)
+    words = ["sun", "sunny", "summer", "moon", "moonlight", "star", "start", "2024", "20"]
+
+    def random_row() -> tuple[str, str, str]:
+        title = " ".join(generator.sample(words, 2)).capitalize()
+        return "🙂", generator.choice([title, f"#{title}"]), ",".join(generator.sample(words, 2))
+
+    index = SuggestIndex()
+    index.loaded = True
+    rows = {emoji_id: random_row() for emoji_id in range(1, 400)}
+    index.apply(rows)
+
+    def scan(query: str, limit: int) -> list[int]:
+        matches = [
+            emoji_id
+            for emoji_id, (_, title, keywords) in rows.items()
+            if any(term.startswith(query) for term in search_tokens(f"{title} {keywords}"))
+        ]
+        ranked = sorted(
+            matches,
+            key=lambda emoji_id: (
+                not rows[emoji_id][1].lower().startswith(query),
+                len(rows[emoji_id][1]),
+                rows[emoji_id][1],
+                emoji_id,
+            ),
+        )
+        return ranked[:limit]
+
+    for round_ in range(30):
+        # deletes and edits reach the best-ranked rows too, so cached prefixes run short
+        changes = {}
+        for emoji_id in generator.sample(sorted(rows), 12):
+            changes[emoji_id] = None if generator.random() < 0.5 else random_row()
+        for _ in range(6):
+            changes[max(rows) + 1 + len(changes)] = random_row()
+        for emoji_id, row in changes.items():
+            if row is None:
+                rows.pop(emoji_id, None)
+            else:
+                rows[emoji_id] = row
+        index.apply(changes)
+        for query in ("s", "su", "sun", "moo", "st", "2", "202"):
+            limit = generator.choice([1, 8, 20])
+            got = [item["id"] for item in index.suggest(query, limit)]
+            assert got == scan(query, limit), (round_, query)